@@ -0,0 +1,6 @@
+// Konfigurasi layanan scoring Python (dataset_prduk&ulasan_ke_mongodb/scoring_service.py),
+// dipakai bersama oleh models/sentimen.js dan routes/sentimen.js
+module.exports = {
+  SCORING_SERVICE_URL: process.env.SCORING_SERVICE_URL || 'http://127.0.0.1:8765',
+  SCORING_SERVICE_TIMEOUT: Number(process.env.SCORING_SERVICE_TIMEOUT) || 500
+};
@@ -0,0 +1,95 @@
+const mongoose = require('mongoose');
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+require('dotenv').config();
+
+// Import models
+const Sentimen = require('./models/sentimen');
+
+// File delta hasil `python Analisis_test.py --delta`: satu file per run ('ulasan_sentimen_mongodb_delta.000007.jsonl')
+const DELTA_DIR = path.join(__dirname, '..', 'dataset_prduk&ulasan_ke_mongodb', 'output_sentiment');
+const DELTA_PATTERN = /^ulasan_sentimen_mongodb_delta\.(\d{6,})\.jsonl$/;
+const BATCH_SIZE = 1000;
+
+// Ubah satu baris delta menjadi operasi bulkWrite
+const toOperation = (entry) => {
+  if (entry.op === 'delete') {
+    return { deleteOne: { filter: { ulasanId: entry.ulasanId } } };
+  }
+
+  const now = new Date();
+  return {
+    updateOne: {
+      filter: { ulasanId: entry.ulasanId },
+      update: {
+        $set: { ...entry.doc, updatedAt: now },
+        $setOnInsert: { createdAt: now }
+      },
+      upsert: true
+    }
+  };
+};
+
+// File delta yang belum diimpor, urut sesuai run (file yang sudah diimpor berakhiran .applied)
+const pendingDeltaFiles = (dir) => fs.readdirSync(dir)
+  .map((name) => ({ name, match: DELTA_PATTERN.exec(name) }))
+  .filter(({ match }) => match)
+  .sort((a, b) => Number(a.match[1]) - Number(b.match[1]))
+  .map(({ name }) => path.join(dir, name));
+
+// Terapkan satu file delta (upsert/delete tanpa mengosongkan koleksi)
+const importFile = async (deltaFile) => {
+  const lines = readline.createInterface({
+    input: fs.createReadStream(deltaFile, 'utf-8'),
+    crlfDelay: Infinity
+  });
+
+  const totals = { upserted: 0, modified: 0, deleted: 0 };
+  let batch = [];
+
+  const flush = async () => {
+    if (batch.length === 0) return;
+    const result = await Sentimen.bulkWrite(batch, { ordered: false });
+    totals.upserted += result.upsertedCount;
+    totals.modified += result.modifiedCount;
+    totals.deleted += result.deletedCount;
+    batch = [];
+  };
+
+  for await (const line of lines) {
+    if (!line.trim()) continue;
+    batch.push(toOperation(JSON.parse(line)));
+    if (batch.length >= BATCH_SIZE) await flush();
+  }
+  await flush();
+  return totals;
+};
+
+// Function to import delta: file diterapkan berurutan, lalu ditandai .applied agar tidak diimpor ulang
+const importDelta = async (deltaFiles) => {
+  try {
+    await mongoose.connect(process.env.MONGO_URI);
+    console.log('✅ MongoDB terkoneksi');
+
+    if (deltaFiles.length === 0) {
+      console.log('Tidak ada file delta yang menunggu diimpor');
+    }
+    for (const deltaFile of deltaFiles) {
+      const totals = await importFile(deltaFile);
+      fs.renameSync(deltaFile, `${deltaFile}.applied`);
+      console.log(`✅ ${path.basename(deltaFile)}: ${totals.upserted} sentimen baru, ` +
+        `${totals.modified} diperbarui, ${totals.deleted} dihapus`);
+    }
+
+    console.log('🎉 Import delta selesai!');
+    process.exit(0);
+  } catch (err) {
+    console.error('❌ Error saat import delta:', err);
+    process.exit(1);
+  }
+};
+
+// Run import: file yang disebut di argumen, atau semua file delta yang belum diimpor
+const args = process.argv.slice(2);
+importDelta(args.length > 0 ? args : pendingDeltaFiles(DELTA_DIR));
@@ -1,4 +1,10 @@
 const mongoose = require('mongoose');
+const axios = require('axios');
+
+const { SCORING_SERVICE_URL, SCORING_SERVICE_TIMEOUT } = require('../config/scoringService');
+
+// Jumlah ulasan yang discoring dengan heuristik karena layanan scoring tidak terjangkau
+let heuristicFallbacks = 0;
 
 // Skema untuk aspek sentimen
 const aspekSchema = new mongoose.Schema({
@@ -86,8 +92,24 @@ sentimenSchema.pre('save', function(next) {
   next();
 });
 
-// Metode untuk membuat sentimen dari ulasan
-sentimenSchema.statics.createFromReview = async function(review) {
+// Scoring lewat layanan Python agar hasilnya sama dengan analisis batch
+const scoreWithService = async (review) => {
+  const response = await axios.post(`${SCORING_SERVICE_URL}/score`, {
+    komentar: review.komentar,
+    rating: review.rating
+  }, { timeout: SCORING_SERVICE_TIMEOUT });
+
+  const { skor, label, aspek, alasan } = response.data;
+  return { skor, label, aspek, alasan };
+};
+
+// Hanya error jaringan/timeout (tanpa respons dari layanan) yang boleh diganti heuristik;
+// respons 4xx/5xx berarti request atau layanannya salah dan harus terlihat
+const isServiceUnavailable = (err) => Boolean(err.isAxiosError && err.request && !err.response);
+
+// Heuristik cadangan (rating dan kata kunci) jika layanan scoring tidak tersedia.
+// Catatan API: skor memakai skala 0-10 seperti analisis batch (sebelumnya heuristik ini memberi 0-1)
+const scoreWithHeuristic = (review) => {
   const rating = review.rating;
   
   // Tentukan label sentimen berdasarkan rating
@@ -95,8 +117,8 @@ sentimenSchema.statics.createFromReview = async function(review) {
   if (rating >= 4) label = 'positive';
   else if (rating <= 2) label = 'negative';
   
-  // Hitung skor sederhana berkisar 0-1
-  const skor = (rating - 1) / 4; // Transformasi 1-5 menjadi 0-1
+  // Hitung skor sederhana berkisar 0-10 (skala yang sama dengan analisis batch)
+  const skor = ((rating - 1) / 4) * 10; // Transformasi 1-5 menjadi 0-10
   
   // Ektraksi aspek-aspek sentimen
   const aspek = {
@@ -171,6 +193,23 @@ sentimenSchema.statics.createFromReview = async function(review) {
     alasan += `Pelanggan mengkritisi ${aspekNegatif.join(', ')}. `;
   }
   
+  return { skor, label, aspek, alasan };
+};
+
+// Metode untuk membuat sentimen dari ulasan
+sentimenSchema.statics.createFromReview = async function(review) {
+  let hasil;
+  try {
+    hasil = await scoreWithService(review);
+  } catch (err) {
+    if (!isServiceUnavailable(err)) throw err;
+    heuristicFallbacks += 1;
+    console.warn(`Layanan scoring tidak tersedia (${err.code || err.message}); ` +
+      `memakai heuristik (total ${heuristicFallbacks} ulasan)`);
+    hasil = scoreWithHeuristic(review);
+  }
+  const { skor, label, aspek, alasan } = hasil;
+  
   // Buat objek sentimen
   return this.create({
     ulasanId: review._id,
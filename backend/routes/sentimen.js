@@ -1,10 +1,14 @@
 // routes/sentimen.js - API routes untuk ulasan sentimen
 const express = require('express');
+const axios = require('axios');
 const router = express.Router();
 const UlasanSentimen = require('../models/sentimen');
 const Produk = require('../models/produk');
 const winston = require('winston');
 
+// Layanan scoring Python yang juga melayani query indeks kata sentimen
+const { SCORING_SERVICE_URL } = require('../config/scoringService');
+
 // Kamus kata positif dalam Bahasa Indonesia
 const positiveWords = [
   'bagus', 'pas', 'sesuai', 'pengiriman', 'nyaman', 'cepat', 'banget', 
@@ -424,4 +428,45 @@ router.get('/analysis', async (req, res) => {
   }
 });
 
+// @route   GET api/sentimen/kata
+// @desc    Ulasan yang mengandung kata sentimen tertentu (?kata=luntur,kekecilan&produk=&label=&semua=1&limit=).
+//          Hanya kata/frasa dari leksikon yang terindeks; kata tunggal juga cocok dengan frasa yang
+//          memuatnya ('luntur' -> 'warna luntur', 'dicuci luntur')
+// @access  Public
+router.get('/kata', async (req, res) => {
+  const kata = (req.query.kata || '').trim();
+  if (!kata) {
+    return res.status(400).json({ msg: 'Parameter kata wajib diisi' });
+  }
+  const limit = Math.min(parseInt(req.query.limit, 10) || 50, 500);
+  try {
+    // ulasanId dicari lewat indeks kata di layanan Python, bukan scan regex di koleksi
+    const response = await axios.get(`${SCORING_SERVICE_URL}/index/search`, {
+      params: {
+        terms: kata,
+        produk: req.query.produk,
+        label: req.query.label,
+        match: req.query.semua ? 'all' : 'any',
+        limit
+      },
+      timeout: 2000
+    });
+    const { total, ulasanId } = response.data;
+    const ulasan = await UlasanSentimen.find({ ulasanId: { $in: ulasanId } });
+    
+    // Pertahankan urutan dari indeks (urutan baris input)
+    const urutan = new Map(ulasanId.map((id, i) => [String(id), i]));
+    ulasan.sort((a, b) => urutan.get(String(a.ulasanId)) - urutan.get(String(b.ulasanId)));
+    
+    logger.info(`Keyword drill-down "${kata}": ${total} matching reviews`);
+    res.json({ total, ulasan });
+  } catch (err) {
+    if (err.response && err.response.status < 500) {
+      return res.status(err.response.status).json({ msg: err.response.data.error });
+    }
+    logger.error(`Error searching reviews by keyword: ${err.message}`);
+    res.status(500).send('Server Error');
+  }
+});
+
 module.exports = router;
\ No newline at end of file
@@ -1,4 +1,6 @@
 const express = require('express');
+const fs = require('fs/promises');
+const path = require('path');
 const router = express.Router();
 const Produk = require('../models/produk');
 const Ulasan = require('../models/ulasan');
@@ -31,4 +33,22 @@ router.get('/', async (req, res) => {
   }
 });
 
+// Ringkasan agregat hasil `python Analisis_test.py` (sentiment_summary.json)
+const SENTIMENT_SUMMARY_FILE = process.env.SENTIMENT_SUMMARY_PATH || path.join(
+  __dirname, '..', '..', 'dataset_prduk&ulasan_ke_mongodb', 'output_sentiment', 'sentiment_summary.json'
+);
+
+// Route Statistik Sentimen: label, label per rating, produk teratas, dan kata terpopuler
+router.get('/sentimen', async (req, res) => {
+  try {
+    const summary = JSON.parse(await fs.readFile(SENTIMENT_SUMMARY_FILE, 'utf8'));
+    res.json(summary);
+  } catch (err) {
+    if (err.code === 'ENOENT') {
+      return res.status(404).json({ error: 'Ringkasan sentimen belum dibuat' });
+    }
+    res.status(500).json({ error: 'Gagal mengambil statistik sentimen' });
+  }
+});
+
 module.exports = router;
@@ -1,25 +1,82 @@
 import pandas as pd
 import numpy as np
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import nltk
 from tqdm import tqdm
-import concurrent.futures
+import collections
+import argparse
+import hashlib
+import json
 import os
 import time
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Download NLTK resources
-nltk.download('vader_lexicon')
-
-# Inisialisasi VADER SentimentIntensityAnalyzer
-sia = SentimentIntensityAnalyzer()
+from lexicon_matcher import LexiconMatcher, normalize_score
+from score_cache import CACHE_FIELDS, ScoreCache
+from delta_export import DeltaExporter, OccurrenceCounts, make_ulasan_ids, pending_delta_files
+from mongo_sink import SENTIMEN_COLLECTION, MongoSink, to_document
+from parallel_scorer import ParallelScorer
+from columnar_io import TableWriter, format_numbers, iter_input, read_input, with_format
+from aggregates import SentimentAggregator
+from metrics import RunMetrics
+from charts import render_charts
+from inverted_index import IndexBuilder
 
 # Konfigurasi file
 input_file = 'Dataset_ulasan_Erigo.csv'
 output_file = 'Dataset_ulasan_Erigo_sentiment.csv'
 mongodb_ready_file = 'ulasan_sentimen_mongodb.csv'  # File khusus untuk diimpor ke MongoDB
+mongodb_delta_file = 'ulasan_sentimen_mongodb_delta.jsonl'  # Perubahan sejak run sebelumnya; satu file per run (mode delta)
 output_dir = 'output_sentiment'
+summary_file = 'sentiment_summary.json'  # Ringkasan agregat untuk grafik dan backend
+run_report_file = 'run_report.json'  # Metrik per tahap untuk run terakhir
+run_metrics_file = 'run_metrics.prom'  # Metrik yang sama dalam format textfile Prometheus
+index_file = 'sentiment_index.bin'  # Indeks terbalik kata sentimen -> ulasan (lihat inverted_index.py)
+
+# Format file output ('csv' atau 'parquet'); input Parquet dikenali dari ekstensinya
+output_format = 'csv'
+
+# Tipe kolom pada output Parquet (kolom lain mengikuti tipe input)
+result_column_types = {
+    'sentiment_score': 'float64',
+    'skor': 'float32',
+    'sentiment_label': 'category',
+    'label': 'category',
+    'posWords': 'list',
+    'negWords': 'list',
+    'preprocessed_comment': 'string',
+}
+mongodb_column_types = {
+    'ulasanId': 'string',
+    'produkId': 'string',
+    'skor': 'float32',
+    'label': 'category',
+    'aspek': 'string',
+    'alasan': 'string',
+}
+
+# Jumlah baris per chunk saat membaca CSV dalam mode streaming
+stream_chunksize = 50000
+
+# Worker pool untuk scoring: jumlah proses dan jumlah ulasan per task
+num_workers = os.cpu_count() or 4
+task_chunk_size = 2000
+
+# Cache hasil scoring antar run (SQLite)
+cache_file = os.path.join(output_dir, 'sentiment_cache.sqlite')
+
+# Snapshot leksikon gabungan (VADER + kamus Indonesia) agar start tidak perlu NLTK atau jaringan
+lexicon_snapshot_file = os.path.join(output_dir, 'lexicon_snapshot.pickle')
+
+# State fingerprint per ulasanId untuk mode delta
+delta_state_file = os.path.join(output_dir, 'mongodb_delta_state.sqlite')
+
+# Penghitung ulasan identik untuk ulasanId pada mode streaming (sementara, dihapus di akhir run)
+id_counts_file = os.path.join(output_dir, 'ulasan_id_counts.sqlite')
+
+# Koneksi MongoDB untuk menulis hasil langsung ke koleksi ds_sentimen (opsi --mongo)
+mongo_uri = os.environ.get('MONGO_URI', 'mongodb://127.0.0.1:27017/db_projek')
+mongo_batch_size = 1000
+mongo_max_in_flight = 4
+
+# Naikkan jika aturan scoring berubah agar isi cache lama tidak dipakai lagi
+scoring_version = 2
 
 # Buat direktori output jika belum ada
 if not os.path.exists(output_dir):
@@ -80,9 +137,73 @@ neg_words = {
     'tipis': 1.0, 'bolong': 1.5, 'lubang': 1.0, 'beda': 1.0, 'lama': 1.5, 'terlalu': 1.0
 }
 
-# Update lexicon VADER dengan kata Bahasa Indonesia
-sia.lexicon.update(pos_words)
-sia.lexicon.update(neg_words)
+# Kata kunci per aspek (kata positif, kata negatif); nama aspek sesuai backend/models/sentimen.js
+aspek_keywords = {
+    'harga': (['murah', 'terjangkau', 'worth'], ['mahal', 'kemahalan']),
+    'kualitas': (['bagus', 'berkualitas', 'mantap', 'keren'], ['jelek', 'buruk', 'rusak']),
+    'pengiriman': (['cepat', 'tepat'], ['lambat', 'telat', 'lama']),
+    'pelayanan': (['ramah', 'responsif', 'membantu'], ['kasar', 'tidak']),
+}
+
+# Bit (positif, negatif) untuk setiap aspek pada bitmask aspek_flags
+aspek_bits = {aspek: (1 << (2 * i), 1 << (2 * i + 1)) for i, aspek in enumerate(aspek_keywords)}
+
+def aspek_term_flags():
+    """Bitmask aspek untuk setiap kata kunci, dipisah per polaritas kamus"""
+    pos_flags = collections.defaultdict(int)
+    neg_flags = collections.defaultdict(int)
+    for aspek, (pos_keywords, neg_keywords) in aspek_keywords.items():
+        for word in pos_keywords:
+            pos_flags[word] |= aspek_bits[aspek][0]
+        for word in neg_keywords:
+            neg_flags[word] |= aspek_bits[aspek][1]
+    return pos_flags, neg_flags
+
+# Matcher dimuat sekali per proses lewat get_matcher()
+matcher = None
+
+# Timer per tahap dan counter per worker untuk run ini (lihat metrics.py)
+metrics = RunMetrics()
+
+def dictionary_version():
+    """Hash kamus Indonesia, kata kunci aspek, dan versi aturan scoring"""
+    data = json.dumps([scoring_version, sorted(pos_words.items()), sorted(neg_words.items()),
+                       sorted(aspek_keywords.items())])
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+def load_vader_lexicon():
+    """Leksikon VADER dari data NLTK lokal; hanya di-download jika belum tersedia"""
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    try:
+        return SentimentIntensityAnalyzer().lexicon
+    except LookupError:
+        import nltk
+        nltk.download('vader_lexicon', quiet=True)
+        return SentimentIntensityAnalyzer().lexicon
+
+def build_matcher(vader_lexicon):
+    """Bangun matcher dari leksikon VADER dan kamus Indonesia (kamus Indonesia menimpa VADER, kata negatif bertanda minus)"""
+    pos_flags, neg_flags = aspek_term_flags()
+    lexicon_matcher = LexiconMatcher()
+    lexicon_matcher.update(vader_lexicon)
+    lexicon_matcher.update(pos_words, polarity='pos', flags=pos_flags)
+    lexicon_matcher.update(neg_words, polarity='neg', sign=-1.0, flags=neg_flags)
+    return lexicon_matcher
+
+def get_matcher():
+    """Ambil matcher kata & frasa dari snapshot leksikon, atau bangun dari VADER lalu simpan snapshot-nya"""
+    global matcher
+    if matcher is None:
+        version = dictionary_version()
+        matcher = LexiconMatcher.load(lexicon_snapshot_file, version)
+        if matcher is None:
+            matcher = build_matcher(load_vader_lexicon())
+            matcher.save(lexicon_snapshot_file, version)
+    return matcher
+
+def init_worker():
+    """Initializer worker pool: muat leksikon sekali per worker, bukan per task"""
+    get_matcher()
 
 def preprocess_text(text):
     """Preprocessing teks: mengubah ke lowercase dan menghapus karakter non-alfanumerik"""
@@ -94,8 +215,15 @@ def preprocess_text(text):
     
     return text
 
+def score_text(comment):
+    """Skor compound teks, kata positif/negatif, dan bitmask aspek untuk satu komentar (satu kali scan matcher)"""
+    valence, pos_words_found, neg_words_found, flags = get_matcher().scan(comment)
+    text_score = round(normalize_score(valence), 4)
+    
+    return text_score, pos_words_found, neg_words_found, flags
+
 def process_chunk(chunk):
-    """Process a chunk of the DataFrame"""
+    """Process a chunk of the DataFrame (implementasi per baris, acuan perilaku untuk score_chunk)"""
     results = []
     
     for _, row in chunk.iterrows():
@@ -120,14 +248,7 @@ def process_chunk(chunk):
         else:
             # Analisis teks jika ada komentar
             if comment:
-                # Analisis sentimen dengan VADER
-                sentiment_scores = sia.polarity_scores(comment)
-                text_score = sentiment_scores['compound']
-                
-                # Ekstrak kata positif dan negatif
-                words = comment.split()
-                pos_words_found = [word for word in words if word in pos_words]
-                neg_words_found = [word for word in words if word in neg_words]
+                text_score, pos_words_found, neg_words_found, _ = score_text(comment)
             else:
                 text_score = 0  # Netral jika tidak ada komentar
             
@@ -170,264 +291,622 @@ def process_chunk(chunk):
         
     return results
 
-def analyze_sentiment():
-    """Analisis sentimen ulasan"""
-    print(f"Membaca file CSV: {input_file}")
+def _rating_values(ratings, n):
+    """Ubah rating menjadi array float64 dan mask rating yang valid (NaN tetap dihitung sebagai rating)"""
+    if ratings is None:
+        return np.full(n, np.nan), np.zeros(n, dtype=bool)
+    
+    ratings = np.asarray(ratings)
+    if ratings.dtype.kind in 'iufb':
+        return ratings.astype(np.float64), np.ones(n, dtype=bool)
+    
+    # Kolom object: hanya nilai int/float yang dipakai sebagai rating
+    has_rating = np.fromiter((isinstance(r, (int, float)) for r in ratings), dtype=bool, count=n)
+    values = np.full(n, np.nan)
+    values[has_rating] = ratings[has_rating].astype(np.float64)
+    return values, has_rating
+
+def score_chunk(comments, ratings=None):
+    """Scoring kolomnar untuk sekumpulan ulasan; hasil sama dengan process_chunk, dalam dict berisi array numpy"""
+    n = len(comments)
+    preprocessed = np.array([preprocess_text(c) for c in comments], dtype=object)
+    has_comment = preprocessed.astype(bool)
+    
+    text_score = np.zeros(n)
+    pos_found = np.full(n, '', dtype=object)
+    neg_found = np.full(n, '', dtype=object)
+    aspek_flags = np.zeros(n, dtype=np.uint8)
+    for i in np.flatnonzero(has_comment):
+        text_score[i], pos_list, neg_list, aspek_flags[i] = score_text(preprocessed[i])
+        pos_found[i] = ','.join(pos_list)
+        neg_found[i] = ','.join(neg_list)
+    
+    rating, has_rating = _rating_values(ratings, n)
+    rating_score = (rating - 3) / 2  # Konversi rating 1-5 ke skala -1 hingga 1
+    
+    # Rating + komentar: 70% rating, 30% teks; rating saja: rating; tanpa rating: teks
+    score = np.where(
+        has_rating,
+        np.where(has_comment, (rating_score * 0.7) + (text_score * 0.3), rating_score),
+        text_score
+    )
     
-    # Baca data CSV
-    df = pd.read_csv(input_file)
+    # Kasus khusus: Rating 5 tanpa komentar dianggap netral
+    rating5_empty = has_rating & (rating == 5) & ~has_comment
+    score[rating5_empty] = 0
+    
+    label = np.where(score > 0.05, 'positive',
+                     np.where(score < -0.05, 'negative', 'neutral')).astype(object)
+    
+    return {
+        'score': score,
+        'normalized_score': (score + 1) * 5,  # konversi dari -1 to 1 ke 0 to 10
+        'label': label,
+        'pos_words': pos_found,
+        'neg_words': neg_found,
+        'preprocessed_comment': preprocessed,
+        'has_empty_comment': ~has_comment,
+        'aspek_flags': aspek_flags  # Bitmask aspek untuk create_mongodb_file
+    }
+
+def chunk_arrays(chunk):
+    """Ambil komentar dan rating chunk sebagai array biasa untuk dikirim ke worker"""
+    ratings = chunk['rating'].to_numpy() if 'rating' in chunk.columns else None
+    return chunk['komentar'].to_numpy(dtype=object), ratings
+
+def attach_results(df, results):
+    """Tambahkan hasil score_chunk sebagai kolom baru pada DataFrame"""
+    df['sentiment_score'] = results['score']
+    df['skor'] = results['normalized_score']  # Skor untuk MongoDB (0-10)
+    df['sentiment_label'] = results['label']
+    df['label'] = results['label']  # Duplikat untuk MongoDB
+    df['posWords'] = results['pos_words']
+    df['negWords'] = results['neg_words']
+    df['preprocessed_comment'] = results['preprocessed_comment']
+    return df
+
+def concat_results(chunk_results):
+    """Gabungkan beberapa hasil score_chunk menjadi satu"""
+    if not chunk_results:
+        return score_chunk([])
+    return {key: np.concatenate([r[key] for r in chunk_results]) for key in chunk_results[0]}
+
+def lexicon_version():
+    """Versi leksikon untuk kunci cache; berubah jika kamus kata atau aturan scoring berubah"""
+    data = json.dumps([dictionary_version(), get_matcher().size])
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+def open_scorer(progress=None):
+    """Buat penjadwal scoring paralel sesuai num_workers dan task_chunk_size"""
+    # Pastikan snapshot leksikon sudah ada sebelum worker dijalankan
+    get_matcher()
+    return ParallelScorer(score_chunk, concat_results, workers=num_workers,
+                          chunk_size=task_chunk_size, initializer=init_worker,
+                          progress=progress)
+
+def open_cache():
+    """Buka cache hasil scoring untuk versi leksikon saat ini"""
+    return ScoreCache(cache_file, lexicon_version())
+
+def cache_lookup(chunk, cache):
+    """Cari hasil scoring chunk di cache; mengembalikan (baris yang perlu discoring, state untuk cache_merge)"""
+    if cache is None:
+        return chunk, None
+    
+    preprocessed = np.array([preprocess_text(c) for c in chunk['komentar']], dtype=object)
+    ratings = chunk['rating'].to_numpy() if 'rating' in chunk.columns else None
+    rating_values, has_rating = _rating_values(ratings, len(chunk))
+    keys = [cache.make_key(comment, rating if valid else None)
+            for comment, rating, valid in zip(preprocessed, rating_values, has_rating)]
+    cached = cache.get_many(keys)
+    
+    # Posisi baris pertama untuk setiap kunci yang belum ada di cache
+    miss_positions = {}
+    for i, (key, row) in enumerate(zip(keys, cached)):
+        if row is None and key not in miss_positions:
+            miss_positions[key] = i
+    
+    to_score = chunk.iloc[list(miss_positions.values())]
+    return to_score, (preprocessed, keys, cached, miss_positions)
+
+def cache_merge(cache, state, miss_results):
+    """Gabungkan hasil dari cache dengan hasil scoring baru, lalu simpan hasil baru ke cache"""
+    if state is None:
+        return miss_results
+    
+    preprocessed, keys, cached, miss_positions = state
+    if not keys:
+        return score_chunk([])
+    
+    miss_rows = list(zip(*(miss_results[field].tolist() for field in CACHE_FIELDS)))
+    if miss_rows:
+        cache.put_many(list(miss_positions), miss_rows)
+    
+    miss_index = {key: j for j, key in enumerate(miss_positions)}
+    rows = [row if row is not None else miss_rows[miss_index[key]]
+            for key, row in zip(keys, cached)]
+    columns = dict(zip(CACHE_FIELDS, zip(*rows)))
+    
+    return {
+        'score': np.array(columns['score'], dtype=np.float64),
+        'normalized_score': np.array(columns['normalized_score'], dtype=np.float64),
+        'label': np.array(columns['label'], dtype=object),
+        'pos_words': np.array(columns['pos_words'], dtype=object),
+        'neg_words': np.array(columns['neg_words'], dtype=object),
+        'preprocessed_comment': preprocessed,
+        'has_empty_comment': ~preprocessed.astype(bool),
+        'aspek_flags': np.array(columns['aspek_flags'], dtype=np.uint8)
+    }
+
+def print_cache_stats(cache):
+    """Tampilkan jumlah hit/miss cache"""
+    if cache is not None:
+        print(f"Cache hasil scoring: {cache.hits} hit, {cache.misses} miss ({cache.path})")
+
+def open_delta_exporter():
+    """Buka exporter untuk mode delta"""
+    return DeltaExporter(delta_state_file, os.path.join(output_dir, mongodb_delta_file))
+
+def open_mongo_sink():
+    """Buka koneksi ke koleksi ds_sentimen untuk opsi --mongo"""
+    return MongoSink.connect(mongo_uri, batch_size=mongo_batch_size, max_in_flight=mongo_max_in_flight)
+
+def print_mongo_stats(counts):
+    """Tampilkan ringkasan hasil upsert ke MongoDB"""
+    print(f"MongoDB ({mongo_uri}): {counts['upserted']} dokumen baru, "
+          f"{counts['modified']} diperbarui, {counts['matched']} cocok")
+
+def print_delta_stats(counts, delta_path):
+    """Tampilkan ringkasan perubahan pada file delta dan jumlah file yang belum diimpor"""
+    print(f"File delta MongoDB disimpan di: {delta_path}")
+    print(f"Perubahan: {counts['insert']} baru, {counts['update']} berubah, "
+          f"{counts['delete']} dihapus, {counts['unchanged']} tetap")
+    pending = pending_delta_files(os.path.join(output_dir, mongodb_delta_file))
+    if len(pending) > 1:
+        print(f"{len(pending)} file delta menunggu diimpor; jalankan backend/importSentimenDelta.js")
+
+def save_summary(aggregator):
+    """Simpan ringkasan agregat ke output_dir dan kembalikan ringkasannya"""
+    summary = aggregator.save(os.path.join(output_dir, summary_file))
+    print(f"Ringkasan statistik disimpan di: {os.path.join(output_dir, summary_file)}")
+    return summary
+
+def open_index_builder():
+    """IndexBuilder untuk file indeks di output_dir"""
+    return IndexBuilder(os.path.join(output_dir, index_file))
+
+def finish_index(builder):
+    """Tulis indeks kata sentimen ke disk"""
+    with metrics.stage('index'):
+        postings = builder.finish()
+    print(f"Indeks kata sentimen ({postings} posting) disimpan di: {builder.path}")
+
+def analyze_sentiment(use_cache=True, delta=False, to_mongo=False, build_index=True):
+    """Analisis sentimen ulasan; mengembalikan DataFrame hasil dan ringkasan agregat"""
+    print(f"Membaca file input: {input_file}")
+    
+    # Baca data CSV atau Parquet
+    with metrics.stage('read') as stage:
+        df = read_input(input_file)
+        stage.rows += len(df)
     total_reviews = len(df)
+    metrics.rows += total_reviews
     
     print(f"Menganalisis sentimen untuk {total_reviews} ulasan...")
     
-    # Bagi dataframe menjadi beberapa chunk untuk processing paralel
-    num_workers = os.cpu_count() or 4
-    chunk_size = max(1, total_reviews // num_workers)
-    chunks = [df.iloc[i:i+chunk_size] for i in range(0, total_reviews, chunk_size)]
-    
     start_time = time.time()
-    
-    # Proses chunk secara paralel
-    results = []
-    with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
-        chunk_results = list(tqdm(
-            executor.map(process_chunk, chunks), 
-            total=len(chunks),
-            desc="Processing chunks"
-        ))
-        
-        # Flatten results
-        for chunk_result in chunk_results:
-            results.extend(chunk_result)
-    
-    # Tambahkan hasil ke DataFrame
-    df['sentiment_score'] = [r['score'] for r in results]
-    df['skor'] = [r['normalized_score'] for r in results]  # Skor untuk MongoDB (0-10)
-    df['sentiment_label'] = [r['label'] for r in results]
-    df['label'] = [r['label'] for r in results]  # Duplikat untuk MongoDB
-    df['posWords'] = [r['pos_words'] for r in results]
-    df['negWords'] = [r['neg_words'] for r in results]
-    df['preprocessed_comment'] = [r['preprocessed_comment'] for r in results]
+    with metrics.stage('lexicon'):
+        get_matcher()
+    
+    # Ambil hasil yang sudah ada di cache; hanya sisanya yang discoring
+    with metrics.stage('cache_lookup', rows=total_reviews):
+        cache = open_cache() if use_cache else None
+        to_score, cache_state = cache_lookup(df, cache)
+    
+    # Proses paralel dalam task kecil; hasil disusun ulang sesuai urutan baris
+    with tqdm(total=len(to_score), desc="Processing ulasan", unit=" ulasan") as pbar, \
+            open_scorer(progress=pbar) as scorer:
+        with metrics.stage('scoring', rows=len(to_score)):
+            scorer.submit(None, *chunk_arrays(to_score))
+            (_, miss_results), = scorer.drain()
+        metrics.add_worker_stats(scorer.worker_stats)
+    
+    # Gabungkan hasil scoring dengan hasil dari cache lalu tambahkan ke DataFrame
+    with metrics.stage('merge', rows=total_reviews):
+        results = cache_merge(cache, cache_state, miss_results)
+        attach_results(df, results)
+    aggregator = SentimentAggregator()
+    with metrics.stage('aggregate', rows=total_reviews):
+        aggregator.update(df)
     
     end_time = time.time()
     processing_time = end_time - start_time
     
     print(f"Analisis selesai dalam {processing_time:.2f} detik")
     print(f"Kecepatan: {total_reviews / processing_time:.2f} ulasan per detik")
+    print_cache_stats(cache)
+    if cache is not None:
+        cache.close()
     
     # Simpan hasil ke CSV
     print(f"Menyimpan hasil ke {output_file}")
-    df.to_csv(output_file, index=False)
+    with metrics.stage('write_output', rows=total_reviews), \
+            TableWriter(output_file, result_column_types) as writer:
+        writer.write(df)
     
     # Buat file khusus untuk MongoDB
-    create_mongodb_file(df)
-    
-    return df
+    with metrics.stage('mongodb', rows=total_reviews):
+        delta_exporter = open_delta_exporter() if delta else None
+        mongo_sink = open_mongo_sink() if to_mongo else None
+        mongo_df = create_mongodb_file(df, delta_exporter=delta_exporter, mongo_sink=mongo_sink,
+                                       aspek_flags=results['aspek_flags'])
+        delta_counts = delta_exporter.finish() if delta_exporter is not None else None
+        mongo_counts = mongo_sink.close() if mongo_sink is not None else None
+    if delta_counts is not None:
+        print_delta_stats(delta_counts, delta_exporter.delta_path)
+    if mongo_counts is not None:
+        print_mongo_stats(mongo_counts)
+    
+    if build_index:
+        builder = open_index_builder()
+        with metrics.stage('index', rows=total_reviews):
+            builder.add(mongo_df, df['posWords'], df['negWords'])
+        finish_index(builder)
+    
+    return df, save_summary(aggregator)
 
-def create_mongodb_file(df):
-    """Buat file CSV yang diformat khusus untuk MongoDB"""
-    # Salin DataFrame
-    mongo_df = df.copy()
-    
-    # Pastikan kolom yang diperlukan ada
-    required_fields = {
-        'ulasanId': 'Unique identifier',
-        'produkId': 'Product ID',
-        'komentarUlasan': 'The review text',
-        'ratingUlasan': 'Rating score',
-        'pengguna': 'User who wrote the review',
-        'skor': 'Sentiment score (0-10)',
-        'label': 'Sentiment label (positif/netral/negatif)',
-        'aspek': 'Aspect analysis',
-        'alasan': 'Reason for sentiment score'
-    }
+def analyze_sentiment_streaming(chunksize=stream_chunksize, use_cache=True, delta=False, to_mongo=False,
+                                build_index=False):
+    """Analisis sentimen per chunk untuk file yang lebih besar dari RAM; mengembalikan ringkasan agregat"""
+    print(f"Membaca file input secara streaming: {input_file} (chunksize={chunksize})")
+    
+    max_pending_chunks = 3  # Batas chunk yang menunggu di memori
+    
+    aggregator = SentimentAggregator()
+    
+    start_time = time.time()
+    cache = open_cache() if use_cache else None
+    delta_exporter = open_delta_exporter() if delta else None
+    mongo_sink = open_mongo_sink() if to_mongo else None
+    id_counts = OccurrenceCounts(id_counts_file)
+    
+    # Chunk pertama menimpa file lama beserta header, sisanya di-append
+    result_writer = TableWriter(output_file, result_column_types)
+    mongo_writer = open_mongodb_writer() if mongo_sink is None else None
+    index_builder = open_index_builder() if build_index else None
+    
+    def write_chunk(df_chunk, cache_state, read_at, miss_results):
+        rows = len(df_chunk)
+        metrics.rows += rows
+        with metrics.stage('merge', rows=rows):
+            results = cache_merge(cache, cache_state, miss_results)
+            attach_results(df_chunk, results)
+        
+        with metrics.stage('write_output', rows=rows):
+            result_writer.write(df_chunk)
+        with metrics.stage('mongodb', rows=rows):
+            mongo_df = create_mongodb_file(df_chunk, writer=mongo_writer, id_counts=id_counts,
+                                           delta_exporter=delta_exporter, mongo_sink=mongo_sink,
+                                           aspek_flags=results['aspek_flags'])
+        if index_builder is not None:
+            with metrics.stage('index', rows=rows):
+                index_builder.add(mongo_df, df_chunk['posWords'], df_chunk['negWords'])
+        
+        with metrics.stage('aggregate', rows=rows):
+            aggregator.update(df_chunk)
+        # Latensi chunk: dari selesai dibaca sampai selesai ditulis, termasuk antre di worker
+        metrics.observe('chunk', time.perf_counter() - read_at)
+    
+    def finished_chunks(wait):
+        """Ambil chunk yang sudah selesai discoring; waktu menunggu dihitung ke tahap scoring"""
+        with metrics.stage('scoring'):
+            done = list(scorer.ready(wait=wait))
+        return done
+    
+    with metrics.stage('lexicon'):
+        get_matcher()
+    with tqdm(desc="Processing ulasan", unit=" ulasan") as pbar, \
+            open_scorer(progress=pbar) as scorer:
+        for df_chunk in metrics.timed_iter('read', iter_input(input_file, chunksize)):
+            read_at = time.perf_counter()
+            # Hanya baris yang belum ada di cache yang dikirim ke worker
+            with metrics.stage('cache_lookup', rows=len(df_chunk)):
+                to_score, cache_state = cache_lookup(df_chunk, cache)
+            with metrics.stage('scoring', rows=len(to_score)):
+                scorer.submit((df_chunk, cache_state, read_at), *chunk_arrays(to_score))
+            
+            # Tulis chunk yang sudah selesai sesuai urutan input
+            for tag, miss_results in finished_chunks(scorer.pending_jobs >= max_pending_chunks):
+                write_chunk(*tag, miss_results)
+        
+        while scorer.pending_jobs:
+            for tag, miss_results in finished_chunks(True):
+                write_chunk(*tag, miss_results)
+        metrics.add_worker_stats(scorer.worker_stats)
+    
+    id_counts.close()
+    with metrics.stage('write_output'):
+        result_writer.close()
+    if mongo_writer is not None:
+        with metrics.stage('mongodb'):
+            mongo_writer.close()
     
+    processing_time = time.time() - start_time
+    
+    print(f"Analisis selesai dalam {processing_time:.2f} detik")
+    if processing_time > 0:
+        print(f"Kecepatan: {aggregator.total / processing_time:.2f} ulasan per detik")
+    print_cache_stats(cache)
+    if cache is not None:
+        cache.close()
+    print(f"Hasil disimpan ke {output_file}")
+    if mongo_sink is not None:
+        with metrics.stage('mongodb'):
+            mongo_counts = mongo_sink.close()
+        print_mongo_stats(mongo_counts)
+    else:
+        print(f"File untuk import ke MongoDB disimpan di: {os.path.join(output_dir, mongodb_ready_file)}")
+    if delta_exporter is not None:
+        with metrics.stage('mongodb'):
+            delta_counts = delta_exporter.finish()
+        print_delta_stats(delta_counts, delta_exporter.delta_path)
+    if index_builder is not None:
+        finish_index(index_builder)
+    
+    return save_summary(aggregator)
+
+def aspek_mask(flags, aspek, label):
+    """Mask boolean baris yang aspeknya mengandung kata `label` ('positif'/'negatif')"""
+    bit = aspek_bits[aspek][0 if label == 'positif' else 1]
+    return (flags & bit) != 0
+
+def aspek_flags_from_words(pos_words_col, neg_words_col):
+    """Hitung bitmask aspek dari kolom posWords/negWords (dipisah koma)"""
+    flags = np.zeros(len(pos_words_col), dtype=np.uint8)
+    for aspek, (pos_keywords, neg_keywords) in aspek_keywords.items():
+        pos_bit, neg_bit = aspek_bits[aspek]
+        for column, keywords, bit in ((pos_words_col, pos_keywords, pos_bit),
+                                      (neg_words_col, neg_keywords, neg_bit)):
+            pattern = '(?:^|,)(?:' + '|'.join(keywords) + ')(?:,|$)'
+            flags[column.fillna('').str.contains(pattern).to_numpy()] |= bit
+    return flags
+
+def _aspek_json_table():
+    """String JSON aspek untuk setiap kombinasi label aspek (kode = jumlah label * 3 ** urutan aspek)"""
+    states = [{'skor': 5, 'label': 'netral'},
+              {'skor': 8, 'label': 'positif'},
+              {'skor': 3, 'label': 'negatif'}]
+    names = list(aspek_keywords)
+    table = []
+    for code in range(3 ** len(names)):
+        aspek_dict = {}
+        for position, name in enumerate(names):
+            aspek_dict[name] = states[(code // 3 ** position) % 3]
+        table.append(json.dumps(aspek_dict))
+    return np.array(table, dtype=object)
+
+def create_aspek_json(flags):
+    """Kolom aspek untuk MongoDB (format Map/Dictionary dalam format String JSON)"""
+    codes = np.zeros(len(flags), dtype=np.int64)
+    for position, aspek in enumerate(aspek_keywords):
+        positive = aspek_mask(flags, aspek, 'positif')
+        negative = aspek_mask(flags, aspek, 'negatif') & ~positive
+        codes += 3 ** position * (positive * 1 + negative * 2)
+    return _aspek_json[codes]
+
+# String JSON aspek untuk setiap kombinasi label, dihitung sekali
+_aspek_json = _aspek_json_table()
+
+def open_mongodb_writer():
+    """Writer untuk file MongoDB (CSV atau Parquet sesuai ekstensi mongodb_ready_file)"""
+    return TableWriter(os.path.join(output_dir, mongodb_ready_file), mongodb_column_types)
+
+def mongodb_frame(df, id_counts=None, aspek_flags=None):
+    """Petakan DataFrame hasil analisis ke kolom dokumen ds_sentimen dengan operasi kolom"""
     # Map ke format MongoDB
-    mongo_df['ulasanId'] = mongo_df.apply(lambda row: str(row.name), axis=1)  # Gunakan index sebagai ID
+    mongo_df = pd.DataFrame(index=df.index)
+    
+    # ID stabil dari ID sumber atau isi ulasan (bukan index DataFrame)
+    mongo_df['ulasanId'] = make_ulasan_ids(df, {} if id_counts is None else id_counts)
     
     # Jika kolom 'produk_id' ada, gunakan itu
-    if 'produk_id' in mongo_df.columns:
-        mongo_df['produkId'] = mongo_df['produk_id']
+    if 'produk_id' in df.columns:
+        mongo_df['produkId'] = df['produk_id']
     # Jika tidak ada, coba 'produk'
-    elif 'produk' in mongo_df.columns:
-        mongo_df['produkId'] = mongo_df['produk']
+    elif 'produk' in df.columns:
+        mongo_df['produkId'] = df['produk']
     # Jika keduanya tidak ada, gunakan placeholder
     else:
         mongo_df['produkId'] = "unknown"
     
     # Salin konten ulasan
-    mongo_df['komentarUlasan'] = mongo_df['komentar']
+    mongo_df['komentarUlasan'] = df['komentar']
     
     # Salin rating jika ada
-    if 'rating' in mongo_df.columns:
-        mongo_df['ratingUlasan'] = mongo_df['rating']
+    if 'rating' in df.columns:
+        mongo_df['ratingUlasan'] = df['rating']
     else:
         mongo_df['ratingUlasan'] = None
     
     # Salin pengguna jika ada
-    if 'pengguna' in mongo_df.columns:
-        mongo_df['pengguna'] = mongo_df['pengguna']
+    if 'pengguna' in df.columns:
+        mongo_df['pengguna'] = df['pengguna']
     else:
         mongo_df['pengguna'] = "unknown"
     
-    # Buat kolom alasan berdasarkan skor dan kata positif/negatif
-    mongo_df['alasan'] = mongo_df.apply(
-        lambda row: f"Ulasan mendapat rating {row.get('rating', 'tidak ada')} dan mengandung kata positif: {row['posWords'] or 'tidak ada'}, kata negatif: {row['negWords'] or 'tidak ada'}", 
-        axis=1
-    )
+    mongo_df['skor'] = df['skor']
+    mongo_df['label'] = df['label']
     
-    # Kolom aspek untuk MongoDB (format Map/Dictionary dalam format String JSON)
-    def create_aspek_json(row):
-        aspek_dict = {
-            'harga': {'skor': 5, 'label': 'netral'},
-            'kualitas': {'skor': 5, 'label': 'netral'},
-            'pengiriman': {'skor': 5, 'label': 'netral'},
-            'layanan': {'skor': 5, 'label': 'netral'}
-        }
-        
-        # Sesuaikan aspek berdasarkan kata positif/negatif
-        pos_words = row['posWords'].split(',') if row['posWords'] else []
-        neg_words = row['negWords'].split(',') if row['negWords'] else []
-        
-        # Kata-kata yang terkait dengan harga
-        if any(word in pos_words for word in ['murah', 'terjangkau', 'worth']):
-            aspek_dict['harga'] = {'skor': 8, 'label': 'positif'}
-        elif any(word in neg_words for word in ['mahal', 'kemahalan']):
-            aspek_dict['harga'] = {'skor': 3, 'label': 'negatif'}
-        
-        # Kata-kata yang terkait dengan kualitas
-        if any(word in pos_words for word in ['bagus', 'berkualitas', 'mantap', 'keren']):
-            aspek_dict['kualitas'] = {'skor': 8, 'label': 'positif'}
-        elif any(word in neg_words for word in ['jelek', 'buruk', 'rusak']):
-            aspek_dict['kualitas'] = {'skor': 3, 'label': 'negatif'}
-        
-        # Kata-kata yang terkait dengan pengiriman
-        if any(word in pos_words for word in ['cepat', 'tepat']):
-            aspek_dict['pengiriman'] = {'skor': 8, 'label': 'positif'}
-        elif any(word in neg_words for word in ['lambat', 'telat', 'lama']):
-            aspek_dict['pengiriman'] = {'skor': 3, 'label': 'negatif'}
-        
-        # Kata-kata yang terkait dengan layanan
-        if any(word in pos_words for word in ['ramah', 'responsif', 'membantu']):
-            aspek_dict['layanan'] = {'skor': 8, 'label': 'positif'}
-        elif any(word in neg_words for word in ['kasar', 'tidak']):
-            aspek_dict['layanan'] = {'skor': 3, 'label': 'negatif'}
-        
-        return str(aspek_dict)  # Return sebagai string untuk CSV
+    if aspek_flags is None:
+        aspek_flags = aspek_flags_from_words(df['posWords'], df['negWords'])
+    mongo_df['aspek'] = create_aspek_json(np.asarray(aspek_flags))
     
-    mongo_df['aspek'] = mongo_df.apply(create_aspek_json, axis=1)
+    # Buat kolom alasan berdasarkan skor dan kata positif/negatif
+    rating_text = format_numbers(df['rating']) if 'rating' in df.columns else 'tidak ada'
+    pos_text = df['posWords'].where(df['posWords'] != '', 'tidak ada')
+    neg_text = df['negWords'].where(df['negWords'] != '', 'tidak ada')
+    mongo_df['alasan'] = alasan_text(rating_text, pos_text, neg_text)
+    return mongo_df
+
+def alasan_text(rating_text, pos_text, neg_text):
+    """Kalimat alasan untuk MongoDB; argumen boleh string tunggal atau Series string"""
+    return ('Ulasan mendapat rating ' + rating_text
+            + ' dan mengandung kata positif: ' + pos_text
+            + ', kata negatif: ' + neg_text)
+
+def create_mongodb_file(df, writer=None, id_counts=None, delta_exporter=None, mongo_sink=None,
+                        aspek_flags=None):
+    """Buat file CSV (atau Parquet) yang diformat khusus untuk MongoDB dan kembalikan baris MongoDB-nya"""
+    mongo_df = mongodb_frame(df, id_counts, aspek_flags)
     
-    # Pilih kolom yang diperlukan untuk MongoDB
-    columns_for_mongodb = ['ulasanId', 'produkId', 'komentarUlasan', 'ratingUlasan', 
-                           'pengguna', 'skor', 'label', 'aspek', 'alasan']
+    if delta_exporter is not None:
+        delta_exporter.process(mongo_df)
+    
+    # Tulis langsung ke MongoDB tanpa file CSV perantara
+    if mongo_sink is not None:
+        mongo_sink.write([to_document(record) for record in mongo_df.to_dict('records')])
+        return mongo_df
     
     # Simpan file untuk MongoDB
-    mongo_df[columns_for_mongodb].to_csv(os.path.join(output_dir, mongodb_ready_file), index=False)
+    if writer is not None:
+        writer.write(mongo_df)
+        return mongo_df
+    with open_mongodb_writer() as writer:
+        writer.write(mongo_df)
     print(f"File untuk import ke MongoDB disimpan di: {os.path.join(output_dir, mongodb_ready_file)}")
+    return mongo_df
 
-def visualize_results(df):
-    """Buat visualisasi dari hasil analisis sentimen"""
-    # Hitung distribusi label sentimen
-    sentiment_counts = df['sentiment_label'].value_counts()
-    total_reviews = len(df)
+def visualize_results(summary):
+    """Buat visualisasi dari ringkasan agregat hasil analisis sentimen (lihat charts.py)"""
+    rendered, skipped = render_charts(summary, output_dir, workers=num_workers)
+    print(f"Grafik: {rendered} dirender, {skipped} tidak berubah")
+
+def print_summary(summary, charts=True, index=True, mongo=False):
+    """Tampilkan ringkasan hasil analisis dan daftar file yang dihasilkan"""
+    total_reviews = summary['total']
+    positive_reviews = summary['labels']['positive']
+    neutral_reviews = summary['labels']['neutral']
+    negative_reviews = summary['labels']['negative']
     
-    # 1. Pie chart distribusi sentimen
-    plt.figure(figsize=(10, 6))
-    plt.pie(sentiment_counts, labels=sentiment_counts.index, autopct='%1.1f%%', 
-            colors=['#4CAF50', '#FFC107', '#F44336'])
-    plt.title('Distribusi Sentimen Ulasan')
-    plt.savefig(os.path.join(output_dir, 'sentiment_distribution.png'))
-    plt.close()
-    
-    # 2. Analisis kata positif dan negatif yang paling sering muncul
-    pos_words_all = ','.join(df['posWords'].dropna()).split(',')
-    pos_words_all = [word for word in pos_words_all if word]  # Filter empty strings
-    pos_words_count = pd.Series(pos_words_all).value_counts().head(10)
-
-    neg_words_all = ','.join(df['negWords'].dropna()).split(',')
-    neg_words_all = [word for word in neg_words_all if word]  # Filter empty strings
-    neg_words_count = pd.Series(neg_words_all).value_counts().head(10)
-    
-    # 3. Visualisasi kata positif teratas
-    plt.figure(figsize=(12, 6))
-    if not pos_words_count.empty:
-        sns.barplot(x=pos_words_count.values, y=pos_words_count.index, palette='Greens_r')
-        plt.title('10 Kata Positif Terpopuler')
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, 'top_positive_words.png'))
-    plt.close()
-    
-    # 4. Visualisasi kata negatif teratas
-    plt.figure(figsize=(12, 6))
-    if not neg_words_count.empty:
-        sns.barplot(x=neg_words_count.values, y=neg_words_count.index, palette='Reds_r')
-        plt.title('10 Kata Negatif Terpopuler')
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, 'top_negative_words.png'))
-    plt.close()
-    
-    # 5. Hubungan antara rating dan sentimen
-    if 'rating' in df.columns:
-        plt.figure(figsize=(10, 6))
-        cross_tab = pd.crosstab(df['rating'], df['sentiment_label'], normalize='index') * 100
-        cross_tab.plot(kind='bar', stacked=True, colormap='RdYlGn')
-        plt.title('Distribusi Sentimen Berdasarkan Rating')
-        plt.xlabel('Rating')
-        plt.ylabel('Persentase')
-        plt.legend(title='Sentimen')
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, 'sentiment_by_rating.png'))
-        plt.close()
-    
-    # 6. Jika ada kolom produk, buat analisis per produk
-    if 'produk' in df.columns:
-        # Ambil produk dengan jumlah ulasan terbanyak (top 10)
-        top_products = df['produk'].value_counts().head(10).index
-        
-        # Filter ulasan hanya untuk produk teratas
-        df_top_products = df[df['produk'].isin(top_products)]
-        
-        # Hitung sentimen per produk
-        sentiment_by_product = pd.crosstab(
-            df_top_products['produk'], 
-            df_top_products['sentiment_label'],
-            normalize='index'
-        ) * 100
-        
-        # Visualisasi sentimen per produk
-        plt.figure(figsize=(14, 8))
-        sentiment_by_product.plot(kind='barh', stacked=True, colormap='RdYlGn')
-        plt.title('Analisis Sentimen per Produk (Top 10)')
-        plt.xlabel('Persentase')
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, 'sentiment_by_product.png'))
-        plt.close()
-
-def main():
+    print(f"\nRingkasan Analisis Sentimen:")
+    print(f"Total ulasan yang dianalisis: {total_reviews}")
+    if total_reviews:
+        print(f"Ulasan positif: {positive_reviews} ({positive_reviews/total_reviews*100:.1f}%)")
+        print(f"Ulasan netral: {neutral_reviews} ({neutral_reviews/total_reviews*100:.1f}%)")
+        print(f"Ulasan negatif: {negative_reviews} ({negative_reviews/total_reviews*100:.1f}%)")
+    print(f"\nFile yang dihasilkan:")
+    file_type = output_format.upper()
+    print(f"1. {output_file} - File {file_type} lengkap")
+    if mongo:
+        # Mode --mongo tidak menulis file MongoDB; hasil langsung di-upsert ke koleksi
+        print(f"2. Koleksi {SENTIMEN_COLLECTION} di MongoDB - Hasil di-upsert langsung (tanpa file impor)")
+    else:
+        print(f"2. {os.path.join(output_dir, mongodb_ready_file)} - File {file_type} untuk diimpor ke MongoDB")
+    print(f"3. {os.path.join(output_dir, summary_file)} - Ringkasan statistik (JSON)")
+    if index:
+        print(f"   {os.path.join(output_dir, index_file)} - Indeks kata sentimen per produk")
+    if charts:
+        print(f"4. {os.path.join(output_dir, 'sentiment_distribution.png')} - Visualisasi distribusi sentimen")
+        print(f"5. {os.path.join(output_dir, 'top_positive_words.png')} - Visualisasi kata positif terpopuler")
+        print(f"6. {os.path.join(output_dir, 'top_negative_words.png')} - Visualisasi kata negatif terpopuler")
+
+def parse_args(argv=None):
+    """Argumen command line"""
+    parser = argparse.ArgumentParser(description="Analisis sentimen ulasan produk")
+    parser.add_argument('--input', default=input_file,
+                        help=f"File ulasan CSV atau Parquet (default: {input_file})")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default=output_format,
+                        help="Format file output (default: csv)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Proses CSV per chunk tanpa memuat seluruh file ke memori")
+    parser.add_argument('--stream-chunksize', type=int, default=stream_chunksize,
+                        help=f"Jumlah baris yang dibaca per chunk pada mode streaming (default: {stream_chunksize})")
+    parser.add_argument('--workers', type=int, default=num_workers,
+                        help=f"Jumlah proses worker untuk scoring; 1 = tanpa pool (default: {num_workers})")
+    parser.add_argument('--chunk-size', type=int, default=task_chunk_size,
+                        help=f"Jumlah ulasan per task yang dikirim ke worker (default: {task_chunk_size})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Jangan pakai cache hasil scoring; semua ulasan discoring ulang")
+    parser.add_argument('--mongo', action='store_true',
+                        help="Upsert hasil langsung ke koleksi ds_sentimen, tanpa file CSV MongoDB")
+    parser.add_argument('--mongo-uri', default=mongo_uri,
+                        help="URI MongoDB (default: env MONGO_URI)")
+    parser.add_argument('--mongo-batch-size', type=int, default=mongo_batch_size,
+                        help=f"Jumlah dokumen per bulk_write (default: {mongo_batch_size})")
+    parser.add_argument('--mongo-in-flight', type=int, default=mongo_max_in_flight,
+                        help=f"Batas bulk_write yang berjalan bersamaan (default: {mongo_max_in_flight})")
+    parser.add_argument('--no-charts', action='store_true',
+                        help="Lewati pembuatan grafik (scoring dan ringkasan statistik saja)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Rekam cProfile per tahap ke output_sentiment/profile_<tahap>.pstats")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Ukur puncak alokasi memori Python per tahap dengan tracemalloc (lebih lambat)")
+    parser.add_argument('--delta', action='store_true',
+                        help="Tulis juga file delta per run berisi ulasan baru/berubah/terhapus sejak run sebelumnya")
+    parser.add_argument('--no-index', action='store_true',
+                        help=f"Jangan tulis indeks kata sentimen ({index_file})")
+    parser.add_argument('--index', action='store_true',
+                        help="Tulis indeks kata sentimen juga pada mode streaming "
+                             "(posting disimpan di memori sampai akhir run)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Fungsi utama program"""
-    # Analisis sentimen
-    df_results = analyze_sentiment()
+    global mongo_uri, mongo_batch_size, mongo_max_in_flight, num_workers, task_chunk_size
+    global input_file, output_file, mongodb_ready_file, output_format, metrics
+    args = parse_args(argv)
+    metrics = RunMetrics(profile=args.profile, trace_memory=args.trace_memory)
+    input_file = args.input
+    output_format = args.format
+    output_file = with_format(output_file, output_format)
+    mongodb_ready_file = with_format(mongodb_ready_file, output_format)
+    num_workers = args.workers
+    task_chunk_size = args.chunk_size
+    mongo_uri = args.mongo_uri
+    mongo_batch_size = args.mongo_batch_size
+    mongo_max_in_flight = args.mongo_in_flight
+    
+    # Indeks kata di mode streaming hanya jika diminta (lihat analyze_sentiment_streaming)
+    build_index = not args.no_index and (args.index or not args.stream)
+    if args.stream:
+        # Mode streaming: statistik dikumpulkan per chunk tanpa DataFrame lengkap
+        summary = analyze_sentiment_streaming(args.stream_chunksize, use_cache=not args.no_cache,
+                                              delta=args.delta, to_mongo=args.mongo,
+                                              build_index=build_index)
+    else:
+        _, summary = analyze_sentiment(use_cache=not args.no_cache, delta=args.delta, to_mongo=args.mongo,
+                                       build_index=build_index)
     
-    # Buat visualisasi
-    visualize_results(df_results)
+    # Buat visualisasi dari ringkasan agregat
+    if not args.no_charts:
+        with metrics.stage('charts'):
+            visualize_results(summary)
     
     # Tampilkan statistik
-    total_reviews = len(df_results)
-    positive_reviews = len(df_results[df_results['sentiment_label'] == 'positive'])
-    neutral_reviews = len(df_results[df_results['sentiment_label'] == 'neutral'])
-    negative_reviews = len(df_results[df_results['sentiment_label'] == 'negative'])
-    
-    print(f"\nRingkasan Analisis Sentimen:")
-    print(f"Total ulasan yang dianalisis: {total_reviews}")
-    print(f"Ulasan positif: {positive_reviews} ({positive_reviews/total_reviews*100:.1f}%)")
-    print(f"Ulasan netral: {neutral_reviews} ({neutral_reviews/total_reviews*100:.1f}%)")
-    print(f"Ulasan negatif: {negative_reviews} ({negative_reviews/total_reviews*100:.1f}%)")
-    print(f"\nFile yang dihasilkan:")
-    print(f"1. {output_file} - File CSV lengkap")
-    print(f"2. {os.path.join(output_dir, mongodb_ready_file)} - File CSV untuk diimpor ke MongoDB")
-    print(f"3. {os.path.join(output_dir, 'sentiment_distribution.png')} - Visualisasi distribusi sentimen")
-    print(f"4. {os.path.join(output_dir, 'top_positive_words.png')} - Visualisasi kata positif terpopuler")
-    print(f"5. {os.path.join(output_dir, 'top_negative_words.png')} - Visualisasi kata negatif terpopuler")
+    print_summary(summary, charts=not args.no_charts, index=build_index, mongo=args.mongo)
+    write_run_report(args)
+
+def write_run_report(args):
+    """Simpan metrik run (JSON dan textfile Prometheus) di output_dir"""
+    metrics.info.update({
+        'input': input_file,
+        'mode': 'stream' if args.stream else 'batch',
+        'workers': num_workers,
+        'chunk_size': task_chunk_size,
+        'format': output_format,
+        'cache': not args.no_cache,
+    })
+    report = metrics.write(os.path.join(output_dir, run_report_file),
+                           os.path.join(output_dir, run_metrics_file),
+                           profile_dir=output_dir if args.profile else None)
+    
+    print(f"\nWaktu per tahap (detik):")
+    for name, stage in sorted(report['stages'].items(), key=lambda item: -item[1]['seconds']):
+        print(f"  {name:<13} {stage['seconds']:>9.3f}")
+    if report['peak_rss_mb'] is not None:
+        print(f"Peak RSS: {report['peak_rss_mb']} MB (worker: {report['peak_rss_children_mb']} MB)")
+    print(f"Laporan run disimpan di: {os.path.join(output_dir, run_report_file)} "
+          f"dan {os.path.join(output_dir, run_metrics_file)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""Agregasi hasil sentimen dalam satu kali jalan, per chunk, tanpa menyimpan DataFrame lengkap"""
+import collections
+import json
+
+import pandas as pd
+
+# Urutan label yang dipakai di ringkasan
+LABELS = ('positive', 'neutral', 'negative')
+
+
+def _rating_key(value):
+    """Kunci rating untuk JSON: 5 dan 5.0 sama-sama menjadi '5'"""
+    value = float(value)
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def _count_terms(counter, words):
+    """Tambahkan kata dari kolom posWords/negWords (string dipisah koma)"""
+    joined = ','.join(word for word in words if isinstance(word, str) and word)
+    if joined:
+        counter.update(joined.split(','))
+
+
+def _most_common(counter, limit):
+    """Seperti Counter.most_common, tapi jumlah yang sama diurutkan per nama agar tidak bergantung pada urutan chunk"""
+    return sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))[:limit]
+
+
+def _label_dict(counts):
+    return {label: int(counts.get(label, 0)) for label in LABELS}
+
+
+class SentimentAggregator:
+    """Kumpulkan statistik sentimen chunk demi chunk.
+
+    Yang dihitung: jumlah per label, label per rating, label per produk,
+    dan frekuensi kata positif/negatif. Setiap chunk hanya dilewati sekali
+    (groupby per chunk), sehingga hasilnya sama untuk mode batch dan
+    streaming. summary() menghasilkan dict kecil yang bisa disimpan sebagai
+    JSON dan dibaca oleh visualisasi maupun backend.
+    """
+
+    def __init__(self, top_products=10, top_terms=50):
+        self.top_products = top_products
+        self.top_terms = top_terms
+        self.total = 0
+        self.labels = collections.Counter()
+        self.by_rating = collections.defaultdict(collections.Counter)
+        self.by_product = collections.defaultdict(collections.Counter)
+        self.product_totals = collections.Counter()
+        self.pos_terms = collections.Counter()
+        self.neg_terms = collections.Counter()
+
+    def update(self, df):
+        """Tambahkan satu chunk hasil analisis (kolom sentiment_label, posWords, negWords)"""
+        labels = df['sentiment_label']
+        self.total += len(df)
+        self.labels.update(labels.value_counts().to_dict())
+
+        if 'rating' in df.columns:
+            ratings = pd.to_numeric(df['rating'], errors='coerce')
+            for (rating, label), count in labels.groupby(ratings).value_counts().items():
+                self.by_rating[_rating_key(rating)][label] += int(count)
+
+        if 'produk' in df.columns:
+            for (produk, label), count in labels.groupby(df['produk']).value_counts().items():
+                self.by_product[produk][label] += int(count)
+                self.product_totals[produk] += int(count)
+
+        _count_terms(self.pos_terms, df['posWords'])
+        _count_terms(self.neg_terms, df['negWords'])
+
+    def merge(self, other):
+        """Gabungkan statistik dari aggregator lain (misalnya hasil satu shard di proses worker)"""
+        self.total += other.total
+        self.labels.update(other.labels)
+        for key, counts in other.by_rating.items():
+            self.by_rating[key].update(counts)
+        for produk, counts in other.by_product.items():
+            self.by_product[produk].update(counts)
+        self.product_totals.update(other.product_totals)
+        self.pos_terms.update(other.pos_terms)
+        self.neg_terms.update(other.neg_terms)
+
+    def summary(self):
+        """Ringkasan sebagai dict yang bisa diserialisasi ke JSON"""
+        by_rating = {
+            key: _label_dict(self.by_rating[key])
+            for key in sorted(self.by_rating, key=float)
+        }
+        top_products = [
+            {'produk': produk, 'total': total, 'labels': _label_dict(self.by_product[produk])}
+            for produk, total in _most_common(self.product_totals, self.top_products)
+        ]
+        return {
+            'total': self.total,
+            'labels': _label_dict(self.labels),
+            'rating': by_rating,
+            'produk': top_products,
+            'posWords': [{'kata': w, 'jumlah': c} for w, c in _most_common(self.pos_terms, self.top_terms)],
+            'negWords': [{'kata': w, 'jumlah': c} for w, c in _most_common(self.neg_terms, self.top_terms)],
+        }
+
+    def save(self, path):
+        """Simpan ringkasan ke file JSON dan kembalikan ringkasannya"""
+        summary = self.summary()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return summary
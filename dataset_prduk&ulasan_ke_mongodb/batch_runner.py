@@ -0,0 +1,428 @@
+"""Analisis sentimen banyak dataset toko sekaligus: manifest, shard, worker pool bersama, dan checkpoint.
+
+Contoh manifest (JSON; path relatif terhadap folder manifest):
+    {"stores": [
+        {"name": "erigo", "input": "Dataset_ulasan_Erigo.csv"},
+        {"name": "toko_b", "input": "data/toko_b.parquet", "output_dir": "output_toko_b"},
+        "data/toko_c.csv"
+    ]}
+
+Contoh:
+    python batch_runner.py manifest.json --workers 16 --shard-mb 16
+
+File CSV dipecah menjadi shard berdasarkan offset byte; batas shard selalu
+di awal baris, dicari dengan menghitung tanda kutip sehingga komentar
+multi-baris tidak terpotong. File Parquet dipecah per kelompok row group.
+Shard semua toko discoring di satu process pool bersama, dan setiap shard
+yang selesai langsung disimpan di <output_dir>/.shards beserta file penanda
+.done. Jika run terhenti, run berikutnya hanya memproses shard yang belum
+selesai. Setelah semua shard satu toko selesai, hasilnya digabung berurutan
+menjadi file hasil, file MongoDB, ringkasan, dan indeks kata toko tersebut;
+ulasanId sama dengan run tunggal Analisis_test.py.
+
+Catatan: output selalu CSV; cache scoring, mode delta, dan --mongo tidak
+dipakai di sini.
+"""
+import argparse
+import concurrent.futures
+import io
+import json
+import os
+import pickle
+import shutil
+import time
+
+
+import Analisis_test as analisis
+from aggregates import SentimentAggregator
+from charts import render_charts
+from columnar_io import csv_frame, is_parquet, pin_dtypes, read_csv
+from delta_export import offset_ulasan_ids
+from inverted_index import IndexBuilder
+from metrics import RunMetrics, write_atomic
+
+# Folder checkpoint shard di dalam output_dir setiap toko
+SHARD_DIR = '.shards'
+
+# File data setiap shard (selain penanda .done)
+SHARD_FILES = ('results.csv', 'mongodb.csv', 'pickle')
+
+# Ukuran target satu shard (MB data input)
+shard_mb = 16
+
+# Ukuran blok saat mencari batas baris CSV
+_SCAN_BLOCK = 1 << 22
+
+
+def row_starts(path, targets):
+    """Offset awal baris CSV pertama sesudah setiap offset di `targets`.
+
+    Newline di dalam tanda kutip (komentar multi-baris) bukan akhir baris:
+    sebuah newline adalah batas baris jika jumlah tanda kutip sebelumnya
+    genap. File dibaca sekali per blok; tanda kutip dihitung dengan
+    bytes.count sehingga tidak ada loop per karakter. Offset yang tidak
+    punya batas baris sesudahnya (akhir file) dilewati.
+    """
+    targets = sorted(targets)
+    starts = []
+    quotes = 0  # Jumlah tanda kutip sebelum `cursor`
+    searching = False
+    i = 0
+    block_start = 0
+    with open(path, 'rb') as f:
+        while i < len(targets):
+            block = f.read(_SCAN_BLOCK)
+            if not block:
+                break
+            cursor = 0
+            while i < len(targets):
+                if not searching:
+                    target = max(targets[i] - block_start, cursor)
+                    if target >= len(block):
+                        break
+                    quotes += block.count(b'"', cursor, target)
+                    cursor = target
+                    searching = True
+                newline = block.find(b'\n', cursor)
+                if newline == -1:
+                    break
+                quotes += block.count(b'"', cursor, newline)
+                cursor = newline + 1
+                if quotes % 2 == 0:
+                    start = block_start + cursor
+                    if not starts or starts[-1] != start:
+                        starts.append(start)
+                    searching = False
+                    i += 1
+            quotes += block.count(b'"', cursor)
+            block_start += len(block)
+    return starts
+
+
+def plan_shards(path, shard_bytes):
+    """Rencana shard untuk satu file input.
+
+    CSV: {'kind': 'csv', 'header': akhir header, 'shards': [[awal, akhir], ...]}
+    dalam offset byte. Parquet: {'kind': 'parquet', 'shards': [[row group
+    pertama, row group terakhir + 1], ...]}.
+    """
+    if is_parquet(path):
+        import pyarrow.parquet
+        metadata = pyarrow.parquet.ParquetFile(path).metadata
+        shards = []
+        first = size = 0
+        for group in range(metadata.num_row_groups):
+            size += metadata.row_group(group).total_byte_size
+            if size >= shard_bytes:
+                shards.append([first, group + 1])
+                first, size = group + 1, 0
+        if first < metadata.num_row_groups or not shards:
+            shards.append([first, metadata.num_row_groups])
+        return {'kind': 'parquet', 'shards': shards}
+
+    file_size = os.path.getsize(path)
+    header_end, = row_starts(path, [0]) or [file_size]
+    targets = range(header_end + shard_bytes, file_size, shard_bytes)
+    bounds = [header_end] + [start for start in row_starts(path, targets) if start < file_size] + [file_size]
+    shards = [[start, end] for start, end in zip(bounds, bounds[1:]) if end > start]
+    return {'kind': 'csv', 'header': header_end, 'shards': shards or [[header_end, header_end]]}
+
+
+def read_shard(path, plan, shard):
+    """Baca satu shard sebagai DataFrame (header CSV disisipkan di depan data shard)"""
+    start, end = shard
+    if plan['kind'] == 'parquet':
+        import pyarrow.parquet
+        return pin_dtypes(pyarrow.parquet.ParquetFile(path).read_row_groups(range(start, end)).to_pandas())
+    with open(path, 'rb') as f:
+        header = f.read(plan['header'])
+        f.seek(start)
+        data = f.read(end - start)
+    return read_csv(io.BytesIO(header + data))
+
+
+class Store:
+    """Satu dataset toko dari manifest beserta lokasi output dan checkpoint-nya"""
+
+    def __init__(self, name, input_path, output_dir, output_file=None):
+        self.name = name
+        self.input = input_path
+        self.output_dir = output_dir
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        self.output_file = output_file or os.path.join(output_dir, f"{stem}_sentiment.csv")
+        self.shard_dir = os.path.join(output_dir, SHARD_DIR)
+        self.plan = None
+
+    def shard_path(self, index, suffix):
+        return os.path.join(self.shard_dir, f"shard_{index:05d}.{suffix}")
+
+    def is_done(self, index):
+        """Shard selesai jika penanda .done dan semua file datanya masih ada.
+
+        File data dihapus setelah digabung, jadi jika output toko hilang
+        shard-nya otomatis discoring ulang.
+        """
+        return all(os.path.exists(self.shard_path(index, suffix)) for suffix in SHARD_FILES + ('done',))
+
+    def _fingerprint(self, shard_bytes):
+        stat = os.stat(self.input)
+        return {'input': os.path.abspath(self.input), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                'shard_bytes': shard_bytes, 'lexicon': analisis.lexicon_version(),
+                'scoring_version': analisis.scoring_version}
+
+    def prepare(self, shard_bytes, restart=False):
+        """Muat rencana shard dari checkpoint, atau buat baru jika input/leksikon berubah"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        fingerprint = self._fingerprint(shard_bytes)
+        plan_path = os.path.join(self.shard_dir, 'plan.json')
+        if not restart:
+            try:
+                with open(plan_path, encoding='utf-8') as f:
+                    plan = json.load(f)
+                if plan['fingerprint'] == fingerprint:
+                    self.plan = plan
+                    return
+            except (OSError, ValueError, KeyError):
+                pass
+
+        # Checkpoint lama tidak berlaku lagi
+        shutil.rmtree(self.shard_dir, ignore_errors=True)
+        os.makedirs(self.shard_dir)
+        self.plan = {'fingerprint': fingerprint, **plan_shards(self.input, shard_bytes)}
+        write_atomic(plan_path, json.dumps(self.plan, indent=2).encode('utf-8'))
+
+    @property
+    def merged_path(self):
+        return os.path.join(self.shard_dir, 'merged.json')
+
+    def is_merged(self):
+        return (os.path.exists(self.merged_path) and os.path.exists(self.output_file)
+                and os.path.exists(os.path.join(self.output_dir, analisis.mongodb_ready_file)))
+
+
+def load_manifest(path):
+    """Daftar Store dari file manifest JSON"""
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    stores = []
+    for entry in manifest.get('stores', []):
+        if isinstance(entry, str):
+            entry = {'input': entry}
+        if 'input' not in entry:
+            raise ValueError(f"Entri manifest tanpa 'input': {entry}")
+        input_path = os.path.join(base_dir, entry['input'])
+        name = entry.get('name') or os.path.splitext(os.path.basename(input_path))[0]
+        output_dir = os.path.join(base_dir, entry.get('output_dir', f"output_{name}"))
+        output_file = os.path.join(base_dir, entry['output_file']) if entry.get('output_file') else None
+        stores.append(Store(name, input_path, output_dir, output_file))
+    names = [store.name for store in stores]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Nama toko duplikat di manifest: {', '.join(duplicates)}")
+    return stores, manifest
+
+
+def score_shard(store, index):
+    """Task worker: scoring satu shard lalu simpan checkpoint-nya.
+
+    Fragmen CSV hasil dan MongoDB ditulis langsung (header hanya di shard
+    pertama) sehingga penggabungan cukup menyalin byte. ulasanId dibuat
+    dengan penghitung milik shard ini; penghitungnya ikut disimpan agar
+    ulasan identik antar shard bisa disesuaikan saat digabung. File .done
+    ditulis paling akhir, jadi shard yang terputus di tengah dianggap belum
+    selesai.
+    """
+    start_time = time.perf_counter()
+    df = read_shard(store.input, store.plan, store.plan['shards'][index])
+    results = analisis.score_chunk(*analisis.chunk_arrays(df))
+    analisis.attach_results(df, results)
+    id_counts = {}
+    mongo_df = analisis.mongodb_frame(df, id_counts, results['aspek_flags'])
+    aggregator = SentimentAggregator()
+    aggregator.update(df)
+
+    header = index == 0
+    write_atomic(store.shard_path(index, 'results.csv'),
+                  csv_frame(df).to_csv(index=False, header=header).encode('utf-8'))
+    write_atomic(store.shard_path(index, 'mongodb.csv'),
+                  csv_frame(mongo_df).to_csv(index=False, header=header).encode('utf-8'))
+    write_atomic(store.shard_path(index, 'pickle'), pickle.dumps({
+        'mongo_df': mongo_df,
+        'pos_words': df['posWords'],
+        'neg_words': df['negWords'],
+        'id_counts': id_counts,
+        'aggregator': aggregator,
+    }, protocol=pickle.HIGHEST_PROTOCOL))
+
+    done = {'rows': len(df), 'seconds': round(time.perf_counter() - start_time, 4), 'pid': os.getpid()}
+    write_atomic(store.shard_path(index, 'done'), json.dumps(done).encode('utf-8'))
+    return done
+
+
+def merge_store(store, build_index=True, keep_shards=False):
+    """Gabungkan checkpoint semua shard toko sesuai urutan menjadi file output toko.
+
+    Mengembalikan ringkasan agregat toko.
+    """
+    aggregator = SentimentAggregator()
+    seen_counts = {}
+    builder = IndexBuilder(os.path.join(store.output_dir, analisis.index_file)) if build_index else None
+    mongodb_path = os.path.join(store.output_dir, analisis.mongodb_ready_file)
+
+    with open(store.output_file, 'wb') as result_out, open(mongodb_path, 'wb') as mongo_out:
+        for index in range(len(store.plan['shards'])):
+            with open(store.shard_path(index, 'results.csv'), 'rb') as f:
+                shutil.copyfileobj(f, result_out)
+            with open(store.shard_path(index, 'pickle'), 'rb') as f:
+                shard = pickle.load(f)
+
+            mongo_df = shard['mongo_df']
+            ids = mongo_df['ulasanId'].to_numpy(dtype=object)
+            fixed_ids = offset_ulasan_ids(ids, shard['id_counts'], seen_counts)
+            if fixed_ids is ids:
+                with open(store.shard_path(index, 'mongodb.csv'), 'rb') as f:
+                    shutil.copyfileobj(f, mongo_out)
+            else:
+                # Ada ulasan identik dengan shard sebelumnya: tulis ulang fragmen dengan ID yang benar
+                mongo_df['ulasanId'] = fixed_ids
+                mongo_out.write(csv_frame(mongo_df).to_csv(index=False, header=index == 0).encode('utf-8'))
+
+            if builder is not None:
+                builder.add(mongo_df, shard['pos_words'], shard['neg_words'])
+            aggregator.merge(shard['aggregator'])
+
+    if builder is not None:
+        builder.finish()
+    summary = aggregator.save(os.path.join(store.output_dir, analisis.summary_file))
+
+    write_atomic(store.merged_path, json.dumps({'rows': aggregator.total}).encode('utf-8'))
+    if not keep_shards:
+        for index in range(len(store.plan['shards'])):
+            for suffix in SHARD_FILES:
+                try:
+                    os.remove(store.shard_path(index, suffix))
+                except FileNotFoundError:
+                    pass
+    return summary
+
+
+def run_batch(stores, workers, shard_bytes, metrics, build_index=True, keep_shards=False, restart=False):
+    """Jadwalkan shard semua toko di satu process pool dan gabungkan setiap toko begitu shard-nya lengkap.
+
+    Mengembalikan (ringkasan per toko yang berhasil, error per toko yang gagal).
+    """
+    summaries = {}
+    errors = {}
+    pending = {}
+    with metrics.stage('plan'):
+        for store in stores:
+            try:
+                store.prepare(shard_bytes, restart=restart)
+            except (OSError, ValueError) as exc:
+                errors[store.name] = f"Gagal membaca input: {exc}"
+                print(f"[{store.name}] {errors[store.name]}")
+                continue
+            if store.is_merged():
+                summaries[store.name] = None
+                print(f"[{store.name}] sudah selesai pada run sebelumnya, dilewati")
+                continue
+            todo = [i for i in range(len(store.plan['shards'])) if not store.is_done(i)]
+            pending[store.name] = set(todo)
+            resumed = len(store.plan['shards']) - len(todo)
+            print(f"[{store.name}] {len(store.plan['shards'])} shard"
+                  + (f", {resumed} sudah selesai (dilanjutkan)" if resumed else ""))
+
+    def merge(store):
+        try:
+            with metrics.stage('merge') as stage:
+                summary = merge_store(store, build_index, keep_shards)
+                stage.rows += summary['total']
+        except Exception as exc:
+            errors[store.name] = f"Gagal menggabungkan shard: {exc}"
+            print(f"[{store.name}] {errors[store.name]}")
+            return
+        metrics.rows += summary['total']
+        summaries[store.name] = summary
+        print(f"[{store.name}] selesai: {summary['total']} ulasan -> {store.output_file}")
+
+    by_name = {store.name: store for store in stores}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=analisis.init_worker) as pool:
+        futures = {}
+        for name, todo in pending.items():
+            for index in sorted(todo):
+                futures[pool.submit(score_shard, by_name[name], index)] = (name, index)
+
+        # Toko yang semua shard-nya sudah ada di checkpoint langsung digabung
+        for name, todo in pending.items():
+            if not todo:
+                merge(by_name[name])
+
+        for future in concurrent.futures.as_completed(futures):
+            name, index = futures[future]
+            try:
+                done = future.result()
+            except Exception as exc:
+                errors.setdefault(name, f"Shard {index} gagal: {exc}")
+                print(f"[{name}] shard {index} gagal: {exc}")
+                pending[name].discard(index)
+                continue
+            metrics.add_worker_stats({done['pid']: {'tasks': 1, 'rows': done['rows'], 'seconds': done['seconds']}})
+            pending[name].discard(index)
+            if not pending[name] and name not in errors:
+                merge(by_name[name])
+    return summaries, errors
+
+
+def parse_args(argv=None):
+    """Argumen command line"""
+    parser = argparse.ArgumentParser(description="Analisis sentimen banyak dataset toko dengan shard dan checkpoint")
+    parser.add_argument('manifest', help="File manifest JSON berisi daftar dataset toko")
+    parser.add_argument('--workers', type=int, default=analisis.num_workers,
+                        help=f"Jumlah proses worker bersama untuk semua toko (default: {analisis.num_workers})")
+    parser.add_argument('--shard-mb', type=float, default=None,
+                        help=f"Ukuran target satu shard dalam MB (default: manifest 'shard_mb' atau {shard_mb})")
+    parser.add_argument('--no-charts', action='store_true', help="Lewati pembuatan grafik per toko")
+    parser.add_argument('--no-index', action='store_true', help="Jangan tulis indeks kata sentimen per toko")
+    parser.add_argument('--keep-shards', action='store_true',
+                        help="Simpan file shard setelah digabung (default: dihapus, penanda tetap disimpan)")
+    parser.add_argument('--restart', action='store_true',
+                        help="Abaikan checkpoint dan proses ulang semua toko dari awal")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Fungsi utama batch runner"""
+    args = parse_args(argv)
+    stores, manifest = load_manifest(args.manifest)
+    shard_bytes = int((args.shard_mb or manifest.get('shard_mb') or shard_mb) * 2 ** 20)
+    metrics = RunMetrics()
+    metrics.info.update({'manifest': os.path.abspath(args.manifest), 'stores': len(stores),
+                         'workers': args.workers, 'shard_bytes': shard_bytes})
+
+    # Snapshot leksikon dibuat sekali sebelum worker dijalankan
+    with metrics.stage('lexicon'):
+        analisis.get_matcher()
+    summaries, errors = run_batch(stores, args.workers, shard_bytes, metrics, build_index=not args.no_index,
+                                  keep_shards=args.keep_shards, restart=args.restart)
+
+    if not args.no_charts:
+        with metrics.stage('charts'):
+            for store in stores:
+                if summaries.get(store.name) is not None:
+                    render_charts(summaries[store.name], store.output_dir, workers=args.workers)
+
+    report_path = os.path.splitext(os.path.abspath(args.manifest))[0] + '_report.json'
+    metrics.info['failed'] = errors
+    report = metrics.write(report_path)
+    print(f"\n{len(summaries)} toko selesai, {len(errors)} gagal; {report['rows']} ulasan diproses "
+          f"dalam {report['seconds']:.2f} detik")
+    print(f"Laporan run disimpan di: {report_path}")
+    if errors:
+        for name, error in errors.items():
+            print(f"  {name}: {error}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
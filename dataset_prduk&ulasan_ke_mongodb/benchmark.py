@@ -0,0 +1,257 @@
+"""Benchmark throughput pipeline sentimen dengan dataset ulasan sintetis.
+
+Contoh:
+    python benchmark.py --sizes 10000,1000000 --workers 1,4 --output bench.json
+    python benchmark.py --sizes 10000 --compare bench.json
+
+Setiap kombinasi ukuran dataset x jumlah worker dijalankan di subprocess
+tersendiri agar peak RSS yang dilaporkan tidak tercampur antar run.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from charts import CHART_STATE_FILE
+
+# Direktori script ini (untuk import Analisis_test dari subprocess)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Kata pengisi netral untuk ulasan sintetis
+filler_words = [
+    'baju', 'kaos', 'kemeja', 'jaket', 'celana', 'ukuran', 'warna', 'bahan', 'barang', 'produk',
+    'seller', 'toko', 'kurir', 'paket', 'beli', 'pesan', 'pakai', 'dipakai', 'kemarin', 'hari',
+    'ini', 'itu', 'dan', 'yang', 'untuk', 'sudah', 'juga', 'aja', 'sih', 'nya', 'kak', 'gan',
+    'size', 'l', 'xl', 'm', 'hitam', 'putih', 'navy', 'buat', 'anak', 'suami', 'lagi', 'kali',
+]
+
+def generate_reviews(rows, seed=0, mean_words=12, length_sigma=0.6, sentiment_rate=0.3, empty_rate=0.05,
+                     rating_mix=(0.05, 0.05, 0.1, 0.25, 0.55), products=200):
+    """Buat DataFrame ulasan sintetis dengan kolom yang sama seperti Dataset_ulasan_Erigo.csv.
+
+    Panjang ulasan (jumlah kata) mengikuti distribusi lognormal dengan rata-rata
+    `mean_words` dan sigma `length_sigma` (makin besar, makin panjang ekornya);
+    `sentiment_rate` adalah peluang setiap kata diambil dari kamus
+    pos_words/neg_words (sesuai rating), sisanya kata pengisi.
+    """
+    from Analisis_test import pos_words, neg_words
+
+    rng = np.random.default_rng(seed)
+    pos_vocab = np.array(list(pos_words), dtype=object)
+    neg_vocab = np.array(list(neg_words), dtype=object)
+    filler = np.array(filler_words, dtype=object)
+
+    ratings = rng.choice(np.arange(1, 6), size=rows, p=np.asarray(rating_mix) / sum(rating_mix))
+    lengths = np.maximum(1, rng.lognormal(np.log(mean_words) - length_sigma ** 2 / 2, length_sigma,
+                                          rows).astype(int))
+    empty = rng.random(rows) < empty_rate
+
+    # Kata bersentimen condong ke kamus positif untuk rating tinggi
+    total_words = int(lengths.sum())
+    word_rating = np.repeat(ratings, lengths)
+    is_sentiment = rng.random(total_words) < sentiment_rate
+    is_positive = rng.random(total_words) < (word_rating - 0.5) / 5
+    words = filler[rng.integers(0, len(filler), total_words)]
+    pos_mask = is_sentiment & is_positive
+    neg_mask = is_sentiment & ~is_positive
+    words[pos_mask] = pos_vocab[rng.integers(0, len(pos_vocab), int(pos_mask.sum()))]
+    words[neg_mask] = neg_vocab[rng.integers(0, len(neg_vocab), int(neg_mask.sum()))]
+
+    comments = [' '.join(review) for review in np.split(words, np.cumsum(lengths)[:-1])]
+    comments = np.array(comments, dtype=object)
+    comments[empty] = ''
+
+    product_ids = rng.integers(0, products, rows)
+    return pd.DataFrame({
+        'produk_id': [f"P{p:05d}" for p in product_ids],
+        'pengguna': [f"user{u}" for u in rng.integers(0, max(1, rows // 3), rows)],
+        'produk': [f"Erigo Produk {p}" for p in product_ids],
+        'rating': ratings,
+        'komentar': comments,
+        'link': [f"https://example.com/produk/{p}" for p in product_ids],
+    })
+
+
+def generate_dataset(path, rows, seed=0, chunk_rows=500000, **options):
+    """Tulis dataset sintetis ke CSV per bagian agar ukuran 10 juta baris tetap muat di memori"""
+    written = 0
+    part = 0
+    while written < rows:
+        n = min(chunk_rows, rows - written)
+        df = generate_reviews(n, seed=seed + part, **options)
+        df.to_csv(path, index=False, mode='w' if part == 0 else 'a', header=part == 0)
+        written += n
+        part += 1
+    return path
+
+
+def run_pipeline(input_path, workers, chunksize, work_dir, charts=True):
+    """Jalankan analyze_sentiment_streaming dan ambil metrik tahapnya (dipanggil di subprocess).
+
+    Yang diukur adalah entry point pipeline yang sebenarnya, dengan cache
+    dimatikan agar setiap run benar-benar melakukan scoring. Snapshot
+    leksikon dibuat sebelum timer mulai. Latensi per chunk dihitung dari
+    chunk selesai dibaca sampai selesai ditulis, termasuk antre di worker.
+    """
+    os.chdir(work_dir)
+    import Analisis_test as analisis
+    from metrics import RunMetrics
+
+    analisis.input_file = input_path
+    analisis.output_file = os.path.join(work_dir, 'bench_sentiment.csv')
+    analisis.num_workers = workers
+
+    # Hapus state render sebelumnya agar semua grafik benar-benar dirender ulang
+    state_path = os.path.join(analisis.output_dir, CHART_STATE_FILE)
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    analisis.get_matcher()
+
+    metrics = analisis.metrics = RunMetrics()
+    start = time.perf_counter()
+    summary = analisis.analyze_sentiment_streaming(chunksize, use_cache=False)
+    if charts:
+        with metrics.stage('charts'):
+            analisis.visualize_results(summary)
+    elapsed = time.perf_counter() - start
+
+    report = metrics.report()
+    rows = summary['total']
+    scoring = report['stages'].get('scoring', {}).get('seconds')
+    latency = report['latencies'].get('chunk', {})
+    return {
+        'rows': rows,
+        'workers': workers,
+        'chunksize': chunksize,
+        'seconds': round(elapsed, 4),
+        'throughput': round(rows / elapsed, 1) if elapsed > 0 else None,
+        'stages': {name: stage['seconds'] for name, stage in report['stages'].items()},
+        'scoring_throughput': round(rows / scoring, 1) if scoring else None,
+        'chunk_latency_p50': latency.get('p50'),
+        'chunk_latency_p99': latency.get('p99'),
+        'peak_rss_mb': report['peak_rss_mb'],
+        'peak_rss_worker_mb': report['peak_rss_children_mb'],
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=script_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_case(input_path, workers, chunksize, work_dir, charts):
+    """Jalankan satu kombinasi di subprocess baru dan kembalikan hasilnya"""
+    os.makedirs(work_dir, exist_ok=True)
+    command = [sys.executable, os.path.abspath(__file__), '--run-one', input_path,
+               '--workers', str(workers), '--chunksize', str(chunksize), '--work-dir', work_dir]
+    if not charts:
+        command.append('--no-charts')
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    # Baris terakhir stdout berisi hasil JSON
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(results, baseline):
+    """Bandingkan throughput dengan file hasil benchmark sebelumnya"""
+    previous = {(r['rows'], r['workers']): r for r in baseline['results']}
+    print(f"\nPerbandingan dengan commit {baseline.get('commit')}:")
+    for result in results:
+        old = previous.get((result['rows'], result['workers']))
+        if old is None or not old['throughput']:
+            continue
+        change = (result['throughput'] / old['throughput'] - 1) * 100
+        print(f"  {result['rows']:>10} baris, {result['workers']} worker: "
+              f"{old['throughput']:.0f} -> {result['throughput']:.0f} ulasan/detik ({change:+.1f}%)")
+
+
+def parse_args(argv=None):
+    """Argumen command line"""
+    parser = argparse.ArgumentParser(description="Benchmark pipeline analisis sentimen")
+    parser.add_argument('--sizes', default='10000,1000000,10000000',
+                        help="Ukuran dataset dipisah koma (default: 10000,1000000,10000000)")
+    parser.add_argument('--workers', default=f"1,{os.cpu_count() or 4}",
+                        help="Jumlah worker dipisah koma (default: 1 dan jumlah CPU)")
+    parser.add_argument('--chunksize', type=int, default=50000,
+                        help="Jumlah baris per chunk (default: 50000)")
+    parser.add_argument('--mean-words', type=float, default=12,
+                        help="Rata-rata jumlah kata per ulasan (default: 12)")
+    parser.add_argument('--length-sigma', type=float, default=0.6,
+                        help="Sigma lognormal panjang ulasan; makin besar makin banyak ulasan sangat panjang (default: 0.6)")
+    parser.add_argument('--empty-rate', type=float, default=0.05,
+                        help="Proporsi ulasan tanpa komentar (default: 0.05)")
+    parser.add_argument('--rating-mix', default='0.05,0.05,0.1,0.25,0.55',
+                        help="Proporsi rating 1-5 dipisah koma (default: 0.05,0.05,0.1,0.25,0.55)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed generator dataset (default: 0)")
+    parser.add_argument('--data-dir', default='bench_data',
+                        help="Direktori dataset sintetis; dataset yang sudah ada dipakai ulang")
+    parser.add_argument('--no-charts', action='store_true', help="Jangan ukur tahap visualisasi")
+    parser.add_argument('--output', default='benchmark_results.json', help="File hasil JSON")
+    parser.add_argument('--compare', help="File hasil benchmark sebelumnya untuk dibandingkan")
+    parser.add_argument('--run-one', help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Fungsi utama benchmark"""
+    args = parse_args(argv)
+    sys.path.insert(0, script_dir)
+
+    if args.run_one:
+        result = run_pipeline(os.path.abspath(args.run_one), int(args.workers), args.chunksize,
+                              os.path.abspath(args.work_dir), charts=not args.no_charts)
+        print(json.dumps(result))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    worker_counts = [int(w) for w in args.workers.split(',')]
+    rating_mix = tuple(float(p) for p in args.rating_mix.split(','))
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    results = []
+    for size in sizes:
+        data_name = f"ulasan_{size}_s{args.seed}_w{args.mean_words:g}_g{args.length_sigma:g}_e{args.empty_rate:g}_r{args.rating_mix}.csv"
+        data_path = os.path.abspath(os.path.join(args.data_dir, data_name))
+        if not os.path.exists(data_path):
+            print(f"Membuat dataset sintetis {size} baris: {data_path}")
+            generate_dataset(data_path, size, seed=args.seed, mean_words=args.mean_words,
+                             length_sigma=args.length_sigma,
+                             empty_rate=args.empty_rate, rating_mix=rating_mix)
+
+        for workers in worker_counts:
+            work_dir = os.path.abspath(os.path.join(args.data_dir, f"run_{size}_{workers}"))
+            result = run_case(data_path, workers, args.chunksize, work_dir, not args.no_charts)
+            results.append(result)
+            print(f"{size:>10} baris, {workers} worker: {result['throughput']} ulasan/detik, "
+                  f"p50 {result['chunk_latency_p50']}s, p99 {result['chunk_latency_p99']}s, "
+                  f"peak RSS {result['peak_rss_mb']} MB (worker {result['peak_rss_worker_mb']} MB)")
+
+    report = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'dataset': {'seed': args.seed, 'mean_words': args.mean_words, 'length_sigma': args.length_sigma,
+                    'empty_rate': args.empty_rate, 'rating_mix': rating_mix},
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil benchmark disimpan di: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Render grafik hasil analisis sentimen dari ringkasan agregat, paralel dan inkremental"""
+import concurrent.futures
+import hashlib
+import json
+import os
+
+# Naikkan jika tampilan grafik diubah agar semua grafik dirender ulang
+CHART_VERSION = 1
+
+# File state berisi hash data terakhir per grafik (di direktori output)
+CHART_STATE_FILE = 'chart_state.json'
+
+
+def _figure(figsize):
+    """Figure baru tanpa state global pyplot (backend Agg)"""
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    return fig, fig.subplots()
+
+
+def _label_percentages(counts):
+    """Persentase label per baris (seperti crosstab normalize='index'), hanya label yang muncul"""
+    import pandas as pd
+    counts = pd.DataFrame.from_dict(counts, orient='index')
+    counts = counts.loc[:, counts.sum() > 0].sort_index(axis=1)
+    return counts.div(counts.sum(axis=1), axis=0) * 100
+
+
+def draw_distribution(data, path):
+    """Pie chart distribusi sentimen"""
+    fig, ax = _figure((10, 6))
+    ax.pie([count for _, count in data], labels=[label for label, _ in data], autopct='%1.1f%%',
+           colors=['#4CAF50', '#FFC107', '#F44336'])
+    ax.set_title('Distribusi Sentimen Ulasan')
+    fig.savefig(path)
+
+
+def draw_top_words(data, path):
+    """Bar chart kata terpopuler; `data` berisi judul, palet, dan pasangan (kata, jumlah)"""
+    import seaborn as sns
+    fig, ax = _figure((12, 6))
+    words = data['words']
+    if words:
+        sns.barplot(x=[count for _, count in words], y=[word for word, _ in words],
+                    palette=data['palette'], ax=ax)
+        ax.set_title(data['title'])
+        fig.tight_layout()
+    fig.savefig(path)
+
+
+def draw_by_rating(data, path):
+    """Stacked bar distribusi sentimen per rating"""
+    fig, ax = _figure((10, 6))
+    _label_percentages(data).plot(kind='bar', stacked=True, colormap='RdYlGn', ax=ax)
+    ax.set_title('Distribusi Sentimen Berdasarkan Rating')
+    ax.set_xlabel('Rating')
+    ax.set_ylabel('Persentase')
+    ax.legend(title='Sentimen')
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def draw_by_product(data, path):
+    """Stacked bar horizontal sentimen per produk teratas"""
+    fig, ax = _figure((14, 8))
+    _label_percentages(data).sort_index().plot(kind='barh', stacked=True, colormap='RdYlGn', ax=ax)
+    ax.set_title('Analisis Sentimen per Produk (Top 10)')
+    ax.set_xlabel('Persentase')
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def chart_specs(summary):
+    """Daftar (nama file, fungsi render, data) untuk setiap grafik dari ringkasan agregat.
+
+    Data yang diberikan ke fungsi render hanya berisi tipe JSON biasa,
+    sehingga bisa di-hash dan dikirim ke proses worker.
+    """
+    labels = sorted(((label, count) for label, count in summary['labels'].items() if count > 0),
+                    key=lambda item: -item[1])
+    specs = [
+        ('sentiment_distribution.png', draw_distribution, labels),
+        ('top_positive_words.png', draw_top_words,
+         {'title': '10 Kata Positif Terpopuler', 'palette': 'Greens_r',
+          'words': [(t['kata'], t['jumlah']) for t in summary['posWords'][:10]]}),
+        ('top_negative_words.png', draw_top_words,
+         {'title': '10 Kata Negatif Terpopuler', 'palette': 'Reds_r',
+          'words': [(t['kata'], t['jumlah']) for t in summary['negWords'][:10]]}),
+    ]
+    if summary['rating']:
+        specs.append(('sentiment_by_rating.png', draw_by_rating, summary['rating']))
+    if summary['produk']:
+        specs.append(('sentiment_by_product.png', draw_by_product,
+                      {p['produk']: p['labels'] for p in summary['produk'][:10]}))
+    return specs
+
+
+def _chart_hash(filename, data):
+    payload = json.dumps([CHART_VERSION, filename, data], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render(draw, data, path):
+    _init_worker()
+    draw(data, path)
+    return path
+
+
+def render_charts(summary, output_dir, workers=None):
+    """Render grafik yang datanya berubah sejak render terakhir.
+
+    Grafik dengan hash data yang sama dengan render sebelumnya (dan file
+    PNG-nya masih ada) dilewati. Sisanya dirender bersamaan di process
+    pool. Mengembalikan (jumlah dirender, jumlah dilewati).
+    """
+    state_path = os.path.join(output_dir, CHART_STATE_FILE)
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+
+    todo = []
+    skipped = 0
+    for filename, draw, data in chart_specs(summary):
+        path = os.path.join(output_dir, filename)
+        digest = _chart_hash(filename, data)
+        if state.get(filename) == digest and os.path.exists(path):
+            skipped += 1
+            continue
+        todo.append((filename, digest, draw, data, path))
+
+    workers = min(len(todo), workers or os.cpu_count() or 1)
+    if workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(_render, draw, data, path): (filename, digest)
+                       for filename, digest, draw, data, path in todo}
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+                filename, digest = futures[future]
+                state[filename] = digest
+    else:
+        for filename, digest, draw, data, path in todo:
+            _render(draw, data, path)
+            state[filename] = digest
+
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    return len(todo), skipped
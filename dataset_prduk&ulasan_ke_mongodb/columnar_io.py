@@ -0,0 +1,201 @@
+"""Baca/tulis tabel pipeline dalam format CSV atau Parquet (kolomnar, bertipe)"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# Ekstensi file yang dianggap Parquet
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+# Kolom numerik yang selalu dibaca sebagai float64. Tanpa ini dtype dipilih
+# per chunk: chunk tanpa nilai kosong menjadi int64 ("4") sedangkan chunk
+# dengan nilai kosong menjadi float64 ("4.0"), sehingga mode batch dan
+# streaming menulis nilai yang berbeda.
+FLOAT_COLUMNS = ('rating',)
+
+# Kolom rating yang ditulis ke CSV seperti di input: nilai bulat tanpa ".0"
+RATING_COLUMNS = ('rating', 'ratingUlasan')
+
+# Kolom teks input yang selalu dibaca sebagai string, agar chunk/shard yang
+# kebetulan berisi angka saja (misalnya komentar "5") tidak menjadi int64
+TEXT_COLUMNS = ('produk_id', 'produk', 'pengguna', 'komentar', 'link')
+
+
+def is_parquet(path):
+    return os.path.splitext(path)[1].lower() in PARQUET_EXTENSIONS
+
+
+def with_format(path, file_format):
+    """Ganti ekstensi file sesuai format ('csv' atau 'parquet')"""
+    return os.path.splitext(path)[0] + '.' + file_format
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("pyarrow diperlukan untuk format parquet (pip install pyarrow)") from exc
+    return pyarrow
+
+
+def pin_dtypes(df):
+    """Samakan dtype kolom input (FLOAT_COLUMNS, TEXT_COLUMNS) agar tidak bergantung pada isi chunk"""
+    for column in FLOAT_COLUMNS:
+        if column in df.columns and pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = df[column].astype('float64')
+    for column in TEXT_COLUMNS:
+        if column in df.columns and df[column].dtype != object:
+            values = df[column]
+            df[column] = values.astype(str).astype(object).where(values.notna(), None)
+    return df
+
+
+def format_numbers(values):
+    """Teks angka per nilai: nilai bulat tanpa ".0" (5.0 -> "5"), selain itu str() biasa (4.5, nan)"""
+    values = pd.Series(values)
+    if not pd.api.types.is_numeric_dtype(values):
+        return values.astype(str)
+    values = values.astype('float64')
+    text = values.astype(str)
+    integral = np.isfinite(values) & (values == np.floor(values)) & (values.abs() < 2 ** 53)
+    text[integral] = values[integral].astype(np.int64).astype(str)
+    return text
+
+
+def csv_frame(df):
+    """Salinan DataFrame untuk ditulis ke CSV, dengan RATING_COLUMNS diformat lewat format_numbers"""
+    columns = [column for column in RATING_COLUMNS
+               if column in df.columns and pd.api.types.is_float_dtype(df[column])]
+    if not columns:
+        return df
+    df = df.copy()
+    for column in columns:
+        values = df[column]
+        df[column] = format_numbers(values).astype(object).where(values.notna(), None)
+    return df
+
+
+def read_csv(source, **kwargs):
+    """pd.read_csv dengan kolom teks dibaca apa adanya sebagai string; hasilnya sudah di-pin_dtypes"""
+    result = pd.read_csv(source, dtype=dict.fromkeys(TEXT_COLUMNS, str), **kwargs)
+    if kwargs.get('chunksize'):
+        return (pin_dtypes(chunk) for chunk in result)
+    return pin_dtypes(result)
+
+
+def read_table(path, columns=None):
+    """Baca file Parquet sebagai pyarrow.Table memory-mapped, hanya kolom yang diminta"""
+    pa = _pyarrow()
+    return pa.parquet.read_table(path, columns=columns, memory_map=True)
+
+
+def read_input(path, columns=None):
+    """Baca seluruh file input (CSV atau Parquet) sebagai DataFrame"""
+    if is_parquet(path):
+        return pin_dtypes(read_table(path, columns=columns).to_pandas())
+    return read_csv(path, usecols=columns)
+
+
+def iter_input(path, chunksize, columns=None):
+    """Baca file input (CSV atau Parquet) per chunk berisi paling banyak `chunksize` baris"""
+    if not is_parquet(path):
+        yield from read_csv(path, chunksize=chunksize, usecols=columns)
+        return
+
+    pa = _pyarrow()
+    parquet_file = pa.parquet.ParquetFile(path, memory_map=True)
+    start = 0
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        chunk = batch.to_pandas()
+        # Index berlanjut antar chunk, sama seperti pd.read_csv(chunksize=...)
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield pin_dtypes(chunk)
+
+
+def _column_array(pa, series, column_type):
+    """Ubah satu kolom pandas menjadi array pyarrow sesuai tipe pipeline"""
+    if column_type == 'list':
+        # Kata dipisah koma menjadi list<string>; string kosong menjadi list kosong
+        values = [value.split(',') if isinstance(value, str) and value else [] for value in series]
+        return pa.array(values, type=pa.list_(pa.string()))
+    if column_type == 'category':
+        return pa.array(series.astype(object), type=pa.string(), from_pandas=True).dictionary_encode()
+    if column_type == 'string':
+        return pa.array(series.astype(object), type=pa.string(), from_pandas=True)
+    return pa.array(series, type=pa.type_for_alias(column_type), from_pandas=True)
+
+
+class TableWriter:
+    """Tulis DataFrame per chunk ke satu file CSV atau Parquet (sesuai ekstensi).
+
+    CSV: chunk pertama menimpa file beserta header, chunk berikutnya
+    di-append, sama dengan csv_frame(df).to_csv(index=False).
+
+    Parquet: setiap chunk menjadi row group. `column_types` menentukan tipe
+    kolom tertentu: 'list' (string dipisah koma menjadi list<string>),
+    'category' (dictionary), 'string', atau alias pyarrow seperti 'float32'.
+    Kolom lain mengikuti tipe chunk pertama; kolom teks (object) selalu
+    string agar chunk yang kebetulan kosong tidak mengubah skema.
+    """
+
+    def __init__(self, path, column_types=None):
+        self.path = path
+        self.column_types = column_types or {}
+        self.parquet = is_parquet(path)
+        self._writer = None
+        self._schema = None
+        self._first = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _to_arrow(self, df):
+        pa = _pyarrow()
+        arrays = []
+        for position, column in enumerate(df.columns):
+            series = df.iloc[:, position]
+            column_type = self.column_types.get(column)
+            if column_type is None:
+                if self._schema is not None:
+                    field_type = self._schema.field(column).type
+                    arrays.append(pa.array(series, type=field_type, from_pandas=True))
+                    continue
+                if series.dtype == object:
+                    column_type = 'string'
+            if column_type is None:
+                arrays.append(pa.array(series, from_pandas=True))
+            else:
+                arrays.append(_column_array(pa, series, column_type))
+        table = pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns])
+        if self._schema is not None and table.schema != self._schema:
+            table = table.cast(self._schema)
+        return table
+
+    def write(self, df):
+        if not self.parquet:
+            csv_frame(df).to_csv(self.path, index=False, mode='w' if self._first else 'a', header=self._first)
+            self._first = False
+            return
+
+        table = self._to_arrow(df)
+        if self._writer is None:
+            pa = _pyarrow()
+            self._schema = table.schema
+            self._writer = pa.parquet.ParquetWriter(self.path, self._schema)
+        self._writer.write_table(table)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        elif self.parquet and self._first:
+            # Tidak ada chunk sama sekali: tetap buat file kosong yang valid
+            pa = _pyarrow()
+            pa.parquet.write_table(pa.table({}), self.path)
+            self._first = False
@@ -0,0 +1,237 @@
+"""Ekspor inkremental untuk MongoDB: hanya ulasan baru, berubah, atau terhapus"""
+import json
+import os
+import re
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from mongo_sink import to_document
+from score_cache import select_in
+
+# Kolom ulasan yang dipakai untuk ulasanId jika data sumber punya ID sendiri
+SOURCE_ID_COLUMNS = ('ulasanId', 'ulasan_id', 'id_ulasan', 'review_id', 'id')
+
+# Kolom yang membentuk identitas ulasan jika tidak ada ID sumber
+CONTENT_ID_COLUMNS = ('produk_id', 'produk', 'pengguna', 'komentar', 'rating')
+
+
+def _row_hashes(df):
+    """Hash uint64 per baris dari nilai kolom yang sudah dinormalisasi ke string"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def make_ulasan_ids(df, seen_counts):
+    """Buat ulasanId yang stabil antar run.
+
+    Jika data punya kolom ID sumber, ID itu yang dipakai. Jika tidak, ID
+    adalah hash dari produk, pengguna, komentar, dan rating. Ulasan dengan
+    isi identik diberi akhiran urutan kemunculan ('-1', '-2', ...).
+    `seen_counts` (dict hash -> jumlah, atau OccurrenceCounts) dipakai
+    bersama antar chunk agar hasilnya sama antara mode batch dan streaming.
+    Dict menyimpan satu entri per ulasan berbeda di memori; mode streaming
+    memakai OccurrenceCounts agar memori tetap datar.
+    """
+    for column in SOURCE_ID_COLUMNS:
+        if column in df.columns:
+            return df[column].astype(str).to_numpy(dtype=object)
+
+    key_df = pd.DataFrame(index=df.index)
+    for column in CONTENT_ID_COLUMNS:
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if column == 'rating':
+            # Normalisasi agar 5 dan 5.0 menghasilkan ID yang sama
+            values = pd.to_numeric(values, errors='coerce').astype(np.float64)
+        key_df[column] = values.astype(str)
+
+    hashes = _row_hashes(key_df)
+    unique, inverse, counts = np.unique(hashes, return_inverse=True, return_counts=True)
+    occurrence = pd.Series(hashes).groupby(hashes).cumcount().to_numpy()
+    occurrence += _seen_before(seen_counts, unique)[inverse]
+
+    ids = np.empty(len(hashes), dtype=object)
+    for i, (h, occ) in enumerate(zip(hashes.tolist(), occurrence.tolist())):
+        ids[i] = f"{h:016x}" if occ == 0 else f"{h:016x}-{occ}"
+    _add_seen(seen_counts, unique, counts)
+    return ids
+
+
+def _seen_before(seen_counts, unique):
+    """Jumlah kemunculan sebelumnya untuk setiap hash unik (array sejajar `unique`)"""
+    if isinstance(seen_counts, OccurrenceCounts):
+        return seen_counts.get_many(unique)
+    return np.array([seen_counts.get(h, 0) for h in unique.tolist()], dtype=np.int64)
+
+
+def _add_seen(seen_counts, unique, counts):
+    if isinstance(seen_counts, OccurrenceCounts):
+        seen_counts.add_many(unique, counts)
+        return
+    for h, count in zip(unique.tolist(), counts.tolist()):
+        seen_counts[h] = seen_counts.get(h, 0) + count
+
+
+class OccurrenceCounts:
+    """Penghitung kemunculan hash ulasan untuk make_ulasan_ids, disimpan di SQLite.
+
+    Pengganti dict untuk mode streaming: jumlah ulasan berbeda tidak
+    dibatasi RAM. File di `path` hanya untuk satu run; dibuat ulang saat
+    dibuka dan dihapus di close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path):
+            os.remove(path)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute("CREATE TABLE counts (hash INTEGER PRIMARY KEY, count INTEGER)")
+
+    def get_many(self, hashes):
+        """Jumlah kemunculan sebelumnya (0 jika belum pernah) untuk array hash uint64"""
+        keys = np.asarray(hashes, dtype=np.uint64).view(np.int64).tolist()
+        found = dict(select_in(self.conn, "SELECT hash, count FROM counts WHERE hash IN ({placeholders})", keys))
+        return np.array([found.get(key, 0) for key in keys], dtype=np.int64)
+
+    def add_many(self, hashes, counts):
+        """Tambahkan `counts` ke jumlah kemunculan setiap hash"""
+        keys = np.asarray(hashes, dtype=np.uint64).view(np.int64).tolist()
+        self.conn.executemany(
+            "INSERT INTO counts (hash, count) VALUES (?, ?) "
+            "ON CONFLICT(hash) DO UPDATE SET count = count + excluded.count",
+            zip(keys, np.asarray(counts).tolist())
+        )
+
+    def close(self):
+        self.conn.close()
+        os.remove(self.path)
+
+
+def offset_ulasan_ids(ids, counts, seen_counts):
+    """Sesuaikan ulasanId dari make_ulasan_ids yang dibuat dengan penghitung terpisah.
+
+    Dipakai jika bagian data (misalnya shard) diberi ID secara terpisah lalu
+    digabung berurutan: `counts` adalah penghitung bagian ini, `seen_counts`
+    penghitung gabungan semua bagian sebelumnya (ikut diperbarui). Hasilnya
+    sama dengan make_ulasan_ids yang dijalankan berurutan dengan satu
+    penghitung. Mengembalikan `ids` apa adanya jika tidak ada yang berubah.
+    """
+    offsets = {f"{h:016x}": seen_counts[h] for h in counts if seen_counts.get(h)}
+    for h, count in counts.items():
+        seen_counts[h] = seen_counts.get(h, 0) + count
+    if not offsets:
+        return ids
+
+    ids = np.array(ids, dtype=object)
+    for i, ulasan_id in enumerate(ids.tolist()):
+        offset = offsets.get(ulasan_id[:16])
+        if offset is not None:
+            occ = int(ulasan_id[17:]) if len(ulasan_id) > 16 else 0
+            ids[i] = f"{ulasan_id[:16]}-{occ + offset}"
+    return ids
+
+
+def delta_run_path(delta_path, run_id):
+    """File delta untuk satu run: 'nama.000007.jsonl', jadi urutan nama sama dengan urutan run"""
+    root, ext = os.path.splitext(delta_path)
+    return f"{root}.{run_id:06d}{ext}"
+
+
+def pending_delta_files(delta_path):
+    """File delta yang belum diimpor (importer menambahkan akhiran '.applied'), urut sesuai run"""
+    directory, name = os.path.split(delta_path)
+    root, ext = os.path.splitext(name)
+    pattern = re.compile(rf"{re.escape(root)}\.\d{{6,}}{re.escape(ext)}$")
+    names = [entry for entry in os.listdir(directory or '.') if pattern.match(entry)]
+    names.sort(key=lambda entry: int(entry[len(root) + 1:-len(ext)]))
+    return [os.path.join(directory, entry) for entry in names]
+
+
+class DeltaExporter:
+    """Bandingkan hasil ekspor dengan run sebelumnya dan tulis perubahannya.
+
+    Fingerprint setiap ulasanId disimpan di SQLite. Setiap baris baru ditulis
+    sebagai 'insert', baris dengan fingerprint berbeda sebagai 'update', dan
+    ulasanId yang tidak muncul lagi di run ini sebagai 'delete'. File delta
+    berformat JSON Lines: {"op": ..., "ulasanId": ..., "doc": {...}}.
+
+    Setiap run menulis file delta sendiri (lihat delta_run_path), sehingga
+    beberapa run sebelum import tidak saling menimpa; importer menerapkan
+    semua file yang tertunda sesuai urutan run. State dan file baru
+    di-commit di finish(), jadi run yang gagal bisa diulang.
+    """
+
+    def __init__(self, state_path, delta_path):
+        self.state_path = state_path
+        self.counts = {'insert': 0, 'update': 0, 'delete': 0, 'unchanged': 0}
+
+        self.conn = sqlite3.connect(state_path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            "ulasan_id TEXT PRIMARY KEY, fingerprint INTEGER, run_id INTEGER) WITHOUT ROWID"
+        )
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'run_id'").fetchone()
+        self.run_id = (row[0] if row else 0) + 1
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('run_id', ?)", (self.run_id,))
+
+        # Ditulis ke nama sementara agar importer tidak membaca file setengah jadi
+        self.delta_path = delta_run_path(delta_path, self.run_id)
+        self._tmp_path = f"{self.delta_path}.tmp"
+        self.delta_file = open(self._tmp_path, 'w', encoding='utf-8')
+
+    def _write(self, op, ulasan_id, doc=None):
+        line = {'op': op, 'ulasanId': ulasan_id}
+        if doc is not None:
+            line['doc'] = doc
+        self.delta_file.write(json.dumps(line, ensure_ascii=False) + '\n')
+        self.counts[op] += 1
+
+    def process(self, mongo_df):
+        """Proses satu batch baris ekspor MongoDB (harus berisi kolom ulasanId)"""
+        ids = mongo_df['ulasanId'].tolist()
+        fingerprints = _row_hashes(mongo_df.drop(columns='ulasanId').astype(str)).view(np.int64).tolist()
+
+        previous = dict(select_in(
+            self.conn, "SELECT ulasan_id, fingerprint FROM fingerprints WHERE ulasan_id IN ({placeholders})", ids
+        ))
+
+        changed_positions = []
+        for position, (ulasan_id, fingerprint) in enumerate(zip(ids, fingerprints)):
+            old = previous.get(ulasan_id)
+            if old is None:
+                changed_positions.append((position, 'insert'))
+            elif old != fingerprint:
+                changed_positions.append((position, 'update'))
+            else:
+                self.counts['unchanged'] += 1
+
+        if changed_positions:
+            records = mongo_df.iloc[[position for position, _ in changed_positions]].to_dict('records')
+            for record, (_, op) in zip(records, changed_positions):
+                self._write(op, record['ulasanId'], to_document(record))
+
+        # Tandai semua ulasanId di batch ini sebagai masih ada pada run sekarang
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO fingerprints (ulasan_id, fingerprint, run_id) VALUES (?, ?, ?)",
+            ((ulasan_id, fingerprint, self.run_id) for ulasan_id, fingerprint in zip(ids, fingerprints))
+        )
+
+    def finish(self):
+        """Tulis record 'delete' untuk ulasan yang hilang lalu simpan state"""
+        deleted = self.conn.execute(
+            "SELECT ulasan_id FROM fingerprints WHERE run_id < ?", (self.run_id,)
+        ).fetchall()
+        for (ulasan_id,) in deleted:
+            self._write('delete', ulasan_id)
+        self.conn.execute("DELETE FROM fingerprints WHERE run_id < ?", (self.run_id,))
+
+        self.delta_file.close()
+        os.replace(self._tmp_path, self.delta_path)
+        self.conn.commit()
+        self.conn.close()
+        return self.counts
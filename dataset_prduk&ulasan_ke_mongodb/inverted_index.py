@@ -0,0 +1,381 @@
+"""Indeks terbalik kata sentimen -> ulasan, dipartisi per produk dan disimpan di disk.
+
+Format file (little endian):
+    MAGIC (8 byte) | panjang header (uint64) | header JSON | data
+
+Header berisi daftar kata terurut (ID kata = posisi di daftar), polaritas kata,
+jumlah ulasan per kata, daftar produk, dan posisi setiap bagian data.
+Data berisi direktori posting (satu baris per pasangan produk dan kata,
+terurut: kode produk, ID kata, offset byte, jumlah ulasan), posting list
+(ID ulasan terurut, disimpan sebagai selisih dalam varint), label per
+ulasan (uint8), dan ulasanId (offset uint64 + blob UTF-8). ID ulasan
+adalah nomor baris input (0, 1, 2, ...).
+
+Contoh:
+    python inverted_index.py output_sentiment/sentiment_index.bin luntur kekecilan --produk P001 --label negative
+"""
+import argparse
+import json
+import mmap
+import os
+import shutil
+import struct
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'SENTIDX2'
+
+# Kode label per ulasan pada array label
+LABEL_CODES = {'positive': 0, 'neutral': 1, 'negative': 2}
+
+
+def _varints(values):
+    """Encode array uint64 sebagai varint (7 bit per byte) sekaligus.
+
+    Mengembalikan (buffer uint8, jumlah byte per nilai).
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 10):
+        nbytes += values >= np.uint64(1 << (7 * k))
+    starts = np.cumsum(nbytes) - nbytes
+    out = np.empty(int(nbytes.sum()), dtype=np.uint8)
+    for k in range(int(nbytes.max()) if len(nbytes) else 0):
+        mask = nbytes > k
+        chunk = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7f)
+        more = np.where(nbytes[mask] > k + 1, 0x80, 0).astype(np.uint64)
+        out[starts[mask] + k] = (chunk | more).astype(np.uint8)
+    return out, nbytes
+
+
+def encode_posting_lists(doc_ids, group_starts):
+    """Encode banyak posting list yang disimpan berurutan dalam satu array sekaligus.
+
+    `group_starts` adalah posisi awal setiap posting list di `doc_ids`;
+    selisih dimulai ulang dari 0 di setiap awal list, jadi setiap list bisa
+    dibaca sendiri (lihat SentimentIndex._decode_groups). Mengembalikan
+    (bytes, offset byte awal setiap list).
+    """
+    doc_ids = np.asarray(doc_ids, dtype=np.uint64)
+    deltas = np.diff(doc_ids, prepend=np.uint64(0))
+    deltas[group_starts] = doc_ids[group_starts]
+    out, nbytes = _varints(deltas)
+    byte_starts = np.cumsum(nbytes) - nbytes
+    return out.tobytes(), byte_starts[group_starts]
+
+
+def _varint_values(data):
+    """Kebalikan _varints: array uint8 berisi varint -> array nilai"""
+    if not len(data):
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = (np.arange(len(data)) - np.repeat(starts, ends - starts + 1)) * 7
+    parts = (data & 0x7f).astype(np.uint64) << shifts.astype(np.uint64)
+    return np.add.reduceat(parts, starts).astype(np.int64)
+
+
+def _explode_words(words, doc_ids):
+    """Pecah kolom kata (dipisah koma) menjadi pasangan (kata, ID ulasan)"""
+    words = pd.Series(np.asarray(words, dtype=object), index=doc_ids)
+    words = words[words.fillna('') != ''].str.split(',').explode()
+    return words.to_numpy(dtype=object), words.index.to_numpy(dtype=np.int64)
+
+
+class IndexBuilder:
+    """Kumpulkan posting per chunk lalu tulis indeks ke disk di finish().
+
+    Chunk harus ditambahkan sesuai urutan input karena ID ulasan adalah
+    nomor baris. Selama build, setiap posting disimpan di memori sebagai
+    tiga array int (produk, kata, ulasan) ditambah label dan panjang
+    ulasanId per ulasan, jadi memori tumbuh sebanding dengan jumlah ulasan
+    (ulasanId sendiri langsung ditulis ke file sementara). Karena itu mode
+    streaming tidak membuat indeks kecuali diminta.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.doc_count = 0
+        self.terms = {}
+        self.polarity = []
+        self.products = {}
+        self._postings = []
+        self._labels = []
+        self._id_lengths = []
+        self._ids_path = f"{path}.{os.getpid()}.ids.tmp"
+        self._ids_file = open(self._ids_path, 'wb')
+
+    def _intern(self, table, values):
+        codes = np.empty(len(values), dtype=np.int64)
+        for i, value in enumerate(values):
+            code = table.get(value)
+            if code is None:
+                code = table[value] = len(table)
+            codes[i] = code
+        return codes
+
+    def add(self, mongo_df, pos_words, neg_words):
+        """Tambahkan satu chunk: baris ekspor MongoDB beserta kolom posWords/negWords"""
+        n = len(mongo_df)
+        doc_ids = np.arange(self.doc_count, self.doc_count + n, dtype=np.int64)
+        self.doc_count += n
+
+        product_codes = self._intern(self.products, mongo_df['produkId'].astype(str).tolist())
+        self._labels.append(mongo_df['label'].map(LABEL_CODES).fillna(LABEL_CODES['neutral'])
+                            .to_numpy(dtype=np.uint8))
+        encoded_ids = [ulasan_id.encode('utf-8') for ulasan_id in mongo_df['ulasanId'].astype(str).tolist()]
+        self._id_lengths.append(np.fromiter(map(len, encoded_ids), dtype=np.int64, count=n))
+        self._ids_file.write(b''.join(encoded_ids))
+
+        for column, polarity in ((pos_words, 'pos'), (neg_words, 'neg')):
+            words, word_docs = _explode_words(column, doc_ids)
+            if not len(words):
+                continue
+            before = len(self.terms)
+            term_codes = self._intern(self.terms, words.tolist())
+            self.polarity.extend([polarity] * (len(self.terms) - before))
+            self._postings.append(np.stack([product_codes[word_docs - doc_ids[0]], term_codes, word_docs]))
+
+    def finish(self):
+        """Tulis indeks ke disk (lewat file sementara) dan kembalikan jumlah posting"""
+        postings = (np.concatenate(self._postings, axis=1) if self._postings
+                    else np.zeros((3, 0), dtype=np.int64))
+        # ID kata mengikuti urutan teks kata, bukan urutan ditemukan, agar file sama
+        # berapapun pembagian chunk/shard-nya
+        terms = sorted(self.terms)
+        term_order = np.array([self.terms[term] for term in terms], dtype=np.int64)
+        polarity = [self.polarity[code] for code in term_order.tolist()]
+        remap = np.empty(len(terms), dtype=np.int64)
+        remap[term_order] = np.arange(len(terms))
+        postings[1] = remap[postings[1]]
+        # Urutkan per (produk, kata, ulasan) dan buang kata yang muncul dua kali di ulasan yang sama
+        order = np.lexsort((postings[2], postings[1], postings[0]))
+        postings = postings[:, order]
+        if postings.shape[1]:
+            keep = np.ones(postings.shape[1], dtype=bool)
+            keep[1:] = np.any(postings[:, 1:] != postings[:, :-1], axis=0)
+            postings = postings[:, keep]
+
+        # Satu posting list per (produk, kata); semua list di-encode dalam satu operasi
+        group_starts = np.flatnonzero(np.concatenate(
+            ([postings.shape[1] > 0], np.any(postings[:2, 1:] != postings[:2, :-1], axis=0))))
+        blob, byte_starts = encode_posting_lists(postings[2], group_starts)
+        dir_products = postings[0, group_starts].astype('<i4')
+        dir_terms = postings[1, group_starts].astype('<i4')
+        dir_offsets = np.append(byte_starts, len(blob)).astype('<u8')
+        dir_counts = np.diff(np.append(group_starts, postings.shape[1])).astype('<u8')
+
+        term_counts = np.zeros(len(self.terms), dtype=np.int64)
+        if postings.shape[1]:
+            np.add.at(term_counts, postings[1], 1)
+
+        labels = np.concatenate(self._labels) if self._labels else np.zeros(0, dtype=np.uint8)
+        id_offsets = np.zeros(self.doc_count + 1, dtype='<u8')
+        if self._id_lengths:
+            np.cumsum(np.concatenate(self._id_lengths), out=id_offsets[1:])
+        self._ids_file.close()
+
+        # Array 8 byte lebih dulu agar tetap rata (aligned) untuk np.frombuffer
+        arrays = (('id_offsets', id_offsets), ('dir_offsets', dir_offsets), ('dir_counts', dir_counts),
+                  ('dir_products', dir_products), ('dir_terms', dir_terms), ('labels', labels))
+        sections = {}
+        position = 0
+        for name, size in [(name, array.nbytes) for name, array in arrays] + [
+                ('postings', len(blob)), ('ids', int(id_offsets[-1]))]:
+            sections[name] = [position, size]
+            position += size
+
+        header = json.dumps({
+            'doc_count': self.doc_count,
+            'terms': terms,
+            'polarity': polarity,
+            'term_counts': term_counts.tolist(),
+            'products': list(self.products),
+            'sections': sections,
+        }, ensure_ascii=False).encode('utf-8')
+        header += b' ' * (-(len(MAGIC) + 8 + len(header)) % 8)
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            for _, array in arrays:
+                f.write(array.tobytes())
+            f.write(blob)
+            with open(self._ids_path, 'rb') as ids_file:
+                shutil.copyfileobj(ids_file, f)
+        os.remove(self._ids_path)
+        os.replace(tmp_path, self.path)
+        return postings.shape[1]
+
+
+class SentimentIndex:
+    """Baca indeks dari IndexBuilder lewat mmap dan jawab query kata/produk/label"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} bukan file indeks sentimen")
+            header_len, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_len))
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._base = len(MAGIC) + 8 + header_len
+
+        self.doc_count = header['doc_count']
+        self.terms = header['terms']
+        self.polarity = header['polarity']
+        self.term_ids = {term: i for i, term in enumerate(self.terms)}
+        self._token_terms = None
+        self.products = header['products']
+        self.product_codes = {produk: i for i, produk in enumerate(self.products)}
+        self.total_counts = header['term_counts']
+        self._sections = header['sections']
+
+        self.labels = self._array('labels', np.uint8)
+        self._id_offsets = self._array('id_offsets', '<u8')
+        self._dir_products = self._array('dir_products', '<i4')
+        self._dir_terms = self._array('dir_terms', '<i4')
+        self._dir_offsets = self._array('dir_offsets', '<u8')
+        self._dir_counts = self._array('dir_counts', '<u8')
+        self._postings = self._array('postings', np.uint8)
+        # Direktori terurut per (produk, kata): cari dengan searchsorted
+        self._dir_keys = self._dir_products.astype(np.int64) * len(self.terms) + self._dir_terms
+
+    def _array(self, section, dtype):
+        start, size = self._sections[section]
+        return np.frombuffer(self._mmap, dtype=dtype, count=size // np.dtype(dtype).itemsize,
+                             offset=self._base + start)
+
+    def close(self):
+        self.labels = self._id_offsets = self._postings = None
+        self._dir_products = self._dir_terms = self._dir_offsets = self._dir_counts = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def postings(self, term, produk=None):
+        """ID ulasan (terurut) yang mengandung `term`, untuk satu produk atau semua produk"""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return np.zeros(0, dtype=np.int64)
+        if produk is None:
+            groups = np.flatnonzero(self._dir_terms == term_id)
+        else:
+            product = self.product_codes.get(str(produk))
+            if product is None:
+                return np.zeros(0, dtype=np.int64)
+            key = product * len(self.terms) + term_id
+            position = int(np.searchsorted(self._dir_keys, key))
+            found = position < len(self._dir_keys) and self._dir_keys[position] == key
+            groups = np.array([position] if found else [], dtype=np.int64)
+        return np.sort(self._decode_groups(groups))
+
+    def _decode_groups(self, groups):
+        """ID ulasan dari beberapa posting list sekaligus (selisih dijumlahkan per list)"""
+        if not len(groups):
+            return np.zeros(0, dtype=np.int64)
+        starts, ends = self._dir_offsets[groups], self._dir_offsets[groups + 1]
+        values = _varint_values(np.concatenate([self._postings[start:end]
+                                                for start, end in zip(starts.tolist(), ends.tolist())]))
+        counts = self._dir_counts[groups].astype(np.int64)
+        totals = np.cumsum(values)
+        firsts = np.cumsum(counts) - counts
+        return totals - np.repeat(totals[firsts] - values[firsts], counts)
+
+    def expand(self, term):
+        """Kata terindeks yang cocok dengan `term`: kata itu sendiri dan frasa yang memuatnya.
+
+        Indeks menyimpan entri leksikon utuh ('warna luntur', 'dicuci
+        luntur'), jadi pencarian 'luntur' diperluas ke semua frasa tersebut.
+        """
+        if self._token_terms is None:
+            self._token_terms = {}
+            for term_id, indexed in enumerate(self.terms):
+                for token in set(indexed.split()):
+                    self._token_terms.setdefault(token, []).append(term_id)
+        term_ids = set(self._token_terms.get(term, []))
+        if term in self.term_ids:
+            term_ids.add(self.term_ids[term])
+        return [self.terms[term_id] for term_id in sorted(term_ids)]
+
+    def _matching_docs(self, term, produk):
+        lists = [self.postings(indexed, produk) for indexed in self.expand(term)]
+        if not lists:
+            return np.zeros(0, dtype=np.int64)
+        return lists[0] if len(lists) == 1 else np.unique(np.concatenate(lists))
+
+    def search(self, terms, produk=None, label=None, match='any'):
+        """ID ulasan yang mengandung salah satu (`match='any'`) atau semua (`'all'`) kata,
+        opsional dibatasi ke satu produk dan/atau satu label sentimen.
+
+        Setiap kata juga cocok dengan frasa terindeks yang memuatnya (lihat expand).
+        """
+        result = None
+        for term in terms:
+            docs = self._matching_docs(term, produk)
+            if result is None:
+                result = docs
+            elif match == 'all':
+                result = np.intersect1d(result, docs, assume_unique=True)
+            else:
+                result = np.union1d(result, docs)
+        if result is None:
+            result = np.zeros(0, dtype=np.int64)
+        if label is not None:
+            result = result[self.labels[result] == LABEL_CODES[label]]
+        return result
+
+    def ulasan_ids(self, docs):
+        """ulasanId untuk daftar ID ulasan"""
+        ids_start = self._base + self._sections['ids'][0]
+        return [self._mmap[ids_start + int(self._id_offsets[d]):ids_start + int(self._id_offsets[d + 1])].decode('utf-8')
+                for d in docs]
+
+    def term_counts(self, produk=None, polarity=None, limit=None):
+        """Jumlah ulasan per kata (terbanyak lebih dulu), untuk satu produk atau semua produk"""
+        if produk is None:
+            counts = {term_id: count for term_id, count in enumerate(self.total_counts) if count}
+        else:
+            product = self.product_codes.get(str(produk))
+            start = int(np.searchsorted(self._dir_products, product, 'left')) if product is not None else 0
+            end = int(np.searchsorted(self._dir_products, product, 'right')) if product is not None else 0
+            counts = dict(zip(self._dir_terms[start:end].tolist(), self._dir_counts[start:end].tolist()))
+        ranked = sorted(((self.terms[term_id], count) for term_id, count in counts.items()
+                         if polarity is None or self.polarity[term_id] == polarity),
+                        key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
+
+
+def main(argv=None):
+    """Query indeks dari command line"""
+    parser = argparse.ArgumentParser(description="Cari ulasan berdasarkan kata sentimen")
+    parser.add_argument('index', help="File indeks (output_sentiment/sentiment_index.bin)")
+    parser.add_argument('terms', nargs='*', help="Kata yang dicari; kosong = tampilkan kata terpopuler")
+    parser.add_argument('--produk', help="Batasi ke satu produkId")
+    parser.add_argument('--label', choices=list(LABEL_CODES), help="Batasi ke satu label sentimen")
+    parser.add_argument('--all', action='store_true', help="Ulasan harus mengandung semua kata")
+    parser.add_argument('--limit', type=int, default=20, help="Jumlah hasil yang ditampilkan (default: 20)")
+    args = parser.parse_args(argv)
+
+    with SentimentIndex(args.index) as index:
+        if not args.terms:
+            for term, count in index.term_counts(args.produk, limit=args.limit):
+                print(f"{term}\t{count}")
+            return
+        docs = index.search(args.terms, args.produk, args.label, 'all' if args.all else 'any')
+        print(f"{len(docs)} ulasan")
+        for ulasan_id in index.ulasan_ids(docs[:args.limit]):
+            print(ulasan_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Pencocokan kamus sentimen (kata dan frasa) dalam satu kali scan per ulasan"""
+import math
+import os
+import pickle
+import re
+
+# Token kata: huruf/angka, boleh disambung tanda hubung (misalnya 'sia-sia')
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+# Kunci penanda akhir istilah di dalam trie (tokenizer tidak pernah menghasilkan string kosong)
+_END = ''
+
+# Konstanta normalisasi compound yang sama dengan VADER
+NORMALIZE_ALPHA = 15
+
+
+def tokenize(text):
+    """Pecah teks lowercase menjadi token kata"""
+    return TOKEN_RE.findall(text)
+
+
+def normalize_score(score, alpha=NORMALIZE_ALPHA):
+    """Normalisasi jumlah bobot ke rentang -1 hingga 1 (rumus compound VADER)"""
+    norm_score = score / math.sqrt((score * score) + alpha)
+    return max(-1.0, min(1.0, norm_score))
+
+
+class LexiconMatcher:
+    """Trie token untuk kamus kata dan frasa bersentimen.
+
+    Setiap istilah disimpan sebagai urutan token sehingga frasa seperti
+    'luar biasa' atau 'tidak jelas' dicocokkan utuh. Scan berjalan dari kiri
+    ke kanan dan selalu memilih istilah terpanjang pada setiap posisi, jadi
+    'gak nyesel' dihitung sebagai frasa positif dan bukan 'gak' (negatif).
+    """
+
+    def __init__(self):
+        self._root = {}
+        self.size = 0
+
+    def add(self, term, weight, polarity=None, flags=0):
+        """Tambahkan istilah dengan bobot bertanda.
+
+        `polarity` adalah 'pos' atau 'neg' untuk istilah kamus Indonesia yang
+        dilaporkan di posWords/negWords, atau None untuk istilah yang hanya
+        ikut menyumbang skor (misalnya leksikon bahasa Inggris VADER).
+        `flags` adalah bitmask bebas (misalnya aspek ulasan) yang digabung
+        dengan OR untuk semua istilah yang ditemukan saat scan.
+        Istilah yang ditambahkan belakangan menimpa istilah yang sama.
+        """
+        tokens = tokenize(term.lower())
+        if not tokens or ' '.join(tokens) != ' '.join(term.lower().split()):
+            # Istilah yang tidak bisa dihasilkan tokenizer (emotikon, "can't", dll.) dilewati
+            return False
+
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if _END not in node:
+            self.size += 1
+        node[_END] = (term, float(weight), polarity, flags)
+        return True
+
+    def update(self, weights, polarity=None, sign=1.0, flags=None):
+        """Tambahkan banyak istilah sekaligus dari dict {istilah: bobot}.
+
+        `flags` opsional berupa dict {istilah: bitmask}.
+        """
+        flags = flags or {}
+        for term, weight in weights.items():
+            self.add(term, sign * weight, polarity, flags.get(term, 0))
+
+    def save(self, path, version):
+        """Simpan trie sebagai snapshot pickle, ditandai dengan `version`.
+
+        File ditulis ke nama sementara lalu di-rename, jadi proses lain yang
+        membaca bersamaan tidak pernah melihat file setengah jadi.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': version, 'size': self.size, 'root': self._root}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, version):
+        """Muat snapshot dari save(); None jika file tidak ada, rusak, atau versinya berbeda"""
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != version:
+            return None
+        lexicon_matcher = cls()
+        lexicon_matcher._root = data['root']
+        lexicon_matcher.size = data['size']
+        return lexicon_matcher
+
+    def scan(self, text):
+        """Cari semua istilah dalam teks dalam satu kali scan.
+
+        Mengembalikan (jumlah bobot, istilah positif, istilah negatif, flags)
+        dengan istilah dalam urutan kemunculannya di teks dan flags berupa OR
+        dari flags semua istilah yang ditemukan.
+        """
+        tokens = tokenize(text)
+        n = len(tokens)
+        root = self._root
+
+        total = 0.0
+        found_flags = 0
+        pos_found = []
+        neg_found = []
+
+        i = 0
+        while i < n:
+            node = root.get(tokens[i])
+            if node is None:
+                i += 1
+                continue
+
+            # Telusuri trie sejauh mungkin dan simpan kecocokan terpanjang
+            match = node.get(_END)
+            match_end = i + 1
+            j = i + 1
+            while j < n:
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    match = node[_END]
+                    match_end = j
+
+            if match is None:
+                i += 1
+                continue
+
+            term, weight, polarity, flags = match
+            total += weight
+            found_flags |= flags
+            if polarity == 'pos':
+                pos_found.append(term)
+            elif polarity == 'neg':
+                neg_found.append(term)
+            i = match_end
+
+        return total, pos_found, neg_found, found_flags
@@ -0,0 +1,216 @@
+"""Instrumentasi run: timer per tahap, counter per worker, profil opsional, dan laporan run"""
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Peak RSS proses ini dan proses anak yang sudah selesai, dalam MB (None jika tidak tersedia)"""
+    if resource is None:
+        return None, None
+    scale = 1 if sys.platform == 'darwin' else 1024  # ru_maxrss: byte di macOS, KB di Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 2 ** 20
+    return round(own, 1), round(children, 1)
+
+
+def _percentile(values, q):
+    """Persentil q (0-100) dengan interpolasi linear, sama seperti numpy.percentile"""
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def write_atomic(path, data):
+    """Tulis teks atau bytes lewat nama sementara agar pembaca tidak pernah melihat file setengah jadi"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class _Stage:
+    __slots__ = ('seconds', 'calls', 'rows', 'memory_peak', 'profile')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.rows = 0
+        self.memory_peak = None
+        self.profile = None
+
+
+class RunMetrics:
+    """Kumpulkan metrik satu run analisis sentimen.
+
+    Tahap diukur dengan `with metrics.stage('nama', rows=n):`; tahap yang
+    sama boleh dipanggil berkali-kali (misalnya per chunk) dan waktunya
+    dijumlahkan. Tahap tidak boleh bersarang. Latensi per item (misalnya
+    per chunk) dicatat dengan `metrics.observe('chunk', detik)` dan
+    dilaporkan sebagai p50/p99. Dengan `profile` True,
+    setiap tahap juga direkam dengan cProfile (disimpan per tahap sebagai
+    file .pstats); dengan `trace_memory` True, puncak alokasi Python per
+    tahap diukur dengan tracemalloc. Keduanya hanya mengukur proses utama.
+    """
+
+    def __init__(self, profile=False, trace_memory=False):
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.stages = {}
+        self.workers = {}
+        self.latencies = {}
+        self.rows = 0
+        self.info = {}
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _get(self, name):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = _Stage()
+        return stage
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=0):
+        """Ukur satu tahap; `rows` adalah jumlah baris yang diproses di tahap ini"""
+        stage = self._get(name)
+        if self.profile:
+            if stage.profile is None:
+                stage.profile = cProfile.Profile()
+            stage.profile.enable()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.seconds += time.perf_counter() - start
+            stage.calls += 1
+            stage.rows += rows
+            if self.profile:
+                stage.profile.disable()
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                stage.memory_peak = max(stage.memory_peak or 0, peak)
+
+    def timed_iter(self, name, iterable):
+        """Bungkus iterator (misalnya pembaca chunk) sehingga setiap next() diukur sebagai tahap `name`"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name) as stage:
+                item = next(iterator, None)
+                if item is not None and hasattr(item, '__len__'):
+                    stage.rows += len(item)
+            if item is None:
+                return
+            yield item
+
+    def observe(self, name, seconds):
+        """Catat satu latensi untuk `name`; dilaporkan sebagai jumlah, p50, dan p99"""
+        self.latencies.setdefault(name, []).append(seconds)
+
+    def add_worker_stats(self, worker_stats):
+        """Gabungkan counter per worker dari ParallelScorer ({pid: {'tasks', 'rows', 'seconds'}})"""
+        for pid, stats in worker_stats.items():
+            total = self.workers.setdefault(pid, {'tasks': 0, 'rows': 0, 'seconds': 0.0})
+            for key in total:
+                total[key] += stats[key]
+
+    def report(self):
+        """Laporan run sebagai dict yang bisa diserialisasi ke JSON"""
+        elapsed = time.perf_counter() - self._start
+        peak_main, peak_children = peak_rss_mb()
+        stages = {}
+        for name, stage in self.stages.items():
+            stages[name] = {
+                'seconds': round(stage.seconds, 4),
+                'calls': stage.calls,
+                'rows': stage.rows,
+                'rows_per_second': round(stage.rows / stage.seconds, 1) if stage.rows and stage.seconds else None,
+                'memory_peak_mb': None if stage.memory_peak is None else round(stage.memory_peak / 2 ** 20, 2),
+            }
+        workers = {
+            str(pid): {**stats, 'seconds': round(stats['seconds'], 4),
+                       'rows_per_second': round(stats['rows'] / stats['seconds'], 1) if stats['seconds'] else None}
+            for pid, stats in sorted(self.workers.items())
+        }
+        latencies = {
+            name: {'count': len(values),
+                   'p50': round(_percentile(values, 50), 4),
+                   'p99': round(_percentile(values, 99), 4)}
+            for name, values in self.latencies.items()
+        }
+        return {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'seconds': round(elapsed, 4),
+            'rows': self.rows,
+            'rows_per_second': round(self.rows / elapsed, 1) if elapsed > 0 else None,
+            'peak_rss_mb': peak_main,
+            'peak_rss_children_mb': peak_children,
+            'stages': stages,
+            'workers': workers,
+            'latencies': latencies,
+            'info': self.info,
+        }
+
+    def prometheus(self, report=None, prefix='sentimen'):
+        """Laporan dalam format textfile Prometheus (untuk textfile collector node_exporter)"""
+        report = report or self.report()
+        lines = []
+
+        def metric(name, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text
+                             else f"{prefix}_{name} {value}")
+
+        metric('run_timestamp_seconds', 'Waktu mulai run (unix time)', [({}, round(self.started, 3))])
+        metric('run_seconds', 'Durasi total run', [({}, report['seconds'])])
+        metric('run_rows', 'Jumlah ulasan yang diproses', [({}, report['rows'])])
+        metric('run_rows_per_second', 'Throughput end-to-end', [({}, report['rows_per_second'])])
+        metric('peak_rss_bytes', 'Peak RSS proses utama',
+               [({}, None if report['peak_rss_mb'] is None else int(report['peak_rss_mb'] * 2 ** 20))])
+        metric('stage_seconds', 'Durasi per tahap',
+               [({'stage': name}, stage['seconds']) for name, stage in report['stages'].items()])
+        metric('stage_rows', 'Jumlah baris per tahap',
+               [({'stage': name}, stage['rows']) for name, stage in report['stages'].items()])
+        metric('latency_seconds', 'Latensi per item (misalnya per chunk)',
+               [({'name': name, 'quantile': quantile}, stats[key])
+                for name, stats in report['latencies'].items()
+                for quantile, key in (('0.5', 'p50'), ('0.99', 'p99'))])
+        metric('worker_rows', 'Jumlah ulasan yang discoring per worker',
+               [({'pid': pid}, stats['rows']) for pid, stats in report['workers'].items()])
+        metric('worker_seconds', 'Waktu scoring per worker',
+               [({'pid': pid}, stats['seconds']) for pid, stats in report['workers'].items()])
+        return '\n'.join(lines) + '\n'
+
+    def write(self, report_path, prometheus_path=None, profile_dir=None):
+        """Tulis laporan JSON, textfile Prometheus, dan file .pstats per tahap (jika profiling aktif)"""
+        report = self.report()
+        write_atomic(report_path, json.dumps(report, indent=2))
+        if prometheus_path:
+            write_atomic(prometheus_path, self.prometheus(report))
+        if profile_dir:
+            for name, stage in self.stages.items():
+                if stage.profile is not None:
+                    stage.profile.dump_stats(os.path.join(profile_dir, f"profile_{name}.pstats"))
+        return report
@@ -0,0 +1,120 @@
+"""Tulis hasil sentimen langsung ke koleksi MongoDB ds_sentimen"""
+import concurrent.futures
+import datetime
+import json
+import threading
+
+import numpy as np
+
+# Nama koleksi sesuai backend/models/sentimen.js
+SENTIMEN_COLLECTION = 'ds_sentimen'
+
+# Database default jika URI tidak menyebut nama database
+DEFAULT_DATABASE = 'db_projek'
+
+
+def to_document(record):
+    """Ubah satu baris ekspor MongoDB menjadi dokumen dengan tipe Python biasa.
+
+    NaN menjadi None dan kolom aspek (string JSON di CSV) menjadi dict.
+    """
+    doc = {}
+    for key, value in record.items():
+        if isinstance(value, float) and np.isnan(value):
+            value = None
+        elif isinstance(value, np.generic):
+            value = value.item()
+        doc[key] = value
+    if isinstance(doc.get('aspek'), str):
+        doc['aspek'] = json.loads(doc['aspek'])
+    return doc
+
+
+class MongoSink:
+    """Upsert dokumen sentimen ke MongoDB dalam batch, berjalan di thread terpisah.
+
+    Dokumen dikumpulkan sampai `batch_size`, lalu dikirim sebagai bulk_write
+    unordered berisi upsert per ulasanId. Paling banyak `max_in_flight` batch
+    dikirim bersamaan; write() akan menunggu jika batas itu tercapai, sehingga
+    memori tetap terbatas sementara scoring terus berjalan.
+
+    `collection` bisa berupa koleksi pymongo maupun mongomock.
+    """
+
+    def __init__(self, collection, batch_size=1000, max_in_flight=4):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.counts = {'upserted': 0, 'modified': 0, 'matched': 0}
+
+        self._buffer = []
+        self._futures = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_in_flight)
+
+    @classmethod
+    def connect(cls, uri, collection_name=SENTIMEN_COLLECTION, **kwargs):
+        """Buat sink dari URI MongoDB (butuh pymongo)"""
+        from pymongo import MongoClient
+
+        client = MongoClient(uri)
+        database = client.get_default_database(default=DEFAULT_DATABASE)
+        sink = cls(database[collection_name], **kwargs)
+        sink.client = client
+        return sink
+
+    def _bulk_upsert(self, documents):
+        from pymongo import UpdateOne
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        operations = [
+            UpdateOne(
+                {'ulasanId': doc['ulasanId']},
+                {'$set': {**doc, 'updatedAt': now}, '$setOnInsert': {'createdAt': now}},
+                upsert=True
+            )
+            for doc in documents
+        ]
+        result = self.collection.bulk_write(operations, ordered=False)
+        with self._lock:
+            self.counts['upserted'] += result.upserted_count
+            self.counts['modified'] += result.modified_count
+            self.counts['matched'] += result.matched_count
+
+    def _submit(self, documents):
+        # Tunggu slot kosong agar jumlah batch yang dikirim tetap terbatas
+        self._slots.acquire()
+        future = self._executor.submit(self._bulk_upsert, documents)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+        # Buang future yang sudah selesai (dan laporkan error lebih awal)
+        still_running = []
+        for f in self._futures:
+            if f.done():
+                f.result()
+            else:
+                still_running.append(f)
+        self._futures = still_running
+
+    def write(self, documents):
+        """Tambahkan dokumen ke antrean; batch penuh langsung dikirim"""
+        self._buffer.extend(documents)
+        while len(self._buffer) >= self.batch_size:
+            batch = self._buffer[:self.batch_size]
+            self._buffer = self._buffer[self.batch_size:]
+            self._submit(batch)
+
+    def close(self):
+        """Kirim sisa dokumen, tunggu semua batch selesai, dan kembalikan jumlahnya"""
+        if self._buffer:
+            self._submit(self._buffer)
+            self._buffer = []
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._executor.shutdown(wait=True)
+            if hasattr(self, 'client'):
+                self.client.close()
+        return self.counts
@@ -0,0 +1,141 @@
+"""Penjadwal scoring paralel: task kecil, selesai tanpa urutan, hasil disusun ulang"""
+import collections
+import concurrent.futures
+import os
+import time
+
+
+def _timed_task(task_fn, *args):
+    """Jalankan satu task dan kembalikan (pid, durasi, hasil) untuk counter per worker"""
+    start = time.perf_counter()
+    result = task_fn(*args)
+    return os.getpid(), time.perf_counter() - start, result
+
+
+class _Job:
+    """Satu unit input (misalnya satu chunk CSV) yang dipecah menjadi beberapa task"""
+
+    __slots__ = ('job_id', 'parts', 'remaining')
+
+    def __init__(self, job_id, task_count):
+        self.job_id = job_id
+        self.parts = [None] * task_count
+        self.remaining = task_count
+
+
+class ParallelScorer:
+    """Jalankan `task_fn(comments, ratings)` di process pool dalam task kecil.
+
+    Setiap job yang di-submit dipecah menjadi task berisi paling banyak
+    `chunk_size` ulasan. Yang dikirim ke worker hanya array komentar dan
+    rating, bukan DataFrame. Task diproses sesuai urutan selesainya
+    (seperti imap_unordered), sehingga satu task lambat tidak menahan worker
+    lain. Hasil per job lalu disusun ulang sesuai urutan submit dan
+    digabung dengan `combine`.
+
+    `initializer` dijalankan sekali per worker (misalnya untuk memuat
+    leksikon), dan `progress` (objek dengan method update, misalnya tqdm)
+    bertambah per baris setiap kali task selesai. Dengan `workers` <= 1,
+    task dijalankan langsung di proses ini tanpa pool.
+
+    `worker_stats` berisi jumlah task, baris, dan waktu scoring per pid worker.
+    """
+
+    def __init__(self, task_fn, combine, workers=1, chunk_size=2000, initializer=None,
+                 progress=None, max_in_flight=None):
+        self.task_fn = task_fn
+        self.combine = combine
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self.progress = progress
+        # Batas task yang sudah dikirim tapi belum selesai (membatasi memori)
+        self.max_in_flight = max_in_flight or max(1, workers) * 4
+
+        self.worker_stats = {}
+
+        self._jobs = collections.deque()
+        self._running = {}
+        if workers > 1:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=initializer
+            )
+        else:
+            self._executor = None
+            if initializer is not None:
+                initializer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(cancel=exc_type is not None)
+
+    @property
+    def pending_jobs(self):
+        """Jumlah job yang hasilnya belum diambil"""
+        return len(self._jobs)
+
+    def _complete(self, job, index, timed_result, rows):
+        pid, seconds, result = timed_result
+        stats = self.worker_stats.setdefault(pid, {'tasks': 0, 'rows': 0, 'seconds': 0.0})
+        stats['tasks'] += 1
+        stats['rows'] += rows
+        stats['seconds'] += seconds
+
+        job.parts[index] = result
+        job.remaining -= 1
+        if self.progress is not None:
+            self.progress.update(rows)
+
+    def _wait_one(self):
+        done, _ = concurrent.futures.wait(self._running, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            job, index, rows = self._running.pop(future)
+            self._complete(job, index, future.result(), rows)
+
+    def submit(self, job_id, comments, ratings=None):
+        """Pecah satu job menjadi task dan kirim ke pool"""
+        starts = range(0, len(comments), self.chunk_size)
+        job = _Job(job_id, len(starts))
+        self._jobs.append(job)
+
+        for index, start in enumerate(starts):
+            end = start + self.chunk_size
+            args = (comments[start:end], None if ratings is None else ratings[start:end])
+            rows = len(args[0])
+
+            if self._executor is None:
+                self._complete(job, index, _timed_task(self.task_fn, *args), rows)
+                continue
+
+            while len(self._running) >= self.max_in_flight:
+                self._wait_one()
+            future = self._executor.submit(_timed_task, self.task_fn, *args)
+            self._running[future] = (job, index, rows)
+
+    def ready(self, wait=False):
+        """Ambil job yang sudah selesai dari depan antrean, sesuai urutan submit.
+
+        Dengan `wait` True, tunggu sampai job terdepan selesai terlebih dulu.
+        Menghasilkan pasangan (job_id, hasil gabungan).
+        """
+        while self._jobs:
+            job = self._jobs[0]
+            if job.remaining:
+                if not wait:
+                    return
+                self._wait_one()
+                continue
+            self._jobs.popleft()
+            wait = False
+            yield job.job_id, self.combine(job.parts)
+
+    def drain(self):
+        """Tunggu semua job dan hasilkan semuanya sesuai urutan submit"""
+        while self._jobs:
+            yield from self.ready(wait=True)
+
+    def close(self, cancel=False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=cancel)
+            self._executor = None
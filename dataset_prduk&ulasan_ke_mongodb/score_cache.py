@@ -0,0 +1,95 @@
+"""Cache hasil scoring di SQLite, dikunci dengan hash konten ulasan"""
+import hashlib
+import math
+import sqlite3
+
+# Kolom hasil scoring yang disimpan di cache (urutan sesuai tabel)
+CACHE_FIELDS = ('score', 'normalized_score', 'label', 'pos_words', 'neg_words', 'aspek_flags')
+
+# Batas jumlah parameter per query IN (...) agar aman untuk SQLite lama
+_LOOKUP_BATCH = 500
+
+
+def select_in(conn, query, keys):
+    """Jalankan `query` dengan `IN ({placeholders})` per batch kunci dan kembalikan semua baris"""
+    rows = []
+    for start in range(0, len(keys), _LOOKUP_BATCH):
+        batch = keys[start:start + _LOOKUP_BATCH]
+        rows.extend(conn.execute(query.format(placeholders=','.join('?' * len(batch))), batch))
+    return rows
+
+
+class ScoreCache:
+    """Cache persisten untuk hasil score_chunk per ulasan.
+
+    Kunci adalah hash dari (versi leksikon, rating, komentar yang sudah
+    dipreprocess). Jika versi leksikon berubah (kamus kata atau aturan
+    scoring diubah), tabel cache dibuat ulang saat dibuka.
+    """
+
+    def __init__(self, path, lexicon_version):
+        self.path = path
+        self.lexicon_version = lexicon_version
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'lexicon_version'").fetchone()
+        if row is None or row[0] != lexicon_version:
+            # Kamus atau aturan berubah: hasil (dan skema) lama tidak berlaku lagi
+            self.conn.execute("DROP TABLE IF EXISTS scores")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('lexicon_version', ?)",
+                (lexicon_version,)
+            )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "key BLOB PRIMARY KEY, score REAL, normalized_score REAL, "
+            "label TEXT, pos_words TEXT, neg_words TEXT, aspek_flags INTEGER) WITHOUT ROWID"
+        )
+        self.conn.commit()
+
+    def make_key(self, comment, rating):
+        """Hash 16 byte dari (versi leksikon, rating, komentar)"""
+        rating_repr = 'none' if rating is None else repr(float(rating))
+        data = f"{self.lexicon_version}\x1f{rating_repr}\x1f{comment}".encode('utf-8')
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def get_many(self, keys):
+        """Ambil hasil untuk daftar kunci.
+
+        Mengembalikan list sejajar dengan `keys` berisi tuple CACHE_FIELDS
+        atau None jika kunci belum ada di cache.
+        """
+        found = {}
+        for key, *values in select_in(
+            self.conn,
+            f"SELECT key, {', '.join(CACHE_FIELDS)} FROM scores WHERE key IN ({{placeholders}})",
+            list(dict.fromkeys(keys))
+        ):
+            # SQLite menyimpan NaN sebagai NULL
+            values[0] = math.nan if values[0] is None else values[0]
+            values[1] = math.nan if values[1] is None else values[1]
+            found[key] = tuple(values)
+
+        results = [found.get(key) for key in keys]
+        hit_count = sum(1 for r in results if r is not None)
+        self.hits += hit_count
+        self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, keys, rows):
+        """Simpan hasil baru; `rows` berisi tuple CACHE_FIELDS sejajar dengan `keys`"""
+        placeholders = ', '.join('?' * len(CACHE_FIELDS))
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO scores (key, {', '.join(CACHE_FIELDS)}) VALUES (?, {placeholders})",
+            ((key, *row) for key, row in zip(keys, rows))
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
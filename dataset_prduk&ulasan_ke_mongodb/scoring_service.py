@@ -0,0 +1,412 @@
+"""Layanan scoring sentimen yang selalu aktif untuk backend (HTTP lokal dengan micro-batching).
+
+Contoh:
+    python scoring_service.py --port 8765
+    curl -X POST localhost:8765/score -d '{"komentar": "bahan bagus, pengiriman cepat", "rating": 5}'
+    python scoring_service.py --check Dataset_ulasan_Erigo.csv --url http://127.0.0.1:8765
+    curl 'localhost:8765/index/search?terms=luntur,kekecilan&produk=P001&label=negative'
+
+Leksikon dimuat sekali saat start. Request yang datang bersamaan digabung
+menjadi satu batch score_chunk (paling banyak `max_batch` ulasan, menunggu
+paling lama `max_wait_ms`), jadi hasilnya sama persis dengan jalur batch di
+Analisis_test.py.
+
+Scoring berjalan di thread tersendiri sehingga event loop tetap menerima
+request selama batch discoring. Batch dikerjakan satu per satu, jadi p99
+tetap dibatasi lama scoring satu batch (sekitar 1 ms untuk 64 ulasan,
+4-5 ms untuk 256) ditambah antrean di depannya.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import http.client
+import json
+import math
+import os
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+import pandas as pd
+
+import Analisis_test as analisis
+from columnar_io import format_numbers
+from inverted_index import LABEL_CODES, SentimentIndex
+from mongo_sink import to_document
+
+# Batas ukuran body request (sama dengan limit express.json di backend)
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+            500: 'Internal Server Error'}
+
+
+def _split_words(words):
+    return words.split(',') if words else []
+
+
+def score_reviews(reviews):
+    """Scoring sekumpulan ulasan ({'komentar', 'rating', ...}) dengan logika yang sama seperti batch.
+
+    Rating yang kosong (null) berarti ulasan tanpa rating, sehingga hanya
+    teks yang dinilai. Mengembalikan list dict berisi score, skor, label,
+    posWords, negWords, aspek, dan alasan. Hanya score_chunk dan tabel
+    aspek yang dipakai (tanpa DataFrame), agar batch kecil tetap cepat.
+    """
+    comments = np.array([review.get('komentar') for review in reviews], dtype=object)
+    # dtype object: None tetap berarti "tanpa rating", apapun isi ulasan lain di batch yang sama
+    ratings = np.array([review.get('rating') for review in reviews], dtype=object)
+    results = analisis.score_chunk(comments, ratings)
+    aspek_json = analisis.create_aspek_json(results['aspek_flags'])
+    # Format rating sama dengan jalur batch: nilai bulat tanpa ".0"
+    rating_texts = format_numbers([math.nan if rating is None else float(rating) for rating in ratings])
+
+    scored = []
+    for score, skor, label, pos_words, neg_words, aspek, rating, rating_text in zip(
+            results['score'].tolist(), results['normalized_score'].tolist(), results['label'],
+            results['pos_words'], results['neg_words'], aspek_json, ratings, rating_texts):
+        scored.append({
+            'score': None if math.isnan(score) else score,
+            'skor': None if math.isnan(skor) else skor,
+            'label': label,
+            'posWords': _split_words(pos_words),
+            'negWords': _split_words(neg_words),
+            'aspek': json.loads(aspek),
+            'alasan': analisis.alasan_text('tidak ada' if rating is None else rating_text,
+                                           pos_words or 'tidak ada', neg_words or 'tidak ada'),
+        })
+    return scored
+
+
+def _validate(payload):
+    """Ambil daftar ulasan dari body request; satu objek atau {"ulasan": [...]}"""
+    single = isinstance(payload, dict) and 'ulasan' not in payload
+    reviews = [payload] if single else payload.get('ulasan') if isinstance(payload, dict) else None
+    if not isinstance(reviews, list) or not all(isinstance(review, dict) for review in reviews):
+        raise ValueError("Body harus berupa objek ulasan atau {\"ulasan\": [...]}")
+    for review in reviews:
+        komentar = review.get('komentar')
+        rating = review.get('rating')
+        if komentar is not None and not isinstance(komentar, str):
+            raise ValueError("komentar harus berupa string")
+        if rating is not None and (isinstance(rating, bool) or not isinstance(rating, (int, float))
+                                   or not math.isfinite(rating)):
+            raise ValueError("rating harus berupa angka")
+    return reviews, single
+
+
+class MicroBatcher:
+    """Gabungkan request yang datang bersamaan menjadi satu panggilan `score_fn`.
+
+    Batch dikirim saat berisi `max_batch` ulasan atau saat request pertama
+    di batch sudah menunggu `max_wait_ms`. Saat beban rendah, request
+    tunggal tidak perlu menunggu lama; saat beban tinggi, request yang
+    menumpuk selama scoring berjalan langsung ikut batch berikutnya.
+
+    `score_fn` dijalankan di satu thread executor (bukan di event loop),
+    sehingga request baru tetap diterima dan ikut batch berikutnya.
+    """
+
+    def __init__(self, score_fn, max_batch=64, max_wait_ms=1.0):
+        self.score_fn = score_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.reviews = 0
+        self._queue = asyncio.Queue()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    async def submit(self, reviews):
+        """Scoring daftar ulasan bersama request lain; hasil sejajar dengan `reviews`"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((reviews, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        items = [await self._queue.get()]
+        count = len(items[0][0])
+        deadline = loop.time() + self.max_wait
+        while count < self.max_batch:
+            if self._queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            items.append(item)
+            count += len(item[0])
+        return items
+
+    async def run(self):
+        try:
+            while True:
+                await self._score(await self._collect())
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def _score(self, items):
+        loop = asyncio.get_running_loop()
+        reviews = [review for request_reviews, _ in items for review in request_reviews]
+        try:
+            results = await loop.run_in_executor(self._executor, self.score_fn, reviews)
+        except Exception as exc:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.reviews += len(reviews)
+        start = 0
+        for request_reviews, future in items:
+            end = start + len(request_reviews)
+            if not future.done():
+                future.set_result(results[start:end])
+            start = end
+
+
+class IndexReader:
+    """Buka indeks kata sentimen saat pertama dipakai dan buka ulang jika file diganti oleh run baru"""
+
+    def __init__(self, path):
+        self.path = path
+        self.index = None
+        self._mtime = None
+
+    def get(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._mtime:
+            if self.index is not None:
+                self.index.close()
+            self.index = SentimentIndex(self.path)
+            self._mtime = mtime
+        return self.index
+
+
+def _query_index(index, path, query):
+    """Jawab /index/search dan /index/terms dari parameter query string"""
+    params = {key: values[-1] for key, values in urllib.parse.parse_qs(query).items()}
+    produk = params.get('produk') or None
+    try:
+        limit = int(params.get('limit', 100))
+    except ValueError:
+        return 400, {'error': 'limit harus berupa angka'}
+    if path == '/index/terms':
+        polarity = params.get('polarity') or None
+        if polarity not in (None, 'pos', 'neg'):
+            return 400, {'error': 'polarity harus pos atau neg'}
+        return 200, {'kata': [{'kata': term, 'jumlah': count}
+                              for term, count in index.term_counts(produk, polarity, limit)]}
+
+    terms = [term.strip().lower() for term in params.get('terms', '').split(',') if term.strip()]
+    label = params.get('label') or None
+    match = params.get('match', 'any')
+    if not terms:
+        return 400, {'error': 'Parameter terms wajib diisi'}
+    if label is not None and label not in LABEL_CODES:
+        return 400, {'error': f"label harus salah satu dari {', '.join(LABEL_CODES)}"}
+    if match not in ('any', 'all'):
+        return 400, {'error': 'match harus any atau all'}
+    docs = index.search(terms, produk, label, match)
+    return 200, {'total': len(docs), 'ulasanId': index.ulasan_ids(docs[:limit])}
+
+
+class ScoringService:
+    """Server HTTP/1.1 minimal (keep-alive) di atas asyncio.
+
+    Endpoint:
+      POST /score         - body satu ulasan {"komentar", "rating"} atau {"ulasan": [...]}
+      GET /health         - status dan statistik batch
+      GET /index/search   - ulasanId yang mengandung kata (?terms=a,b&produk=&label=&match=any|all&limit=);
+                            kata tunggal juga cocok dengan frasa leksikon yang memuatnya ('luntur' -> 'warna luntur')
+      GET /index/terms    - kata sentimen terbanyak (?produk=&polarity=pos|neg&limit=)
+    """
+
+    def __init__(self, batcher, index_reader=None):
+        self.batcher = batcher
+        self.index_reader = index_reader
+
+    async def route(self, method, path, body, query=''):
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'lexicon': analisis.get_matcher().size,
+                         'batches': self.batcher.batches, 'ulasan': self.batcher.reviews}
+        if method == 'GET' and path in ('/index/search', '/index/terms'):
+            index = self.index_reader.get() if self.index_reader is not None else None
+            if index is None:
+                return 404, {'error': 'Indeks kata sentimen belum dibuat; jalankan Analisis_test.py'}
+            return _query_index(index, path, query)
+        if method == 'POST' and path == '/score':
+            try:
+                reviews, single = _validate(json.loads(body or b'null'))
+            except ValueError as exc:
+                return 400, {'error': str(exc)}
+            results = await self.batcher.submit(reviews)
+            return 200, results[0] if single else {'hasil': results}
+        return 404, {'error': 'Endpoint tidak ditemukan'}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload = 413, {'error': 'Body terlalu besar'}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    url = urllib.parse.urlsplit(target)
+                    try:
+                        status, payload = await self.route(method, url.path, body, url.query)
+                    except Exception as exc:
+                        status, payload = 500, {'error': f"Gagal melakukan scoring: {exc}"}
+                    keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                        f"Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                writer.write(head.encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, max_batch, max_wait_ms, index_path=None):
+    # Muat leksikon sebelum menerima request agar request pertama tidak lambat
+    analisis.get_matcher()
+    batcher = MicroBatcher(score_reviews, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    service = ScoringService(batcher, IndexReader(index_path) if index_path else None)
+    batch_task = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Layanan scoring berjalan di http://{host}:{port} "
+          f"(batch maks {max_batch}, tunggu maks {max_wait_ms} ms)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batch_task.cancel()
+
+
+def _json_value(value):
+    """Nilai sel CSV sebagai nilai JSON (NaN menjadi null)"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def check_service(csv_path, url, concurrency=16, limit=None):
+    """Cek kesamaan hasil layanan dengan jalur batch dan ukur latensi request.
+
+    Setiap ulasan dikirim sebagai request tersendiri dari `concurrency`
+    koneksi keep-alive, lalu dibandingkan dengan score_chunk untuk seluruh
+    file. Ulasan tanpa rating dilewati: di jalur batch rating kosong dari
+    CSV menjadi NaN, sedangkan layanan menganggapnya ulasan tanpa rating.
+    """
+    df = analisis.read_input(csv_path)
+    if limit:
+        df = df.head(limit)
+    df = df[pd.to_numeric(df['rating'], errors='coerce').notna()].reset_index(drop=True)
+
+    results = analisis.score_chunk(*analisis.chunk_arrays(df))
+    analisis.attach_results(df, results)
+    expected = analisis.mongodb_frame(df, aspek_flags=results['aspek_flags'])
+    expected = [to_document(record) for record in expected.to_dict('records')]
+
+    parsed = urllib.parse.urlsplit(url)
+    local = threading.local()
+    requests = [json.dumps({'komentar': _json_value(komentar), 'rating': _json_value(rating)})
+                for komentar, rating in zip(df['komentar'], df['rating'])]
+
+    def send(index):
+        if not hasattr(local, 'conn'):
+            local.conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80)
+        start = time.perf_counter()
+        local.conn.request('POST', '/score', requests[index], {'Content-Type': 'application/json'})
+        response = json.loads(local.conn.getresponse().read())
+        return index, time.perf_counter() - start, response
+
+    latencies = []
+    mismatches = []
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as pool:
+        for index, latency, response in pool.map(send, range(len(requests))):
+            latencies.append(latency)
+            want = expected[index]
+            got = (response['skor'], response['label'], response['aspek'], response['alasan'],
+                   ','.join(response['posWords']), ','.join(response['negWords']))
+            if got != (want['skor'], want['label'], want['aspek'], want['alasan'],
+                       df['posWords'][index], df['negWords'][index]):
+                mismatches.append(index)
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    print(f"Ulasan dicek: {len(requests)}, tidak sama: {len(mismatches)}")
+    if len(latencies):
+        print(f"Latensi request: p50 {np.percentile(latencies, 50):.2f} ms, "
+              f"p99 {np.percentile(latencies, 99):.2f} ms, "
+              f"{len(requests) / elapsed:.0f} request per detik ({concurrency} koneksi)")
+    return mismatches
+
+
+def parse_args(argv=None):
+    """Argumen command line"""
+    parser = argparse.ArgumentParser(description="Layanan scoring sentimen dengan micro-batching")
+    parser.add_argument('--host', default='127.0.0.1', help="Alamat server (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Port server (default: 8765)")
+    parser.add_argument('--max-batch', type=int, default=64,
+                        help="Jumlah ulasan maksimum per batch scoring; p99 dibatasi lama scoring "
+                             "satu batch (default: 64)")
+    parser.add_argument('--max-wait-ms', type=float, default=1.0,
+                        help="Waktu tunggu maksimum untuk mengisi batch, dalam ms (default: 1.0)")
+    parser.add_argument('--index', default=os.path.join(analisis.output_dir, analisis.index_file),
+                        help="File indeks kata sentimen untuk /index/* (default: %(default)s)")
+    parser.add_argument('--check', metavar='CSV',
+                        help="Jangan start server; cek hasil & latensi layanan di --url terhadap jalur batch")
+    parser.add_argument('--url', default='http://127.0.0.1:8765', help="URL layanan untuk --check")
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help="Jumlah koneksi bersamaan untuk --check (default: 16)")
+    parser.add_argument('--limit', type=int, help="Batasi jumlah ulasan untuk --check")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Fungsi utama layanan"""
+    args = parse_args(argv)
+    if args.check:
+        mismatches = check_service(args.check, args.url, args.concurrency, args.limit)
+        raise SystemExit(1 if mismatches else 0)
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch, args.max_wait_ms, args.index))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# Modul pipeline ada di direktori induk (bukan paket), sama seperti saat skrip dijalankan langsung
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def analisis(tmp_path_factory):
+    """Modul Analisis_test dengan snapshot leksikon di direktori sementara"""
+    import Analisis_test
+    Analisis_test.lexicon_snapshot_file = str(tmp_path_factory.mktemp('lexicon') / 'lexicon_snapshot.pickle')
+    Analisis_test.matcher = None
+    return Analisis_test
@@ -0,0 +1,113 @@
+import collections
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import LABELS, SentimentAggregator
+
+
+def make_results(rows=200, seed=5):
+    """Hasil analisis acak dengan kolom yang dibaca SentimentAggregator"""
+    rng = np.random.default_rng(seed)
+    ratings = rng.choice([1.0, 2.0, 3.0, 4.0, 4.5, 5.0, np.nan], size=rows)
+    pos = rng.choice(['', 'bagus', 'bagus,cepat', 'mantap', 'gak nyesel,bagus'], size=rows)
+    neg = rng.choice(['', 'jelek', 'warna luntur,jelek', 'kecewa'], size=rows)
+    return pd.DataFrame({
+        'produk': [f"Produk {i}" for i in rng.integers(0, 15, size=rows)],
+        'rating': ratings,
+        'sentiment_label': rng.choice(list(LABELS), size=rows),
+        'posWords': pos,
+        'negWords': neg,
+    })
+
+
+def reference_summary(df, top_products=10, top_terms=50):
+    """Ringkasan yang sama dihitung langsung dari seluruh DataFrame dengan pandas"""
+    def ranked(counts, limit):
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def labels(counts):
+        return {label: int(counts.get(label, 0)) for label in LABELS}
+
+    def terms(column):
+        counts = collections.Counter(word for words in df[column] if words for word in words.split(','))
+        return [{'kata': w, 'jumlah': c} for w, c in ranked(counts, top_terms)]
+
+    rated = df.dropna(subset=['rating'])
+    by_rating = {}
+    for rating, group in sorted(rated.groupby('rating')):
+        key = str(int(rating)) if float(rating).is_integer() else str(rating)
+        by_rating[key] = labels(group['sentiment_label'].value_counts())
+    product_totals = collections.Counter(df['produk'].tolist())
+    return {
+        'total': len(df),
+        'labels': labels(df['sentiment_label'].value_counts()),
+        'rating': by_rating,
+        'produk': [{'produk': produk, 'total': total,
+                    'labels': labels(df.loc[df['produk'] == produk, 'sentiment_label'].value_counts())}
+                   for produk, total in ranked(product_totals, top_products)],
+        'posWords': terms('posWords'),
+        'negWords': terms('negWords'),
+    }
+
+
+@pytest.fixture(scope='module')
+def results():
+    return make_results()
+
+
+def test_summary_matches_pandas_reference(results):
+    aggregator = SentimentAggregator()
+    aggregator.update(results)
+    summary = aggregator.summary()
+    expected = reference_summary(results)
+
+    assert summary == expected
+    assert list(summary['rating']) == ['1', '2', '3', '4', '4.5', '5']
+
+
+@pytest.mark.parametrize('chunksize', [1, 7, 64])
+def test_chunked_update_equals_single_update(results, chunksize):
+    single = SentimentAggregator()
+    single.update(results)
+
+    chunked = SentimentAggregator()
+    for start in range(0, len(results), chunksize):
+        chunked.update(results.iloc[start:start + chunksize])
+    assert chunked.summary() == single.summary()
+
+
+def test_merge_equals_single_update(results):
+    single = SentimentAggregator(top_products=3, top_terms=2)
+    single.update(results)
+
+    merged = SentimentAggregator(top_products=3, top_terms=2)
+    for shard in np.array_split(np.arange(len(results)), 4):
+        part = SentimentAggregator()
+        part.update(results.iloc[shard])
+        merged.merge(part)
+    summary = merged.summary()
+    assert summary == single.summary()
+    assert len(summary['produk']) == 3 and len(summary['posWords']) == 2
+
+
+def test_integer_and_float_ratings_share_key():
+    aggregator = SentimentAggregator()
+    aggregator.update(pd.DataFrame({'rating': [5, 4], 'sentiment_label': ['positive', 'neutral'],
+                                    'posWords': ['', ''], 'negWords': ['', '']}))
+    aggregator.update(pd.DataFrame({'rating': [5.0, np.nan], 'sentiment_label': ['negative', 'neutral'],
+                                    'posWords': ['', ''], 'negWords': ['', '']}))
+    summary = aggregator.summary()
+    assert summary['rating'] == {'4': {'positive': 0, 'neutral': 1, 'negative': 0},
+                                 '5': {'positive': 1, 'neutral': 0, 'negative': 1}}
+    assert summary['total'] == 4 and summary['produk'] == []
+
+
+def test_save_writes_summary_json(results, tmp_path):
+    aggregator = SentimentAggregator()
+    aggregator.update(results)
+    path = tmp_path / 'sentiment_summary.json'
+    summary = aggregator.save(str(path))
+    assert json.loads(path.read_text(encoding='utf-8')) == summary
@@ -0,0 +1,139 @@
+"""Batch runner: batas shard CSV, ulasanId antar shard, hasil gabungan, dan melanjutkan run."""
+import csv
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from delta_export import make_ulasan_ids, offset_ulasan_ids
+
+KOMENTAR = [
+    'bahan bagus, pengiriman cepat',
+    'jelek\nwarna luntur setelah dicuci',
+    'kata "kutip" di tengah, lalu\r\nbaris baru',
+    '"',
+    '',
+    '5',
+    'harga mahal tapi kualitas oke',
+    'mantap "recommended"\n\n"seller"',
+]
+
+
+def write_reviews(path, rows=120):
+    """CSV dengan komentar multi-baris, tanda kutip, ulasan identik, dan komentar berisi angka saja.
+
+    Mengembalikan offset byte awal setiap baris data.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(['produk_id', 'pengguna', 'rating', 'komentar'])
+    starts = []
+    for i in range(rows):
+        starts.append(len(buffer.getvalue().encode('utf-8')))
+        rating = '' if i % 11 == 0 else (i % 5) + 1
+        # Kata positif yang baru muncul di akhir file: urutan kata tidak boleh bergantung pada shard
+        komentar = 'kualitas premium, istimewa' if i >= rows - 10 else KOMENTAR[i % len(KOMENTAR)]
+        writer.writerow([f"P{i % 4}", f"u{i % 7}", rating, komentar])
+    with open(path, 'wb') as f:
+        f.write(buffer.getvalue().encode('utf-8'))
+    return starts
+
+
+@pytest.fixture
+def runner(analisis):
+    import batch_runner
+    return batch_runner
+
+
+@pytest.mark.parametrize('block', [7, 64, 1 << 22])
+def test_row_starts_skip_quoted_newlines(runner, tmp_path, monkeypatch, block):
+    monkeypatch.setattr(runner, '_SCAN_BLOCK', block)
+    path = str(tmp_path / 'ulasan.csv')
+    starts = write_reviews(path, rows=40)
+    size = os.path.getsize(path)
+    targets = list(range(0, size))
+    # Setiap target dipetakan ke awal baris pertama sesudahnya (file diakhiri newline, jadi termasuk akhir file)
+    expected = sorted({next(s for s in starts + [size] if s > t) for t in targets})
+    assert runner.row_starts(path, targets) == expected
+
+
+def test_offset_ulasan_ids_matches_single_counter():
+    df = pd.DataFrame({'komentar': np.array(['a', 'b', 'a', 'c', 'a', 'b'] * 5, dtype=object), 'rating': 5.0})
+    expected = make_ulasan_ids(df, {})
+    seen = {}
+    parts = []
+    for start in range(0, len(df), 7):
+        counts = {}
+        ids = make_ulasan_ids(df.iloc[start:start + 7], counts)
+        parts.append(offset_ulasan_ids(ids, counts, seen))
+    assert np.concatenate(parts).tolist() == expected.tolist()
+
+
+def single_run(analisis, monkeypatch, input_path, out_dir):
+    os.makedirs(out_dir)
+    monkeypatch.setattr(analisis, 'input_file', input_path)
+    monkeypatch.setattr(analisis, 'output_dir', out_dir)
+    monkeypatch.setattr(analisis, 'output_file', os.path.join(out_dir, 'ulasan_sentiment.csv'))
+    monkeypatch.setattr(analisis, 'num_workers', 1)
+    analisis.analyze_sentiment(use_cache=False)
+    return {name: open(os.path.join(out_dir, name), 'rb').read() for name in
+            ('ulasan_sentiment.csv', analisis.mongodb_ready_file, analisis.index_file, analisis.summary_file)}
+
+
+def batch_outputs(analisis, store):
+    names = {os.path.basename(store.output_file): 'ulasan_sentiment.csv'}
+    outputs = {}
+    for name in os.listdir(store.output_dir):
+        if name in names or name in (analisis.mongodb_ready_file, analisis.index_file, analisis.summary_file):
+            outputs[names.get(name, name)] = open(os.path.join(store.output_dir, name), 'rb').read()
+    return outputs
+
+
+def run(runner, store, shard_bytes):
+    from metrics import RunMetrics
+    metrics = RunMetrics()
+    summaries, errors = runner.run_batch([store], 1, shard_bytes, metrics)
+    assert not errors
+    return sum(stats['rows'] for stats in metrics.workers.values())
+
+
+def test_merged_outputs_equal_single_run(analisis, runner, tmp_path, monkeypatch):
+    input_path = str(tmp_path / 'ulasan.csv')
+    write_reviews(input_path)
+    expected = single_run(analisis, monkeypatch, input_path, str(tmp_path / 'single'))
+
+    store = runner.Store('toko', input_path, str(tmp_path / 'batch'),
+                         output_file=str(tmp_path / 'batch' / 'ulasan_sentiment.csv'))
+    assert run(runner, store, shard_bytes=500) == 120
+    assert len(store.plan['shards']) > 5
+    assert batch_outputs(analisis, store) == expected
+
+
+def test_resume_after_partial_run(analisis, runner, tmp_path, monkeypatch):
+    input_path = str(tmp_path / 'ulasan.csv')
+    write_reviews(input_path)
+    expected = single_run(analisis, monkeypatch, input_path, str(tmp_path / 'single'))
+
+    store = runner.Store('toko', input_path, str(tmp_path / 'batch'),
+                         output_file=str(tmp_path / 'batch' / 'ulasan_sentiment.csv'))
+    store.prepare(500)
+    shards = store.plan['shards']
+    done_rows = sum(runner.score_shard(store, index)['rows'] for index in range(0, len(shards), 2))
+    # Shard yang terputus sebelum penanda .done ditulis harus discoring ulang
+    runner.score_shard(store, 1)
+    os.remove(store.shard_path(1, 'done'))
+
+    scored = run(runner, store, shard_bytes=500)
+    assert scored == 120 - done_rows
+    assert batch_outputs(analisis, store) == expected
+
+    # Run berikutnya tidak memproses apa pun; output yang dihapus membuat shard discoring ulang
+    assert run(runner, store, shard_bytes=500) == 0
+    os.remove(store.output_file)
+    assert run(runner, store, shard_bytes=500) == 120
+    assert batch_outputs(analisis, store) == expected
+    with open(store.merged_path, encoding='utf-8') as f:
+        assert json.load(f) == {'rows': 120}
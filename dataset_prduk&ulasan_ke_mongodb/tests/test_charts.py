@@ -0,0 +1,87 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import charts
+from aggregates import SentimentAggregator
+from charts import CHART_STATE_FILE, render_charts
+
+pytest.importorskip('matplotlib')
+pytest.importorskip('seaborn')
+
+ALL_CHARTS = ['sentiment_distribution.png', 'top_positive_words.png', 'top_negative_words.png',
+              'sentiment_by_rating.png', 'sentiment_by_product.png']
+
+
+def make_summary(extra_pos=''):
+    aggregator = SentimentAggregator()
+    aggregator.update(pd.DataFrame({
+        'produk': ['Produk A', 'Produk B', 'Produk A', 'Produk C'],
+        'rating': [5.0, 1.0, 4.0, 3.0],
+        'sentiment_label': ['positive', 'negative', 'positive', 'neutral'],
+        'posWords': ['bagus,cepat', '', 'mantap' + extra_pos, ''],
+        'negWords': ['', 'jelek,luntur', '', 'lama'],
+    }))
+    return aggregator.summary()
+
+
+def mtimes(output_dir):
+    return {name: os.stat(os.path.join(output_dir, name)).st_mtime_ns for name in ALL_CHARTS}
+
+
+def read_state(output_dir):
+    with open(os.path.join(output_dir, CHART_STATE_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_unchanged_charts_are_skipped(tmp_path):
+    output_dir = str(tmp_path)
+    assert render_charts(make_summary(), output_dir, workers=1) == (5, 0)
+    assert sorted(read_state(output_dir)) == sorted(ALL_CHARTS)
+    before = mtimes(output_dir)
+
+    assert render_charts(make_summary(), output_dir, workers=1) == (0, 5)
+    assert mtimes(output_dir) == before
+
+    # Hanya grafik kata positif yang datanya berubah
+    assert render_charts(make_summary(extra_pos=',bagus'), output_dir, workers=1) == (1, 4)
+    after = mtimes(output_dir)
+    assert [name for name in ALL_CHARTS if after[name] != before[name]] == ['top_positive_words.png']
+
+
+def test_missing_png_or_state_rerenders(tmp_path):
+    output_dir = str(tmp_path)
+    render_charts(make_summary(), output_dir, workers=1)
+
+    os.remove(os.path.join(output_dir, 'sentiment_by_rating.png'))
+    assert render_charts(make_summary(), output_dir, workers=1) == (1, 4)
+
+    with open(os.path.join(output_dir, CHART_STATE_FILE), 'w', encoding='utf-8') as f:
+        f.write('{rusak')
+    assert render_charts(make_summary(), output_dir, workers=1) == (5, 0)
+
+
+def test_chart_version_invalidates_state(tmp_path, monkeypatch):
+    output_dir = str(tmp_path)
+    render_charts(make_summary(), output_dir, workers=1)
+    monkeypatch.setattr(charts, 'CHART_VERSION', charts.CHART_VERSION + 1)
+    assert render_charts(make_summary(), output_dir, workers=1) == (5, 0)
+
+
+def test_parallel_render_matches_serial_state(tmp_path):
+    serial_dir, parallel_dir = tmp_path / 'serial', tmp_path / 'parallel'
+    serial_dir.mkdir()
+    parallel_dir.mkdir()
+    render_charts(make_summary(), str(serial_dir), workers=1)
+    assert render_charts(make_summary(), str(parallel_dir), workers=2) == (5, 0)
+    assert read_state(str(parallel_dir)) == read_state(str(serial_dir))
+    assert all(os.path.getsize(parallel_dir / name) > 0 for name in ALL_CHARTS)
+
+
+def test_optional_charts_need_data():
+    summary = make_summary()
+    summary['rating'] = {}
+    summary['produk'] = []
+    assert [spec[0] for spec in charts.chart_specs(summary)] == ALL_CHARTS[:3]
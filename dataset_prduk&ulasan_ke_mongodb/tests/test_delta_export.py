@@ -0,0 +1,75 @@
+"""Ekspor delta: ulasanId yang stabil dan file delta per run."""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from delta_export import DeltaExporter, OccurrenceCounts, make_ulasan_ids, pending_delta_files
+
+
+def test_occurrence_counts_match_dict(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'produk_id': rng.integers(0, 3, 2000).astype(str),
+        'komentar': rng.integers(0, 50, 2000).astype(str),
+        'rating': rng.integers(1, 6, 2000).astype(np.float64),
+    })
+    expected = make_ulasan_ids(df, {})
+    assert any('-' in ulasan_id for ulasan_id in expected)
+
+    path = str(tmp_path / 'counts.sqlite')
+    counts = OccurrenceCounts(path)
+    ids = np.concatenate([make_ulasan_ids(df.iloc[start:start + 300], counts)
+                          for start in range(0, len(df), 300)])
+    counts.close()
+
+    assert ids.tolist() == expected.tolist()
+    assert not os.path.exists(path)
+
+
+def export(tmp_path, rows):
+    exporter = DeltaExporter(str(tmp_path / 'state.sqlite'), str(tmp_path / 'delta.jsonl'))
+    exporter.process(pd.DataFrame(rows, columns=['ulasanId', 'label', 'skor']))
+    exporter.finish()
+    return exporter.delta_path
+
+
+def import_pending(tmp_path, collection):
+    """Sama seperti backend/importSentimenDelta.js: terapkan file tertunda berurutan lalu tandai .applied"""
+    for path in pending_delta_files(str(tmp_path / 'delta.jsonl')):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry['op'] == 'delete':
+                    collection.pop(entry['ulasanId'], None)
+                else:
+                    collection[entry['ulasanId']] = entry['doc']
+        os.rename(path, f"{path}.applied")
+
+
+def test_two_exports_one_import(tmp_path):
+    first = export(tmp_path, [('a', 'positive', 8.0), ('b', 'negative', 2.0), ('c', 'neutral', 5.0)])
+    second = export(tmp_path, [('a', 'negative', 3.0), ('c', 'neutral', 5.0), ('d', 'positive', 9.0)])
+    assert first != second
+    assert pending_delta_files(str(tmp_path / 'delta.jsonl')) == [first, second]
+
+    collection = {}
+    import_pending(tmp_path, collection)
+    assert {ulasan_id: doc['label'] for ulasan_id, doc in collection.items()} == \
+        {'a': 'negative', 'c': 'neutral', 'd': 'positive'}
+    assert pending_delta_files(str(tmp_path / 'delta.jsonl')) == []
+
+    # Run berikutnya setelah import hanya berisi perubahan baru
+    third = export(tmp_path, [('a', 'negative', 3.0), ('d', 'positive', 9.0)])
+    assert pending_delta_files(str(tmp_path / 'delta.jsonl')) == [third]
+    import_pending(tmp_path, collection)
+    assert sorted(collection) == ['a', 'd']
+
+
+def test_failed_run_leaves_no_delta_file(tmp_path):
+    exporter = DeltaExporter(str(tmp_path / 'state.sqlite'), str(tmp_path / 'delta.jsonl'))
+    exporter.process(pd.DataFrame({'ulasanId': ['a'], 'label': ['positive']}))
+    exporter.delta_file.close()
+    exporter.conn.close()
+    assert pending_delta_files(str(tmp_path / 'delta.jsonl')) == []
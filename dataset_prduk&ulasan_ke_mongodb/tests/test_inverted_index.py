@@ -0,0 +1,105 @@
+import mmap
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inverted_index import (LABEL_CODES, IndexBuilder, SentimentIndex, _varint_values,
+                            encode_posting_lists)
+
+POS_TERMS = ['bagus', 'sangat bagus', 'kualitas bagus', 'nyaman']
+NEG_TERMS = ['luntur', 'warna luntur', 'dicuci luntur', 'kekecilan', 'jelek']
+
+
+def make_reviews(rows=300, seed=3):
+    """Ulasan acak dengan kolom posWords/negWords seperti output pipeline (kata bisa berulang)"""
+    rng = np.random.default_rng(seed)
+
+    def words(terms):
+        return ','.join(rng.choice(terms, size=rng.integers(0, 4)).tolist())
+
+    return pd.DataFrame({
+        'ulasanId': [f"u{i}_{i % 7}" for i in range(rows)],
+        'produkId': [f"P{i % 3}" for i in range(rows)],
+        'label': rng.choice(list(LABEL_CODES), size=rows),
+        'posWords': [words(POS_TERMS) for _ in range(rows)],
+        'negWords': [words(NEG_TERMS) for _ in range(rows)],
+    })
+
+
+@pytest.fixture(scope='module')
+def reviews():
+    return make_reviews()
+
+
+@pytest.fixture(scope='module')
+def index(reviews, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('index') / 'sentiment_index.bin')
+    builder = IndexBuilder(path)
+    for start in range(0, len(reviews), 70):
+        chunk = reviews.iloc[start:start + 70]
+        builder.add(chunk, chunk['posWords'], chunk['negWords'])
+    builder.finish()
+    with SentimentIndex(path) as index:
+        yield index
+
+
+def scan(reviews, pattern, produk=None, label=None):
+    """Referensi: scan str.contains atas kolom kata, tanpa indeks"""
+    mask = (reviews['posWords'] + ',' + reviews['negWords']).str.contains(pattern)
+    if produk is not None:
+        mask &= reviews['produkId'] == produk
+    if label is not None:
+        mask &= reviews['label'] == label
+    return np.flatnonzero(mask.to_numpy())
+
+
+def token_pattern(term):
+    """Kata berdiri sendiri atau bagian dari frasa terindeks"""
+    return rf'(?:^|[ ,]){re.escape(term)}(?=[ ,]|$)'
+
+
+def test_posting_lists_roundtrip():
+    rng = np.random.default_rng(0)
+    lists = [np.unique(rng.integers(0, 1 << bits, size=size))
+             for bits, size in ((4, 1), (12, 50), (40, 30), (63, 5))]
+    doc_ids = np.concatenate(lists)
+    group_starts = np.cumsum([0] + [len(ids) for ids in lists[:-1]])
+    blob, byte_starts = encode_posting_lists(doc_ids, group_starts)
+
+    data = np.frombuffer(blob, dtype=np.uint8)
+    bounds = list(byte_starts) + [len(data)]
+    for ids, start, end in zip(lists, bounds[:-1], bounds[1:]):
+        assert np.array_equal(np.cumsum(_varint_values(data[start:end])), ids)
+
+
+def test_index_is_read_through_mmap(index, reviews):
+    assert isinstance(index._mmap, mmap.mmap)
+    assert not index.labels.flags.owndata
+    assert index.doc_count == len(reviews)
+    assert index.ulasan_ids([0, 5, len(reviews) - 1]) == reviews['ulasanId'].iloc[[0, 5, -1]].tolist()
+    expected = reviews['label'].map(LABEL_CODES).to_numpy(dtype=np.uint8)
+    assert np.array_equal(index.labels, expected)
+
+
+@pytest.mark.parametrize('produk', [None, 'P1'])
+@pytest.mark.parametrize('term', ['bagus', 'luntur', 'kekecilan', 'warna', 'tidakada'])
+def test_term_query_matches_scan(index, reviews, term, produk):
+    assert np.array_equal(index.search([term], produk), scan(reviews, token_pattern(term), produk))
+
+
+@pytest.mark.parametrize('label', list(LABEL_CODES))
+def test_and_query_matches_scan(index, reviews, label):
+    expected = np.intersect1d(scan(reviews, token_pattern('bagus'), label=label),
+                              scan(reviews, token_pattern('luntur'), label=label))
+    assert len(expected)
+    assert np.array_equal(index.search(['bagus', 'luntur'], label=label, match='all'), expected)
+
+
+@pytest.mark.parametrize('phrase', ['warna luntur', 'sangat bagus'])
+def test_phrase_query_matches_scan(index, reviews, phrase):
+    expected = scan(reviews, rf'(?:^|,){re.escape(phrase)}(?=,|$)', produk='P2')
+    assert len(expected)
+    assert np.array_equal(index.search([phrase], 'P2'), expected)
+    assert np.array_equal(index.postings(phrase, 'P2'), expected)
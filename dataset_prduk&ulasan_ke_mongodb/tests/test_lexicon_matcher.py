@@ -0,0 +1,87 @@
+import pytest
+
+from lexicon_matcher import LexiconMatcher, normalize_score
+
+
+@pytest.fixture
+def matcher():
+    lexicon_matcher = LexiconMatcher()
+    lexicon_matcher.update({'gak nyesel': 1.0, 'luar biasa': 2.5, 'biasa': 0.5, 'bagus': 2.0,
+                            'bagus banget': 3.0, 'sia-sia': 1.0}, polarity='pos')
+    lexicon_matcher.update({'gak': 1.0, 'luntur': 1.5, 'warna luntur': 2.0, 'banget luntur': 2.5,
+                            'tidak jelas': 1.5, 'sia-sia': 2.0}, polarity='neg', sign=-1.0)
+    lexicon_matcher.update({'good': 1.9})
+    return lexicon_matcher
+
+
+@pytest.mark.parametrize('text, pos, neg', [
+    ('gak nyesel beli', ['gak nyesel'], []),
+    ('gak sesuai', [], ['gak']),
+    ('luar biasa', ['luar biasa'], []),
+    ('biasa saja', ['biasa'], []),
+    ('warna luntur', [], ['warna luntur']),
+    ('luntur warna', [], ['luntur']),
+    ('warna cepat luntur', [], ['luntur']),
+])
+def test_longest_match_wins(matcher, text, pos, neg):
+    _, pos_found, neg_found, _ = matcher.scan(text)
+    assert (pos_found, neg_found) == (pos, neg)
+
+
+def test_overlapping_phrases_match_leftmost_first(matcher):
+    # 'bagus banget' dan 'banget luntur' berbagi 'banget': yang mulai lebih kiri yang dipakai,
+    # lalu scan berlanjut setelahnya sehingga 'luntur' tetap dihitung sendiri
+    total, pos_found, neg_found, _ = matcher.scan('bagus banget luntur')
+    assert (pos_found, neg_found) == (['bagus banget'], ['luntur'])
+    assert total == 1.5
+
+    total, pos_found, neg_found, _ = matcher.scan('warna luntur bagus banget luntur')
+    assert (pos_found, neg_found) == (['bagus banget'], ['warna luntur', 'luntur'])
+    assert total == -0.5
+
+    total, pos_found, neg_found, _ = matcher.scan('banget luntur bagus')
+    assert (pos_found, neg_found) == (['bagus'], ['banget luntur'])
+    assert total == -0.5
+
+
+def test_negative_words_lower_the_score(matcher):
+    assert matcher.scan('luntur')[0] == -1.5
+    assert matcher.scan('tidak jelas luntur')[0] == -3.0
+    assert matcher.scan('bagus tapi luntur')[0] == 0.5
+    # Istilah tanpa polaritas ikut menyumbang skor tapi tidak dilaporkan
+    assert matcher.scan('good but luntur') == (pytest.approx(0.4), [], ['luntur'], 0)
+
+
+def test_later_update_overrides_term(matcher):
+    # 'sia-sia' ditambahkan sebagai kata positif lalu ditimpa kamus negatif
+    assert matcher.scan('sia-sia') == (-2.0, [], ['sia-sia'], 0)
+    assert matcher.size == 12
+
+
+def test_snapshot_roundtrip(matcher, tmp_path):
+    path = str(tmp_path / 'lexicon_snapshot.pickle')
+    matcher.save(path, 'v1')
+    assert LexiconMatcher.load(path, 'v2') is None
+    loaded = LexiconMatcher.load(path, 'v1')
+    assert loaded.size == matcher.size
+    assert loaded.scan('warna luntur bagus banget') == matcher.scan('warna luntur bagus banget')
+
+
+def test_normalize_score_matches_vader():
+    vader = pytest.importorskip('nltk.sentiment.vader').VaderConstants()
+    for score in (-12.0, -4.0, -1.5, 0.0, 0.5, 1.0, 4.5, 30.0):
+        assert normalize_score(score) == pytest.approx(vader.normalize(score))
+
+
+# Skor compound = jumlah bobot / sqrt(jumlah bobot^2 + 15), dibulatkan 4 angka
+@pytest.mark.parametrize('comment, expected', [
+    ('gak nyesel beli disini', (0.25, ['gak nyesel'], [])),
+    ('bahannya bagus dan pengiriman cepat', (0.7579, ['bagus', 'pengiriman', 'cepat'], [])),
+    ('luar biasa mantap', (0.7579, ['luar biasa', 'mantap'], [])),
+    ('jelek, warna luntur setelah dicuci', (-0.7184, [], ['jelek', 'warna luntur'])),
+    ('barang tidak sesuai, kecewa', (-0.3612, ['sesuai'], ['tidak', 'kecewa'])),
+    ('biasa saja', (0.0, [], [])),
+    ('', (0.0, [], [])),
+])
+def test_compound_scores_regression(analisis, comment, expected):
+    assert analisis.score_text(comment)[:3] == expected
@@ -0,0 +1,124 @@
+"""MongoSink: upsert per ulasanId, createdAt, batas batch in-flight, dan bentuk dokumen."""
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from mongo_sink import MongoSink
+
+mongomock = pytest.importorskip('mongomock')
+pytest.importorskip('pymongo')
+
+
+def make_docs(ids, label='positive'):
+    return [{'ulasanId': ulasan_id, 'label': label, 'skor': 8.0} for ulasan_id in ids]
+
+
+def test_upsert_by_ulasan_id():
+    collection = mongomock.MongoClient().db.ds_sentimen
+    sink = MongoSink(collection, batch_size=3, max_in_flight=2)
+    sink.write(make_docs(['a', 'b', 'c', 'd', 'e']))
+    assert sink.close() == {'upserted': 5, 'modified': 0, 'matched': 0}
+
+    sink = MongoSink(collection, batch_size=3, max_in_flight=2)
+    sink.write(make_docs(['a', 'b'], label='negative') + make_docs(['f']))
+    assert sink.close() == {'upserted': 1, 'modified': 2, 'matched': 2}
+
+    assert collection.count_documents({}) == 6
+    assert collection.find_one({'ulasanId': 'a'})['label'] == 'negative'
+    assert collection.find_one({'ulasanId': 'c'})['label'] == 'positive'
+
+
+def test_created_at_kept_on_update():
+    collection = mongomock.MongoClient().db.ds_sentimen
+    sink = MongoSink(collection)
+    sink.write(make_docs(['a']))
+    sink.close()
+    first = collection.find_one({'ulasanId': 'a'})
+
+    time.sleep(0.01)
+    sink = MongoSink(collection)
+    sink.write(make_docs(['a'], label='neutral'))
+    sink.close()
+    second = collection.find_one({'ulasanId': 'a'})
+
+    # $setOnInsert: createdAt hanya diisi saat dokumen pertama kali dibuat
+    assert second['createdAt'] == first['createdAt']
+    assert second['updatedAt'] > first['updatedAt']
+    assert second['label'] == 'neutral'
+
+
+class BlockingCollection:
+    """Koleksi palsu yang menahan bulk_write sampai dilepas, untuk menghitung batch yang berjalan"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.calls = 0
+
+    def bulk_write(self, operations, ordered=True):
+        with self.lock:
+            self.running += 1
+            self.calls += 1
+            self.max_running = max(self.max_running, self.running)
+        self.release.wait(5)
+        with self.lock:
+            self.running -= 1
+
+        class Result:
+            upserted_count = len(operations)
+            modified_count = 0
+            matched_count = 0
+        return Result()
+
+
+def test_in_flight_bound_blocks_writer():
+    collection = BlockingCollection()
+    sink = MongoSink(collection, batch_size=2, max_in_flight=2)
+    writer = threading.Thread(target=sink.write, args=(make_docs(range(10)),))
+    writer.start()
+
+    # Dua batch sedang dikirim; write() harus menunggu slot, bukan menumpuk batch di memori
+    deadline = time.time() + 5
+    while collection.running < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert writer.is_alive()
+    assert collection.calls == 2
+
+    collection.release.set()
+    writer.join(5)
+    assert sink.close()['upserted'] == 10
+    assert collection.max_running == 2
+    assert collection.calls == 5
+
+
+def test_document_shape(analisis):
+    collection = mongomock.MongoClient().db.ds_sentimen
+    df = pd.DataFrame({
+        'produk_id': ['P1', 'P2'],
+        'pengguna': ['u1', 'u2'],
+        'rating': [4.0, 2.0],
+        'komentar': ['penjual ramah, harga murah', 'penjual kasar'],
+    })
+    results = analisis.score_chunk(*analisis.chunk_arrays(df))
+    analisis.attach_results(df, results)
+
+    sink = MongoSink(collection)
+    analisis.create_mongodb_file(df, mongo_sink=sink, aspek_flags=results['aspek_flags'])
+    sink.close()
+
+    docs = {doc['komentarUlasan']: doc for doc in collection.find({}, {'_id': 0})}
+    doc = docs['penjual ramah, harga murah']
+    assert {'ulasanId', 'produkId', 'komentarUlasan', 'ratingUlasan', 'pengguna', 'skor', 'label',
+            'aspek', 'alasan', 'createdAt', 'updatedAt'} <= set(doc)
+    assert doc['produkId'] == 'P1'
+    assert isinstance(doc['ratingUlasan'], float)
+    # Aspek disimpan sebagai subdokumen (aspekSchema di backend), bukan string JSON
+    assert set(doc['aspek']) == {'harga', 'kualitas', 'pengiriman', 'pelayanan'}
+    assert doc['aspek']['pelayanan'] == {'skor': 8, 'label': 'positif'}
+    assert doc['aspek']['harga'] == {'skor': 8, 'label': 'positif'}
+    assert docs['penjual kasar']['aspek']['pelayanan'] == {'skor': 3, 'label': 'negatif'}
@@ -0,0 +1,99 @@
+"""mongodb_frame (operasi kolom) terhadap implementasi per baris sebelumnya."""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar_io import csv_frame
+
+MONGODB_COLUMNS = ['ulasanId', 'produkId', 'komentarUlasan', 'ratingUlasan',
+                   'pengguna', 'skor', 'label', 'aspek', 'alasan']
+
+WORDS = ['murah', 'terjangkau', 'mahal', 'bagus', 'mantap', 'jelek', 'rusak', 'cepat', 'lambat', 'lama',
+         'ramah', 'kasar', 'tidak', 'tidak jelas', 'gak nyesel', 'baju', 'warna', 'luntur', 'dan', 'tapi']
+
+
+def reference_aspek(pos_words, neg_words, aspek_keywords):
+    """Aturan aspek per baris seperti create_aspek_json versi apply"""
+    pos_words = pos_words.split(',') if pos_words else []
+    neg_words = neg_words.split(',') if neg_words else []
+    aspek = {}
+    for name, (pos_keywords, neg_keywords) in aspek_keywords.items():
+        if any(word in pos_words for word in pos_keywords):
+            aspek[name] = {'skor': 8, 'label': 'positif'}
+        elif any(word in neg_words for word in neg_keywords):
+            aspek[name] = {'skor': 3, 'label': 'negatif'}
+        else:
+            aspek[name] = {'skor': 5, 'label': 'netral'}
+    return json.dumps(aspek)
+
+
+def reference_rows(analisis, df):
+    """Baris MongoDB yang dibentuk satu per satu (tanpa ulasanId)"""
+    rows = []
+    for _, row in df.iterrows():
+        rating = row.get('rating', None)
+        if rating is None:
+            rating_text = 'tidak ada'
+        elif float(rating).is_integer():
+            rating_text = str(int(rating))
+        else:
+            rating_text = str(rating)
+        rows.append({
+            'produkId': row['produk_id'] if 'produk_id' in row else row.get('produk', 'unknown'),
+            'komentarUlasan': row['komentar'],
+            'ratingUlasan': rating,
+            'pengguna': row.get('pengguna', 'unknown'),
+            'skor': row['skor'],
+            'label': row['label'],
+            'aspek': reference_aspek(row['posWords'], row['negWords'], analisis.aspek_keywords),
+            'alasan': f"Ulasan mendapat rating {rating_text} dan mengandung kata positif: "
+                      f"{row['posWords'] or 'tidak ada'}, kata negatif: {row['negWords'] or 'tidak ada'}",
+        })
+    return pd.DataFrame(rows, index=df.index)
+
+
+@pytest.fixture(scope='module')
+def scored(analisis):
+    rng = np.random.default_rng(8)
+    rows = 300
+    df = pd.DataFrame({
+        'produk_id': [f"P{i}" for i in rng.integers(0, 5, rows)],
+        'produk': [f"Produk {i}" for i in rng.integers(0, 5, rows)],
+        'pengguna': [f"u{i}" for i in rng.integers(0, 40, rows)],
+        'rating': rng.choice([1.0, 2.0, 3.0, 4.0, 4.5, 5.0, np.nan], rows),
+        'komentar': [' '.join(rng.choice(WORDS, rng.integers(0, 6))) for _ in range(rows)],
+    }, index=pd.RangeIndex(100, 100 + rows))
+    results = analisis.score_chunk(*analisis.chunk_arrays(df))
+    return analisis.attach_results(df, results), results['aspek_flags']
+
+
+@pytest.mark.parametrize('drop', [[], ['produk_id'], ['produk_id', 'produk', 'pengguna'], ['rating']])
+@pytest.mark.parametrize('use_scan_flags', [True, False], ids=['scan_flags', 'from_words'])
+def test_matches_row_wise_reference(analisis, scored, drop, use_scan_flags):
+    df, aspek_flags = scored
+    df = df.drop(columns=drop)
+    mongo_df = analisis.mongodb_frame(df, {}, aspek_flags if use_scan_flags else None)
+
+    assert list(mongo_df.columns) == MONGODB_COLUMNS
+    assert mongo_df.index.equals(df.index)
+    expected = reference_rows(analisis, df)
+    pd.testing.assert_frame_equal(mongo_df.drop(columns='ulasanId'), expected, check_dtype=False)
+    assert mongo_df['ulasanId'].tolist() == analisis.make_ulasan_ids(df, {}).tolist()
+
+
+def test_all_aspek_labels_covered(analisis, scored):
+    df, aspek_flags = scored
+    aspek = [json.loads(value) for value in analisis.mongodb_frame(df, {}, aspek_flags)['aspek']]
+    for name in analisis.aspek_keywords:
+        assert {row[name]['label'] for row in aspek} == {'positif', 'negatif', 'netral'}
+
+
+def test_create_mongodb_file_writes_frame(analisis, scored, tmp_path, monkeypatch):
+    df, aspek_flags = scored
+    monkeypatch.setattr(analisis, 'output_dir', str(tmp_path))
+    with analisis.open_mongodb_writer() as writer:
+        mongo_df = analisis.create_mongodb_file(df, writer, {}, aspek_flags=aspek_flags)
+    written = (tmp_path / analisis.mongodb_ready_file).read_text(encoding='utf-8')
+    assert written == csv_frame(mongo_df).to_csv(index=False)
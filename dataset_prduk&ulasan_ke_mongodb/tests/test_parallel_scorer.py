@@ -0,0 +1,80 @@
+import concurrent.futures
+import time
+
+import numpy as np
+import pytest
+
+from parallel_scorer import ParallelScorer
+
+
+def slow_first_half(values, ratings):
+    """Task yang sengaja selesai tidak berurutan: nilai kecil lebih lambat"""
+    time.sleep(0.05 if values[0] < 10 else 0)
+    return list(values)
+
+
+def flatten(parts):
+    return [value for part in parts for value in part]
+
+
+class Counter:
+    def __init__(self):
+        self.total = 0
+
+    def update(self, rows):
+        self.total += rows
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_results_follow_submit_order(workers):
+    progress = Counter()
+    with ParallelScorer(slow_first_half, flatten, workers=workers, chunk_size=3,
+                        progress=progress) as scorer:
+        for job_id, start in enumerate((0, 7, 20)):
+            scorer.submit(job_id, np.arange(start, start + 7))
+        results = list(scorer.drain())
+
+    assert [job_id for job_id, _ in results] == [0, 1, 2]
+    assert [result for _, result in results] == [list(range(start, start + 7)) for start in (0, 7, 20)]
+    assert progress.total == 21
+    # Setiap job 7 baris dipecah menjadi task 3 + 3 + 1
+    assert sum(stats['tasks'] for stats in scorer.worker_stats.values()) == 9
+    assert sum(stats['rows'] for stats in scorer.worker_stats.values()) == 21
+
+
+def test_ready_does_not_skip_unfinished_job():
+    with ParallelScorer(slow_first_half, flatten, workers=2, chunk_size=4) as scorer:
+        scorer.submit('lambat', np.arange(0, 4))
+        scorer.submit('cepat', np.arange(10, 12))
+        # Job kedua selesai lebih dulu, tapi hasilnya menunggu job pertama
+        concurrent.futures.wait([future for future, (job, _, _) in scorer._running.items()
+                                 if job.job_id == 'cepat'])
+        assert list(scorer.ready()) == []
+        assert [job_id for job_id, _ in scorer.ready(wait=True)] == ['lambat', 'cepat']
+        assert scorer.pending_jobs == 0
+
+
+def test_initializer_runs_inline_without_pool():
+    calls = []
+    scorer = ParallelScorer(slow_first_half, flatten, workers=1, initializer=lambda: calls.append(1))
+    scorer.submit(None, np.arange(20, 25))
+    assert list(scorer.ready()) == [(None, [20, 21, 22, 23, 24])]
+    assert calls == [1]
+    scorer.close()
+
+
+def test_parallel_scoring_matches_single_call(analisis):
+    comments = np.array(['bahannya bagus', 'jelek, warna luntur', '', None, 'gak nyesel', 'biasa saja',
+                         'mantap', 'kecewa berat'], dtype=object)
+    ratings = np.array([5, 1, np.nan, 3, 5, 3, 4, 1], dtype=float)
+    expected = analisis.score_chunk(comments, ratings)
+
+    with ParallelScorer(analisis.score_chunk, analisis.concat_results, workers=2, chunk_size=3,
+                        initializer=analisis.init_worker) as scorer:
+        scorer.submit('chunk', comments, ratings)
+        scorer.submit('kosong', comments[:0], ratings[:0])
+        (_, actual), (_, empty) = scorer.drain()
+
+    assert len(empty['score']) == 0
+    for key in expected:
+        np.testing.assert_equal(actual[key], expected[key])
@@ -0,0 +1,107 @@
+import math
+import sqlite3
+
+import numpy as np
+import pytest
+
+import score_cache
+from score_cache import ScoreCache, select_in
+
+ROW = (0.7579, 8.7895, 'positive', 'bagus,cepat', '', 20)
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'sentiment_cache.sqlite')
+
+
+def test_hits_and_misses(cache_path):
+    cache = ScoreCache(cache_path, 'v1')
+    keys = [cache.make_key('bagus', 5), cache.make_key('jelek', 1)]
+    assert cache.get_many(keys) == [None, None]
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    cache.put_many(keys[:1], [ROW])
+    assert cache.get_many(keys + keys[:1]) == [ROW, None, ROW]
+    assert (cache.hits, cache.misses) == (2, 3)
+    cache.close()
+
+
+def test_nan_scores_roundtrip(cache_path):
+    cache = ScoreCache(cache_path, 'v1')
+    key = cache.make_key('', None)
+    cache.put_many([key], [(math.nan, math.nan, 'neutral', '', '', 0)])
+    score, normalized_score, *rest = cache.get_many([key])[0]
+    assert math.isnan(score) and math.isnan(normalized_score)
+    assert rest == ['neutral', '', '', 0]
+    cache.close()
+
+
+def test_key_stability(cache_path):
+    cache = ScoreCache(cache_path, 'v1')
+    key = cache.make_key('bahannya bagus', 5)
+    # Kunci tersimpan di disk: format hash tidak boleh berubah diam-diam antar rilis
+    assert key.hex() == 'd67fc168e62863d8d7725916c1dcb077'
+    assert cache.make_key('bahannya bagus', None).hex() == '5c4379a40511659663bb53dc511bc18c'
+    assert ScoreCache(':memory:', 'v1').make_key('bahannya bagus', 5) == key
+    # Rating int, float, dan numpy dianggap sama
+    assert cache.make_key('bahannya bagus', 5.0) == key
+    assert cache.make_key('bahannya bagus', np.float64(5)) == key
+
+    others = {cache.make_key('bahannya bagus', 4), cache.make_key('bahannya bagus', None),
+              cache.make_key('bahannya bagus ', 5), ScoreCache(':memory:', 'v2').make_key('bahannya bagus', 5)}
+    assert key not in others and len(others) == 4
+    cache.close()
+
+
+def test_reopen_keeps_rows_for_same_version(cache_path):
+    cache = ScoreCache(cache_path, 'v1')
+    key = cache.make_key('bagus', 5)
+    cache.put_many([key], [ROW])
+    cache.close()
+
+    cache = ScoreCache(cache_path, 'v1')
+    assert cache.get_many([key]) == [ROW]
+    cache.close()
+
+
+def test_version_change_invalidates_cache(cache_path):
+    cache = ScoreCache(cache_path, 'v1')
+    cache.put_many([cache.make_key('bagus', 5)], [ROW])
+    cache.close()
+
+    cache = ScoreCache(cache_path, 'v2')
+    assert cache.conn.execute("SELECT COUNT(*) FROM scores").fetchone() == (0,)
+    cache.close()
+
+    # Kembali ke versi lama tidak menghidupkan hasil lama
+    cache = ScoreCache(cache_path, 'v1')
+    assert cache.get_many([cache.make_key('bagus', 5)]) == [None]
+    cache.close()
+
+
+def test_lexicon_version_follows_dictionary(analisis, monkeypatch):
+    version = analisis.lexicon_version()
+    assert analisis.lexicon_version() == version
+
+    with monkeypatch.context() as patch:
+        patch.setitem(analisis.pos_words, 'kece badai', 2.0)
+        assert analisis.lexicon_version() != version
+    with monkeypatch.context() as patch:
+        patch.setitem(analisis.neg_words, 'jelek', 3.0)
+        assert analisis.lexicon_version() != version
+    with monkeypatch.context() as patch:
+        patch.setattr(analisis, 'scoring_version', analisis.scoring_version + 1)
+        assert analisis.lexicon_version() != version
+    assert analisis.lexicon_version() == version
+
+
+def test_select_in_batches_keys(monkeypatch):
+    monkeypatch.setattr(score_cache, '_LOOKUP_BATCH', 7)
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE t (k INTEGER PRIMARY KEY, v TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(k, str(k)) for k in range(0, 60, 2)])
+
+    rows = select_in(conn, "SELECT k, v FROM t WHERE k IN ({placeholders})", list(range(50)))
+    assert sorted(rows) == [(k, str(k)) for k in range(0, 50, 2)]
+    assert select_in(conn, "SELECT k FROM t WHERE k IN ({placeholders})", []) == []
@@ -0,0 +1,79 @@
+"""Paritas score_chunk (kolomnar) terhadap process_chunk (per baris)."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar_io import csv_frame, pin_dtypes
+
+KOMENTAR = [
+    'Bahannya bagus dan pengiriman cepat',
+    'jelek, warna luntur setelah dicuci',
+    'barang tidak sesuai, kecewa',
+    '',
+    '   ',
+    None,
+    np.nan,
+    'lumayan lah, tapi agak mahal',
+    'Mantap! Recommended seller',
+    'biasa saja',
+]
+
+
+def assert_parity(analisis, chunk):
+    expected = analisis.process_chunk(chunk)
+    ratings = chunk['rating'].to_numpy() if 'rating' in chunk.columns else None
+    actual = analisis.score_chunk(chunk['komentar'].to_numpy(dtype=object), ratings)
+    
+    assert len(expected) == len(actual['score'])
+    for i, row in enumerate(expected):
+        np.testing.assert_equal(actual['score'][i], row['score'])
+        np.testing.assert_equal(actual['normalized_score'][i], row['normalized_score'])
+        for key in ('label', 'pos_words', 'neg_words', 'preprocessed_comment', 'has_empty_comment'):
+            assert actual[key][i] == row[key], (i, key)
+
+
+@pytest.mark.parametrize('ratings', [
+    [5, 1, 2, 5, 3, 5, 4, 3, 5, 1],
+    [5.0, 1.0, np.nan, 5.0, np.nan, 5.0, 4.0, 3.0, np.nan, 1.0],
+], ids=['int', 'float_nan'])
+def test_numeric_rating(analisis, ratings):
+    assert_parity(analisis, pd.DataFrame({'komentar': KOMENTAR, 'rating': ratings}))
+
+
+def test_object_rating(analisis):
+    # Nilai non-numerik (string, None) tidak dihitung sebagai rating
+    ratings = [5, '4', None, 5.0, 'lima', 5, np.nan, 2, '', 1]
+    chunk = pd.DataFrame({'komentar': KOMENTAR, 'rating': pd.Series(ratings, dtype=object)})
+    assert_parity(analisis, chunk)
+
+
+def test_missing_rating_column(analisis):
+    assert_parity(analisis, pd.DataFrame({'komentar': KOMENTAR}))
+
+
+def test_nan_rating_gives_nan_score(analisis):
+    results = analisis.score_chunk(np.array(['bagus'], dtype=object), np.array([np.nan]))
+    assert np.isnan(results['score'][0])
+    assert results['label'][0] == 'neutral'
+
+
+def test_rating_text_keeps_integral_ratings(analisis):
+    # Rating dibaca sebagai float64, tapi ditulis seperti di input: 5 bukan 5.0
+    chunk = pd.DataFrame({'komentar': ['bagus', 'bagus', 'bagus'], 'rating': [5.0, 4.5, np.nan]})
+    analisis.attach_results(chunk, analisis.score_chunk(*analisis.chunk_arrays(chunk)))
+    mongo_df = analisis.mongodb_frame(chunk, {})
+    assert [alasan.split(' dan ')[0] for alasan in mongo_df['alasan']] == [
+        'Ulasan mendapat rating 5', 'Ulasan mendapat rating 4.5', 'Ulasan mendapat rating nan']
+    assert mongo_df['ratingUlasan'].dtype == np.float64
+    lines = csv_frame(mongo_df[['ratingUlasan']]).to_csv(index=False).splitlines()
+    assert lines == ['ratingUlasan', '5', '4.5', '""']
+
+
+def test_dataset_sample(analisis):
+    # Sampel dari dataset asli, rating dipin ke float64 seperti di read_input
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), analisis.input_file)
+    if not os.path.exists(path):
+        pytest.skip('dataset tidak tersedia')
+    assert_parity(analisis, pin_dtypes(pd.read_csv(path, nrows=500)))
@@ -0,0 +1,165 @@
+"""Layanan scoring: paritas dengan ekspor MongoDB, micro-batching, dan validasi request."""
+import asyncio
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+from columnar_io import pin_dtypes
+from mongo_sink import to_document
+
+REVIEWS = pd.DataFrame({
+    'produk_id': ['P1', 'P1', 'P2', 'P2', 'P3', 'P3', 'P4'],
+    'pengguna': ['u1', 'u2', 'u3', 'u4', 'u5', 'u6', 'u7'],
+    'rating': [5, 1, 3, 5, 2, 4, 5],
+    'komentar': ['bahan bagus, pengiriman cepat', 'jelek, warna luntur', 'harga mahal tapi kualitas oke',
+                 '', None, 'penjual ramah dan membantu', 'Mantap! recommended'],
+})
+
+
+@pytest.fixture(scope='module')
+def service(analisis):
+    import scoring_service
+    return scoring_service
+
+
+def test_score_reviews_matches_mongodb_export(analisis, service):
+    df = pin_dtypes(REVIEWS.copy())
+    results = analisis.score_chunk(*analisis.chunk_arrays(df))
+    analisis.attach_results(df, results)
+    expected = [to_document(record) for record in
+                analisis.mongodb_frame(df, aspek_flags=results['aspek_flags']).to_dict('records')]
+
+    # Rating dikirim sebagai int seperti dari backend, bukan float dari CSV
+    scored = service.score_reviews([{'komentar': komentar, 'rating': int(rating)}
+                                    for komentar, rating in zip(REVIEWS['komentar'], REVIEWS['rating'])])
+
+    assert len(scored) == len(expected)
+    for got, want, pos_words, neg_words in zip(scored, expected, df['posWords'], df['negWords']):
+        assert got['skor'] == want['skor']
+        assert got['label'] == want['label']
+        assert got['aspek'] == want['aspek']
+        assert got['alasan'] == want['alasan']
+        assert ','.join(got['posWords']) == pos_words
+        assert ','.join(got['negWords']) == neg_words
+
+
+def test_score_reviews_without_rating(service):
+    scored = service.score_reviews([{'komentar': 'bagus', 'rating': None}, {'komentar': 'bagus', 'rating': 5},
+                                    {'komentar': 'bagus', 'rating': 4.5}])
+    assert scored[0]['label'] == 'positive'
+    assert scored[0]['alasan'].startswith('Ulasan mendapat rating tidak ada ')
+    assert scored[1]['alasan'].startswith('Ulasan mendapat rating 5 ')
+    assert scored[2]['alasan'].startswith('Ulasan mendapat rating 4.5 ')
+
+
+def test_micro_batcher_splits_results_per_request(service):
+    batch_sizes = []
+
+    def score_fn(reviews):
+        batch_sizes.append(len(reviews))
+        return [review['id'] * 10 for review in reviews]
+
+    async def scenario():
+        batcher = service.MicroBatcher(score_fn, max_batch=5, max_wait_ms=50)
+        task = asyncio.create_task(batcher.run())
+        sizes = [1, 3, 2, 4, 1, 6, 2]
+        requests, next_id = [], 0
+        for size in sizes:
+            requests.append([{'id': next_id + i} for i in range(size)])
+            next_id += size
+        try:
+            results = await asyncio.gather(*(batcher.submit(reviews) for reviews in requests))
+        finally:
+            task.cancel()
+        return batcher, requests, results
+
+    batcher, requests, results = asyncio.run(scenario())
+    for reviews, result in zip(requests, results):
+        assert result == [review['id'] * 10 for review in reviews]
+    # Request tidak dipotong: batch ditutup setelah melewati max_batch
+    assert batcher.batches == len(batch_sizes) > 1
+    assert batcher.reviews == sum(batch_sizes) == sum(len(reviews) for reviews in requests)
+
+
+def test_micro_batcher_propagates_errors(service):
+    def score_fn(reviews):
+        raise RuntimeError('gagal')
+
+    async def scenario():
+        batcher = service.MicroBatcher(score_fn)
+        task = asyncio.create_task(batcher.run())
+        try:
+            with pytest.raises(RuntimeError):
+                await batcher.submit([{'komentar': 'x'}])
+        finally:
+            task.cancel()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('body', [
+    b'{bukan json',
+    b'null',
+    b'[{"komentar": "bagus"}]',
+    b'{"ulasan": "bagus"}',
+    b'{"ulasan": [1, 2]}',
+    b'{"komentar": 5}',
+    b'{"komentar": "bagus", "rating": "5"}',
+    b'{"komentar": "bagus", "rating": true}',
+    b'{"komentar": "bagus", "rating": NaN}',
+    b'{"komentar": "bagus", "rating": Infinity}',
+    b'{"ulasan": [{"komentar": "bagus"}, {"rating": [5]}]}',
+])
+def test_score_rejects_invalid_body(service, body):
+    async def scenario():
+        batcher = service.MicroBatcher(service.score_reviews)
+        return await service.ScoringService(batcher).route('POST', '/score', body)
+
+    status, payload = asyncio.run(scenario())
+    assert status == 400
+    assert payload['error']
+
+
+def test_score_single_and_batch_body(service):
+    async def scenario():
+        batcher = service.MicroBatcher(service.score_reviews)
+        task = asyncio.create_task(batcher.run())
+        app = service.ScoringService(batcher)
+        try:
+            single = await app.route('POST', '/score', json.dumps({'komentar': 'bagus', 'rating': 5}).encode())
+            many = await app.route('POST', '/score', json.dumps(
+                {'ulasan': [{'komentar': 'jelek'}, {'komentar': 'bagus', 'rating': 4.5}]}).encode())
+        finally:
+            task.cancel()
+        return single, many
+
+    (status, single), (many_status, many) = asyncio.run(scenario())
+    assert status == 200 and single['label'] == 'positive'
+    assert many_status == 200
+    assert [hasil['label'] for hasil in many['hasil']] == ['negative', 'positive']
+
+
+def test_event_loop_not_blocked_while_scoring(service):
+    release = threading.Event()
+
+    def score_fn(reviews):
+        release.wait(5)
+        return reviews
+
+    async def scenario():
+        batcher = service.MicroBatcher(score_fn)
+        task = asyncio.create_task(batcher.run())
+        try:
+            pending = asyncio.ensure_future(batcher.submit([{'komentar': 'x'}]))
+            await asyncio.sleep(0.05)
+            # Loop tetap berjalan selama score_fn tertahan di thread executor
+            assert not pending.done()
+            release.set()
+            return await asyncio.wait_for(pending, 5)
+        finally:
+            release.set()
+            task.cancel()
+
+    assert asyncio.run(scenario()) == [{'komentar': 'x'}]